@@ -0,0 +1,222 @@
+"""
+Adaptive Candidates
+Learns the structure of passwords cracked so far and generates likely guesses
+"""
+
+import re
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# Observed suffix years also suggest their neighbors, at this weight
+YEAR_NEIGHBOR_WEIGHT = 0.5
+
+# Upper bound of the seen-shape factor in candidates() (1 + share of masks)
+MAX_MASK_FACTOR = 2.0
+
+
+def char_class_mask(password: str) -> str:
+    """Mask of a password's character classes, e.g. 'Summer24!' -> '?u?l?l?l?l?l?d?d?s'"""
+    mask = []
+    for c in password:
+        if c.islower():
+            mask.append('?l')
+        elif c.isupper():
+            mask.append('?u')
+        elif c.isdigit():
+            mask.append('?d')
+        else:
+            mask.append('?s')
+    return ''.join(mask)
+
+
+def split_password(password: str) -> Tuple[str, str, str]:
+    """
+    Split a password into prefix, base word and suffix
+
+    The base is the first run of letters; e.g. '1Summer2024!' ->
+    ('1', 'Summer', '2024!'). Passwords without letters have an empty base.
+    """
+    match = re.match(r'^([^A-Za-z]*)([A-Za-z]*)(.*)$', password)
+    return match.group(1), match.group(2), match.group(3)
+
+
+def case_style(word: str) -> str:
+    """'lower', 'upper', 'capitalized' or 'mixed'"""
+    if word.islower():
+        return 'lower'
+    elif word.isupper():
+        return 'upper'
+    elif word[:1].isupper() and word[1:].islower():
+        return 'capitalized'
+    return 'mixed'
+
+
+def apply_style(word: str, style: str) -> str:
+    if style == 'lower':
+        return word.lower()
+    elif style == 'upper':
+        return word.upper()
+    elif style == 'capitalized':
+        return word.capitalize()
+    return word
+
+
+def _year_neighbors(suffix: str) -> List[str]:
+    """The suffix with a 4-digit 19xx/20xx year moved one year either way"""
+    match = re.search(r'(19|20)\d\d', suffix)
+    if not match:
+        return []
+    year = int(match.group(0))
+    return [suffix[:match.start()] + str(y) + suffix[match.end():] for y in (year - 1, year + 1)]
+
+
+class AdaptiveModel:
+    """
+    Counts of masks, base words, case styles, prefixes and suffixes
+
+    Updated one password at a time; candidates() combines the observed
+    pieces, most frequent combinations first. It walks the combinations
+    best-first and stops once no further one can make the cut, and its
+    result is cached until the model learns another password.
+    """
+
+    def __init__(self):
+        self.passwords = []
+        self.masks = Counter()
+        self.lengths = Counter()
+        self.bases = Counter()
+        self.styles = Counter()
+        self.prefixes = Counter()
+        self.suffixes = Counter()
+        self._cache = None
+
+    def __len__(self) -> int:
+        return len(self.passwords)
+
+    def add(self, password: str):
+        """Learn from a cracked password"""
+        if not password or password in self.passwords:
+            return
+        self.passwords.append(password)
+        self.masks[char_class_mask(password)] += 1
+        self.lengths[len(password)] += 1
+
+        prefix, base, suffix = split_password(password)
+        self.prefixes[prefix] += 1
+        self.suffixes[suffix] += 1
+        if base:
+            self.bases[base.lower()] += 1
+            self.styles[case_style(base)] += 1
+
+    def _suffix_weights(self) -> Dict[str, float]:
+        total = sum(self.suffixes.values())
+        weights = {s: n / total for s, n in self.suffixes.items()}
+        for suffix, n in self.suffixes.items():
+            for neighbor in _year_neighbors(suffix):
+                weights.setdefault(neighbor, YEAR_NEIGHBOR_WEIGHT * n / total)
+        return weights
+
+    def candidates(self, words: Iterable[str] = (), limit: int = 1000,
+                   word_weight: float = 0.1) -> List[str]:
+        """
+        Generate guesses from the learned structure, most likely first
+
+        Args:
+            words: Extra base words (e.g. the top of the wordlist), in rank order
+            limit: Maximum number of candidates
+            word_weight: Weight of all extra words together, relative to the
+                         cracked base words
+
+        Returns:
+            Candidates without duplicates
+        """
+        if not self.passwords:
+            return []
+        words = [w.strip().lower() for w in words if w.strip()]
+        key = (len(self.passwords), tuple(words), limit, word_weight)
+        if self._cache is not None and self._cache[0] == key:
+            return list(self._cache[1])
+
+        ranked = list(self.passwords)
+        wanted = limit - len(ranked)
+        if wanted > 0:
+            scored = self._top_scored(words, wanted, word_weight)
+            ranked += sorted(scored, key=lambda c: scored[c], reverse=True)[:wanted]
+        ranked = ranked[:limit]
+        self._cache = (key, ranked)
+        return list(ranked)
+
+    def _top_scored(self, words: List[str], wanted: int, word_weight: float) -> Dict[str, float]:
+        """
+        Scores of at least the wanted best new candidates
+
+        A candidate scores base x style x prefix x suffix probability, times
+        a seen-shape factor of at most MAX_MASK_FACTOR. Combinations come off
+        a heap in order of the product, so the walk ends once even the best
+        remaining one, at the largest factor, cannot beat the wanted-th score.
+        """
+        # Base words: cracked ones by frequency, then extra words by rank
+        total = sum(self.bases.values())
+        bases = {b: n / total for b, n in self.bases.items()} if total else {}
+        for rank, word in enumerate(words, 1):
+            bases.setdefault(word, word_weight / (rank * len(words)))
+
+        styles = self.styles or Counter({'lower': 1})
+        style_total = sum(styles.values())
+        prefix_total = sum(self.prefixes.values())
+        mask_total = sum(self.masks.values())
+
+        # Each dimension's pieces, most probable first
+        dims = [sorted(bases.items(), key=lambda kv: -kv[1]),
+                sorted(((st, n / style_total) for st, n in styles.items()), key=lambda kv: -kv[1]),
+                sorted(((p, n / prefix_total) for p, n in self.prefixes.items()), key=lambda kv: -kv[1]),
+                sorted(self._suffix_weights().items(), key=lambda kv: -kv[1])]
+        if not all(dims):
+            return {}
+
+        def product(index):
+            score = 1.0
+            for dim, i in zip(dims, index):
+                score *= dim[i][1]
+            return score
+
+        known = set(self.passwords)
+        scored = {}
+        start = (0, 0, 0, 0)
+        heap = [(-product(start), start)]
+        seen = {start}
+        cutoff = 0.0
+        popped = 0
+        while heap:
+            neg, index = heapq.heappop(heap)
+            if -neg * MAX_MASK_FACTOR <= cutoff:
+                break
+            (base, _), (style, _), (prefix, _), (suffix, _) = (dim[i] for dim, i in zip(dims, index))
+            candidate = prefix + apply_style(base, style) + suffix
+            if candidate not in known:
+                # Shapes seen before are more likely than new ones
+                score = -neg * (1 + self.masks.get(char_class_mask(candidate), 0) / mask_total)
+                if score > scored.get(candidate, 0.0):
+                    scored[candidate] = score
+            # A stale (lower) cutoff only walks further, so refresh it now and then
+            popped += 1
+            if popped % wanted == 0 and len(scored) >= wanted:
+                cutoff = heapq.nlargest(wanted, scored.values())[-1]
+
+            for d in range(4):
+                if index[d] + 1 < len(dims[d]):
+                    following = index[:d] + (index[d] + 1,) + index[d + 1:]
+                    if following not in seen:
+                        seen.add(following)
+                        heapq.heappush(heap, (-product(following), following))
+        return scored
+
+    def summary(self, top: int = 5) -> Dict:
+        """Most common masks, base words and suffixes"""
+        return {
+            'passwords': len(self.passwords),
+            'masks': self.masks.most_common(top),
+            'bases': self.bases.most_common(top),
+            'suffixes': self.suffixes.most_common(top),
+        }
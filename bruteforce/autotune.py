@@ -0,0 +1,154 @@
+"""
+Autotuner
+Picks batch size, worker count and backend per target from short timed probes
+"""
+
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+DEFAULT_BATCH_SIZES = (1, 4, 16, 64, 256)
+
+
+def _worker_counts(max_workers: int) -> List[int]:
+    """1, 2, 4, ... up to and including max_workers"""
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+class Autotuner:
+    """
+    Coordinate search over execution settings
+
+    Probes run on the real candidate stream, so no guesses are wasted:
+    backends first (at full width), then worker counts for the winning
+    backend, then batch sizes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, probe_time: float = 2.0,
+                 batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+                 backends: Sequence[str] = ('inline', 'threads', 'processes')):
+        """
+        Args:
+            max_workers: Largest worker count to try (default: CPU count)
+            probe_time: Seconds each probe runs
+            batch_sizes: Batch sizes to try
+            backends: Backends to try
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.probe_time = probe_time
+        self.batch_sizes = list(batch_sizes)
+        self.backends = list(backends)
+        self.probes = []
+
+    def tune(self, probe: Callable[[str, int, int, float], Optional[float]]) -> Optional[Dict]:
+        """
+        Run the probes
+
+        Args:
+            probe: probe(backend, workers, batch_size, seconds) runs the
+                   attack with those settings and returns guesses/sec, or
+                   None once the attack has ended (found or exhausted)
+
+        Returns:
+            Best settings {'backend', 'workers', 'batch_size', 'rate'}, or
+            None if the attack ended during tuning
+        """
+        self.probes = []
+        default_batch = self.batch_sizes[len(self.batch_sizes) // 2]
+
+        def run(backend, workers, batch_size):
+            rate = probe(backend, workers, batch_size, self.probe_time)
+            if rate is None:
+                return None
+            config = {'backend': backend, 'workers': workers,
+                      'batch_size': batch_size, 'rate': rate}
+            self.probes.append(config)
+            return config
+
+        # 1. Backend, each at its natural width
+        best = None
+        for backend in self.backends:
+            workers = 1 if backend == 'inline' else self.max_workers
+            if backend != 'inline' and self.max_workers <= 1:
+                continue
+            config = run(backend, workers, default_batch)
+            if config is None:
+                return None
+            if best is None or config['rate'] > best['rate']:
+                best = config
+
+        # 2. Worker count
+        if best['backend'] != 'inline':
+            for workers in _worker_counts(self.max_workers):
+                if workers == best['workers']:
+                    continue
+                config = run(best['backend'], workers, default_batch)
+                if config is None:
+                    return None
+                if config['rate'] > best['rate']:
+                    best = config
+
+        # 3. Batch size
+        for batch_size in self.batch_sizes:
+            if batch_size == best['batch_size']:
+                continue
+            config = run(best['backend'], best['workers'], batch_size)
+            if config is None:
+                return None
+            if config['rate'] > best['rate']:
+                best = config
+
+        return dict(best)
+
+
+class DriftMonitor:
+    """Flags when sustained throughput falls well below the tuned rate"""
+
+    def __init__(self, tuned_rate: float, tolerance: float = 0.3,
+                 window: float = 30.0, patience: int = 3):
+        """
+        Args:
+            tuned_rate: Guesses/sec measured by the autotuner
+            tolerance: Fractional drop that counts as drift
+            window: Seconds per measurement window
+            patience: Consecutive slow windows before re-tuning
+        """
+        self.tuned_rate = tuned_rate
+        self.tolerance = tolerance
+        self.window = window
+        self.patience = patience
+
+        self._window_start = time.time()
+        self._window_attempts = 0
+        self._slow_windows = 0
+
+    def update(self, attempts: int) -> bool:
+        """
+        Record finished guesses
+
+        Args:
+            attempts: Guesses finished since the last call
+
+        Returns:
+            True when it is time to re-tune
+        """
+        self._window_attempts += attempts
+        elapsed = time.time() - self._window_start
+        if elapsed < self.window:
+            return False
+
+        rate = self._window_attempts / elapsed
+        self._window_start = time.time()
+        self._window_attempts = 0
+
+        if rate < self.tuned_rate * (1 - self.tolerance):
+            self._slow_windows += 1
+        else:
+            self._slow_windows = 0
+        return self._slow_windows >= self.patience
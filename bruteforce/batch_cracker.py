@@ -6,20 +6,49 @@ Cracks all files in Level1 and Level2 folders
 import os
 import sys
 import time
-import json
+import itertools
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 import concurrent.futures
 
+from adaptive import AdaptiveModel
+from candidate_batch import CandidateBatch
+from checkpoint import Checkpoint, DEFAULT_RESTORE_DIR, checkpoint_path
+from containers import discover, is_container
 from cracker import PasswordCracker
+from escalation import AttackPlan, run_stage, stage_name
+from journal import ResultsJournal, write_summaries
+from executor import BACKENDS, create_executor, select_backend, timed_verify_batch
+from governor import ResourceGovernor, add_resource_arguments, apply_resource_arguments
+from keyspace import DEFAULT_MUTATIONS, index_dir_for
+from metrics import Metrics, MetricsExporter, MetricsRegistry
+from planner import count_candidates, measure_rate, schedule_time, format_time
+from policy import PasswordPolicy
+from potfile import DEFAULT_POTFILE, Potfile, check_potfile, content_hash
+from rules import neighborhood
+from target_profile import print_profile, profile_targets
+from tracing import Tracer
+from verifiers import create_verifier, file_type_for, verifier_class_for
 
 
 class BatchCracker:
     """Batch password cracker for multiple files"""
     
+    # Top wordlist words the adaptive stage combines with learned structure
+    ADAPTIVE_WORDS = 200
+    
     def __init__(self, target_dirs: List[str], wordlist: str, 
-                 output_dir: str = 'results', max_workers: int = 4):
+                 output_dir: str = 'results', max_workers: int = 4,
+                 file_workers: int = 1, backend: str = 'auto', resume: bool = False, autotune: bool = False,
+                 metrics_file: Optional[str] = None, metrics_interval: float = 10.0,
+                 potfile: Optional[str] = None, propagate: bool = True,
+                 adaptive: bool = False, adaptive_limit: int = 1000,
+                 breadth_first: bool = False, first_round: int = 1000,
+                 round_growth: float = 4.0, policy: Optional[PasswordPolicy] = None,
+                 attack_plan: Optional[AttackPlan] = None,
+                 governor: Optional[ResourceGovernor] = None,
+                 tracer: Optional[Tracer] = None):
         """
         Initialize batch cracker
         
@@ -28,11 +57,67 @@ class BatchCracker:
             wordlist: Path to wordlist file
             output_dir: Directory to save results
             max_workers: Number of parallel workers
+            file_workers: Verification workers inside each file's attack when
+                          files run one at a time (files cracked in parallel
+                          verify on one each)
+            backend: Execution backend for parallel mode ('auto', 'inline',
+                     'threads', 'processes')
+            resume: Skip finished files and continue interrupted ones from
+                    the restore files in <output_dir>/restore
+            autotune: Crack files one at a time, each with the backend, worker
+                      count (up to max_workers) and batch size its own probes
+                      pick; the choice is recorded under 'tuning' in the results
+            metrics_file: Periodically write metrics for every file here
+                          ('.json' for JSON, otherwise Prometheus text)
+            metrics_interval: Seconds between metrics snapshots
+            potfile: Potfile of cracked files; known files are confirmed
+                     instead of attacked, new cracks are added (None disables it)
+            propagate: When a file cracks, try its password and close variants
+                       on every file not yet cracked before attacking them
+            adaptive: Before attacking a file, try candidates built from the
+                      masks, base words and suffixes of passwords cracked so
+                      far in the batch
+            adaptive_limit: Maximum adaptive candidates per file and model update
+            breadth_first: Try the first candidates on every file, then the
+                           next ones, instead of finishing one file at a time;
+                           each chunk is read once and tried on all files
+            first_round: Candidates per file in the first breadth-first round
+            round_growth: Factor by which each round is larger than the last
+            policy: Password policy shared by all files; every stage drops
+                    candidates that violate it before verification
+            attack_plan: Run this plan's stages instead of one attack: every
+                         uncracked file gets a stage before any file gets the
+                         next; plan budgets cover the whole batch
+            governor: Resource governor (see governor.py); breadth-first
+                      rounds and worker batches shrink under its memory
+                      ceiling, and speed is also reported per assigned core
+            tracer: Timeline tracer (see tracing.py); every file's attacks
+                    and every worker's batches become spans, written to
+                    the tracer's file with the results
         """
         self.target_dirs = [Path(d) for d in target_dirs]
         self.wordlist = Path(wordlist)
         self.output_dir = Path(output_dir)
         self.max_workers = max_workers
+        self.file_workers = file_workers
+        self.backend = backend
+        self.resume = resume
+        self.autotune = autotune
+        self.potfile = potfile
+        self.propagate = propagate
+        self.adaptive = adaptive
+        self.adaptive_limit = adaptive_limit
+        self.breadth_first = breadth_first
+        self.first_round = first_round
+        self.round_growth = round_growth
+        self.policy = policy
+        self.attack_plan = attack_plan
+        self.governor = governor
+        self.tracer = tracer
+        self.restore_dir = self.output_dir / DEFAULT_RESTORE_DIR
+        
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown execution backend: {backend}")
         
         # Validate inputs
         for target_dir in self.target_dirs:
@@ -48,20 +133,55 @@ class BatchCracker:
         # Results storage
         self.results = {}
         self.start_time = None
+        self.checkpoint = None
+        self.journal = None
+        self.run_stamp = None
+        self.interrupted = False
+        
+        # Breadth-first position: candidates tried on every uncracked file
+        self.breadth_state = None
+        
+        # Structure of the passwords cracked so far
+        self.model = AdaptiveModel()
+        self._adaptive_tried = {}
+        self._adaptive_words = None
+        
+        # Per-file metrics plus the batch's own result I/O
+        self.registry = MetricsRegistry()
+        self.metrics = self.registry.register(Metrics('batch'))
+        self.metrics.tracer = tracer
+        self.exporter = None
+        if metrics_file is not None:
+            self.exporter = MetricsExporter(metrics_file, self.registry, metrics_interval)
         
     def find_target_files(self) -> List[Path]:
-        """Find all password-protected files in target directories"""
-        supported_extensions = ['.pdf', '.docx', '.xlsx', '.pptx', '.zip']
+        """
+        Find all password-protected files in target directories (by content, not extension)
+        
+        ZIP archives with nothing encrypted are drops: the targets inside them
+        (nested drops too) are returned as 'drop.zip!member' paths and cracked
+        in memory. A drop can also be given in place of a directory.
+        """
         target_files = []
         
         for target_dir in self.target_dirs:
-            for ext in supported_extensions:
-                target_files.extend(target_dir.glob(f'*{ext}'))
+            paths = target_dir.iterdir() if target_dir.is_dir() else [target_dir]
+            for path in paths:
+                file_type = file_type_for(str(path)) if path.is_file() else None
+                if file_type is None:
+                    continue
+                members = discover(path) if file_type == 'zip' else []
+                if members:
+                    target_files.extend(Path(member) for member in members)
+                elif not is_container(path):
+                    target_files.append(path)
         
         return sorted(target_files)
     
     def crack_single_file(self, file_path: Path, attack_type: str = 'dictionary',
-                         max_passwords: Optional[int] = None) -> Dict:
+                         max_passwords: Optional[int] = None,
+                         report_metrics: bool = False,
+                         workers: Optional[int] = None) -> Dict:
         """
         Crack a single file
         
@@ -69,6 +189,9 @@ class BatchCracker:
             file_path: Path to file
             attack_type: Type of attack to use
             max_passwords: Maximum passwords to try
+            report_metrics: Return the file's metrics under 'metrics' instead
+                            of registering them live (for worker processes)
+            workers: Verification workers for the file (default: see _file_cracker)
             
         Returns:
             Dictionary with results
@@ -84,7 +207,7 @@ class BatchCracker:
         }
         
         try:
-            cracker = PasswordCracker(str(file_path), verbose=False)
+            cracker = self._file_cracker(file_path, report_metrics, workers)
             start = time.time()
             
             if attack_type == 'dictionary':
@@ -98,8 +221,22 @@ class BatchCracker:
             
             result['attempts'] = cracker.attempts
             result['time'] = elapsed
+            if cracker.tuning:
+                result['tuning'] = cracker.tuning
+            if report_metrics:
+                result['metrics'] = cracker.metrics.snapshot()
+                if self.tracer is not None:
+                    result['trace'] = self.tracer.take()
             
-            if password:
+            if cracker.interrupted:
+                result['interrupted'] = True
+                print(f"⚠ {file_path.name}: Interrupted ({cracker.attempts:,} attempts so far)")
+            elif password and cracker.from_potfile:
+                result['success'] = True
+                result['password'] = password
+                result['potfile'] = True
+                print(f"✓ {file_path.name}: {password} (already in potfile)")
+            elif password:
                 result['success'] = True
                 result['password'] = password
                 print(f"✓ {file_path.name}: {password} ({cracker.attempts:,} attempts in {elapsed:.1f}s)")
@@ -112,6 +249,26 @@ class BatchCracker:
         
         return result
     
+    def _file_cracker(self, file_path: Path, report_metrics: bool = False,
+                      workers: Optional[int] = None) -> PasswordCracker:
+        """
+        PasswordCracker for one file, its metrics registered unless reported back
+        
+        It verifies on file_workers workers unless told otherwise; autotuned
+        files probe up to max_workers.
+        """
+        if workers is None:
+            workers = self.max_workers if self.autotune else self.file_workers
+        cracker = PasswordCracker(str(file_path), verbose=False,
+                                  restore_dir=str(self.restore_dir), resume=self.resume,
+                                  workers=workers, autotune=self.autotune,
+                                  metrics_exporter=None if report_metrics else self.exporter,
+                                  potfile=self.potfile, policy=self.policy,
+                                  governor=self.governor, tracer=self.tracer)
+        if not report_metrics:
+            self.registry.register(cracker.metrics)
+        return cracker
+    
     def crack_all_files(self, attack_type: str = 'dictionary', 
                        max_passwords: Optional[int] = None,
                        parallel: bool = False) -> Dict:
@@ -134,92 +291,664 @@ class BatchCracker:
         
         self.start_time = time.time()
         
+        pending = self._open_checkpoint(target_files, attack_type, max_passwords)
+        
+        # Each finished file is logged at once, so a crash loses nothing cracked
+        self.run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.journal = ResultsJournal(self.output_dir / f'results_{self.run_stamp}.jsonl')
+        for file_key, result in self.results.items():
+            self.journal.append(file_key, result)
+        
         print(f"\n{'='*80}")
         print(f"BATCH PASSWORD CRACKING")
         print(f"{'='*80}")
         print(f"Target directories: {[str(d) for d in self.target_dirs]}")
         print(f"Total files: {len(target_files)}")
+        print(f"Results journal: {self.journal.path}")
+        if len(pending) < len(target_files):
+            print(f"Resuming: {len(target_files) - len(pending)} files already done")
         print(f"Wordlist: {self.wordlist}")
-        print(f"Attack type: {attack_type}")
+        if self.attack_plan is not None:
+            print(f"Attack plan: {' -> '.join(stage_name(s) for s in self.attack_plan.stages)}")
+            parallel = False
+        else:
+            print(f"Attack type: {attack_type}")
+        if self.policy is not None:
+            print(f"Policy: {self.policy}")
         if max_passwords:
             print(f"Max passwords per file: {max_passwords:,}")
+        if self.adaptive:
+            print(f"Adaptive stage: up to {self.adaptive_limit:,} learned candidates per file")
+        if self.breadth_first and self.attack_plan is None:
+            print(f"Schedule: breadth-first, {self.first_round:,} candidates per file "
+                  f"in the first round, x{self.round_growth:g} per round")
+        elif self.autotune:
+            # Files share the machine badly; tune each one across all workers
+            parallel = False
+            print(f"Autotuning: up to {self.max_workers} workers per file")
         print(f"Parallel processing: {'Yes' if parallel else 'No'}")
         if parallel:
             print(f"Workers: {self.max_workers}")
+            print(f"Backend: {self._resolve_backend(target_files)}")
+        elif self.file_workers > 1 and not self.autotune:
+            print(f"Workers per file: {self.file_workers}")
+        if self.governor is not None:
+            print(f"Resources: {self.governor.describe()}")
         print(f"{'='*80}\n")
         
         # Crack files
-        if parallel:
-            self._crack_parallel(target_files, attack_type, max_passwords)
+        if self.attack_plan is not None:
+            self._crack_plan(pending)
+        elif self.breadth_first:
+            self._crack_breadth_first(pending, attack_type, max_passwords, parallel)
+        elif parallel:
+            self._crack_parallel(pending, attack_type, max_passwords)
         else:
-            self._crack_sequential(target_files, attack_type, max_passwords)
+            self._crack_sequential(pending, attack_type, max_passwords)
+        
+        if self.interrupted:
+            print(f"\n⚠ Batch interrupted by user. Resume with: --resume")
         
         # Save results
-        self._save_results()
+        with self.metrics.timed('results'):
+            self._save_results()
+        if self.exporter is not None:
+            self.exporter.write()
+        if self.tracer is not None:
+            print(f"  - {self.tracer.save()} (trace)")
         
         # Print summary
         self._print_summary()
         
         return self.results
     
+    def plan(self, attack_type: str = 'dictionary', max_passwords: Optional[int] = None,
+             parallel: bool = False, probe_time: float = 0.5) -> Dict:
+        """
+        Estimate the wall time to exhaust the attack on every file
+        
+        Args:
+            attack_type: Type of attack to use
+            max_passwords: Maximum passwords to try per file
+            parallel: Whether files would be cracked in parallel
+            probe_time: Seconds spent measuring each file's throughput
+            
+        Returns:
+            Dictionary with per-file estimates and the total wall time
+        """
+        target_files = self.find_target_files()
+        candidates = count_candidates(attack_type, str(self.wordlist), max_passwords=max_passwords,
+                                      index_dir=index_dir_for(str(self.restore_dir)))
+        
+        print(f"\n{'='*80}")
+        print(f"DRY RUN")
+        print(f"{'='*80}")
+        print(f"Total files: {len(target_files)}")
+        print(f"Attack type: {attack_type}")
+        print(f"Candidates per file: {candidates:,}")
+        print(f"{'='*80}\n")
+        
+        files = []
+        for file_path in target_files:
+            try:
+                rate = measure_rate(str(file_path), probe_time)
+            except Exception as e:
+                print(f"✗ {file_path.name}: Error - {e}")
+                continue
+            # Files run one at a time use their own workers (assumes linear scaling)
+            if self.autotune:
+                rate *= self.max_workers
+            elif not parallel:
+                rate *= self.file_workers
+            seconds = candidates / rate
+            files.append({'file': str(file_path), 'candidates': candidates,
+                          'rate': rate, 'seconds': seconds})
+            print(f"  {file_path.name:<40} {rate:>10.2f} pwd/s   {format_time(seconds)}")
+        
+        workers = self.max_workers if parallel and not self.autotune else 1
+        total = schedule_time([f['seconds'] for f in files], workers)
+        
+        print(f"\nEstimated wall time to exhaust: {format_time(total)}"
+              + (f" ({workers} workers)" if workers > 1 else ""))
+        print(f"(worst case: no password is found early)\n")
+        
+        return {'files': files, 'workers': workers, 'seconds': total}
+    
+    def profile(self, probe_time: float = 0.2) -> Dict:
+        """
+        Report every file's encryption, cost per guess and duplicate content
+        
+        Args:
+            probe_time: Seconds spent measuring each file's cost per guess
+            
+        Returns:
+            Report of target_profile.profile_targets (cheapest file first)
+        """
+        report = profile_targets(self.find_target_files(), probe_time)
+        print_profile(report)
+        return report
+    
+    def _open_checkpoint(self, target_files: List[Path], attack_type: str,
+                         max_passwords: Optional[int]) -> List[Path]:
+        """
+        Set up the batch restore file
+        
+        Returns:
+            Files still to crack (all of them unless resuming)
+        """
+        job = {
+            'target': 'batch',
+            'dirs': [str(d.resolve()) for d in self.target_dirs],
+            'wordlist': str(self.wordlist.resolve()),
+            'attack': attack_type,
+            'max_passwords': max_passwords,
+        }
+        if self.attack_plan is not None:
+            job['plan'] = self.attack_plan.to_dict()
+        elif self.breadth_first:
+            job['schedule'] = 'breadth_first'
+        if self.policy is not None:
+            job['policy'] = self.policy.describe()
+        self.checkpoint = Checkpoint(checkpoint_path(self.restore_dir, job), job)
+        
+        state = self.checkpoint.load() if self.resume else None
+        if state:
+            self.results.update(state.get('results', {}))
+            self.breadth_state = state.get('breadth')
+            for result in self.results.values():
+                if result.get('success'):
+                    self.model.add(result['password'])
+        
+        return [f for f in target_files if str(f) not in self.results]
+    
+    def _record_result(self, file_path: Path, result: Dict):
+        """Store a file's result and persist finished ones to the batch restore file"""
+        if result.get('interrupted'):
+            self.interrupted = True
+        
+        if 'metrics' in result:
+            self.registry.merge(result.pop('metrics'))
+        
+        self.results[str(file_path)] = result
+        if result.get('success'):
+            self.model.add(result['password'])
+        if self.journal is not None and not result.get('interrupted'):
+            self.journal.append(str(file_path), result)
+        
+        self._save_checkpoint()
+        
+        if self.exporter is not None:
+            self.exporter.maybe_write()
+    
+    def _save_checkpoint(self):
+        """Persist finished results (and the breadth-first position) to the batch restore file"""
+        with self.metrics.timed('results'):
+            done = {k: r for k, r in self.results.items() if not r.get('interrupted')}
+            state = {'results': done}
+            if self.breadth_state is not None:
+                state['breadth'] = self.breadth_state
+            self.checkpoint.save(state)
+    
+    def _is_cracked(self, file_path: Path) -> bool:
+        return bool(self.results.get(str(file_path), {}).get('success'))
+    
+    def _try_guesses(self, target: Path, guesses: Iterable[str], attack: str, **extra) -> Optional[Dict]:
+        """
+        Verify a short list of guesses on a file outside the main attack
+        
+        A hit is recorded like any other result and added to the potfile.
+        
+        Args:
+            target: File to try
+            guesses: Candidates, most likely first (list or CandidateBatch)
+            attack: Stage name for metrics, results and the potfile
+            **extra: Additional result fields
+            
+        Returns:
+            The result if a guess was correct, else None
+        """
+        if self.policy is not None:
+            guesses = list(self.policy.filter(guesses))
+            if not guesses:
+                return None
+        try:
+            verifier = create_verifier(str(target))
+        except Exception:
+            return None
+        
+        start = time.time()
+        hit = verifier.verify_batch(guesses)
+        elapsed = time.time() - start
+        attempts = guesses.index(hit) + 1 if hit else len(guesses)
+        self.metrics.guesses(attempts)
+        self.metrics.add_time(attack, elapsed)
+        if self.tracer is not None:
+            self.tracer.add(attack, time.perf_counter() - elapsed, elapsed,
+                            args={'file': target.name, 'guesses': len(guesses)})
+        if not hit:
+            return None
+        return self._record_hit(target, verifier, hit, attempts, elapsed, attack, **extra)
+    
+    def _record_hit(self, target: Path, verifier, password: str, attempts: int, elapsed: float,
+                    attack: str, **extra) -> Dict:
+        """Record a password found by the batch itself and add it to the potfile"""
+        result = {
+            'file': str(target),
+            'filename': target.name,
+            'success': True,
+            'password': password,
+            'attempts': attempts,
+            'time': elapsed,
+            'error': None,
+            'attack': attack
+        }
+        result.update(extra)
+        self._record_result(target, result)
+        if self.potfile is not None:
+            Potfile(self.potfile).add(content_hash(str(target)), password, target.name,
+                                      verifier.file_type, attack, attempts, elapsed)
+        return result
+    
+    def _propagate(self, file_path: Path, password: str, remaining: List[Path]) -> List[Path]:
+        """
+        Try a cracked password and its neighborhood on the remaining files
+        
+        Files cracked this way propagate their own password in turn.
+        
+        Args:
+            file_path: File the password was found for
+            password: Its password
+            remaining: Files not attacked yet
+            
+        Returns:
+            Files cracked by propagation
+        """
+        cracked = []
+        queue = [(file_path, password)]
+        while queue:
+            source, password = queue.pop(0)
+            # Encoded once, whichever targets check it
+            guesses = CandidateBatch.from_passwords(neighborhood(password))
+            
+            for target in remaining:
+                if self._is_cracked(target):
+                    continue
+                result = self._try_guesses(target, guesses, 'propagation',
+                                           propagated_from=str(source))
+                if result:
+                    print(f"✓ {target.name}: {result['password']} "
+                          f"(reused from {source.name}, {result['attempts']} attempts)")
+                    cracked.append(target)
+                    queue.append((target, result['password']))
+        
+        return cracked
+    
+    def _adaptive_attack(self, file_path: Path) -> Optional[Dict]:
+        """
+        Try candidates learned from the batch's cracked passwords on a file
+        
+        Candidates already tried on this file by an earlier, smaller model
+        are skipped, so calling this after every crack only tries new ones.
+        
+        Returns:
+            The result if the file cracked, else None
+        """
+        if not len(self.model):
+            return None
+        
+        if self._adaptive_words is None:
+            self._adaptive_words = []
+            with open(self.wordlist, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    if len(self._adaptive_words) >= self.ADAPTIVE_WORDS:
+                        break
+                    if line.strip():
+                        self._adaptive_words.append(line.strip())
+        
+        tried = self._adaptive_tried.setdefault(str(file_path), set())
+        guesses = [c for c in self.model.candidates(self._adaptive_words, self.adaptive_limit)
+                   if c not in tried]
+        if not guesses:
+            return None
+        tried.update(guesses)
+        
+        learned = len(self.model)
+        result = self._try_guesses(file_path, guesses, 'adaptive', learned_from=learned)
+        if result:
+            print(f"✓ {file_path.name}: {result['password']} (adaptive, "
+                  f"{result['attempts']} attempts, learned from {learned} passwords)")
+        return result
+    
+    def _exploit_crack(self, file_path: Path, password: str, remaining: List[Path]) -> List[Path]:
+        """
+        Use a fresh crack on files not attacked yet: reuse, then adaptive guesses
+        
+        Returns:
+            Files cracked
+        """
+        cracked = []
+        if self.propagate:
+            cracked += self._propagate(file_path, password, remaining)
+        if self.adaptive:
+            for target in remaining:
+                if self._is_cracked(target):
+                    continue
+                result = self._adaptive_attack(target)
+                if result:
+                    cracked.append(target)
+                    if self.propagate:
+                        cracked += self._propagate(target, result['password'], remaining)
+        return cracked
+    
     def _crack_sequential(self, target_files: List[Path], attack_type: str,
                          max_passwords: Optional[int]):
         """Crack files sequentially"""
         for i, file_path in enumerate(target_files, 1):
+            if self._is_cracked(file_path):
+                continue
             print(f"\n[{i}/{len(target_files)}] Cracking {file_path.name}...")
-            result = self.crack_single_file(file_path, attack_type, max_passwords)
-            self.results[str(file_path)] = result
+            
+            # The model is freshest right before each file's attack
+            result = self._adaptive_attack(file_path) if self.adaptive else None
+            if result is None:
+                result = self.crack_single_file(file_path, attack_type, max_passwords)
+                self._record_result(file_path, result)
+            
+            if self.interrupted:
+                break
+            
+            if self.propagate and result.get('success'):
+                self._propagate(file_path, result['password'], target_files[i:])
+    
+    def _candidate_stream(self, attack_type: str) -> Iterator[str]:
+        """Every candidate of the attack the policy allows, in wordlist (frequency) order"""
+        stream = self._wordlist_candidates(attack_type)
+        return stream if self.policy is None else self.policy.filter(stream)
+    
+    def _wordlist_candidates(self, attack_type: str) -> Iterator[str]:
+        with open(self.wordlist, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                word = line.strip()
+                if not word:
+                    continue
+                if attack_type == 'dictionary':
+                    yield word
+                elif attack_type == 'hybrid':
+                    # Same order as PasswordCracker.hybrid_attack
+                    for mutation in DEFAULT_MUTATIONS:
+                        yield word + mutation
+                        yield mutation + word
+                else:
+                    raise ValueError(f"Unsupported attack type: {attack_type}")
+    
+    def _crack_breadth_first(self, target_files: List[Path], attack_type: str,
+                             max_passwords: Optional[int], parallel: bool):
+        """
+        Crack files breadth-first: each round tries the next chunk of
+        candidates on every uncracked file, chunks growing geometrically
+        
+        Easy files crack in the first rounds instead of waiting behind a file
+        whose whole wordlist has to be exhausted. The wordlist is read once;
+        each chunk is shared by all files.
+        """
+        verifiers = {}
+        for file_path in target_files:
+            try:
+                verifiers[file_path] = create_verifier(str(file_path))
+            except Exception as e:
+                print(f"✗ {file_path.name}: Error - {e}")
+                self._record_result(file_path, {'file': str(file_path), 'filename': file_path.name,
+                                                'success': False, 'password': None, 'attempts': 0,
+                                                'time': 0, 'error': str(e)})
+        
+        if self.potfile is not None:
+            potfile = Potfile(self.potfile)
+            for file_path, verifier in verifiers.items():
+                password = check_potfile(potfile, verifier, content_hash(str(file_path)))
+                if password:
+                    print(f"✓ {file_path.name}: {password} (already in potfile)")
+                    self._record_result(file_path, {'file': str(file_path), 'filename': file_path.name,
+                                                    'success': True, 'password': password,
+                                                    'attempts': 0, 'time': 0, 'error': None,
+                                                    'potfile': True})
+        
+        state = self.breadth_state or {'index': 0, 'size': self.first_round}
+        position, size = state['index'], state['size']
+        total = count_candidates(attack_type, str(self.wordlist), max_passwords=max_passwords,
+                                 index_dir=index_dir_for(str(self.restore_dir)))
+        stream = itertools.islice(self._candidate_stream(attack_type), position, total)
+        seconds = {file_path: 0.0 for file_path in verifiers}
+        
+        backend = self._resolve_backend(list(verifiers)) if parallel else 'inline'
+        with create_executor(backend, self.max_workers) as executor:
+            while position < total:
+                remaining = [f for f in verifiers if not self._is_cracked(f)]
+                if not remaining:
+                    break
+                chunk_size = min(size, total - position)
+                if self.governor is not None:
+                    # The previous round's chunk is released by now
+                    self.governor.wait_for_memory()
+                    chunk_size = self.governor.batch_size(chunk_size)
+                with self.metrics.timed('generate'):
+                    chunk = CandidateBatch.from_passwords(
+                        itertools.islice(stream, chunk_size))
+                if not len(chunk):
+                    break
+                print(f"\nCandidates {position + 1:,}-{position + len(chunk):,} "
+                      f"on {len(remaining)} files...")
+                
+                # Every file reads the same chunk: workers map it instead of copying
+                if backend == 'processes':
+                    chunk.share()
+                if self.tracer is not None:
+                    futures = {self.tracer.submit(executor, timed_verify_batch, verifiers[f], chunk): f
+                               for f in remaining}
+                else:
+                    futures = {executor.submit(timed_verify_batch, verifiers[f], chunk): f
+                               for f in remaining}
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        file_path = futures[future]
+                        if self.tracer is not None:
+                            hit, elapsed = self.tracer.unwrap('verify', future.result(),
+                                                              file=file_path.name,
+                                                              passwords=len(chunk))
+                        else:
+                            hit, elapsed = future.result()
+                        seconds[file_path] += elapsed
+                        tried = chunk.index(hit) + 1 if hit else len(chunk)
+                        self.metrics.guesses(tried)
+                        self.metrics.add_time('verify', elapsed)
+                        if not hit or self._is_cracked(file_path):
+                            continue
+                        
+                        attempts = position + tried
+                        print(f"✓ {file_path.name}: {hit} ({attempts:,} attempts)")
+                        self._record_hit(file_path, verifiers[file_path], hit, attempts,
+                                         seconds[file_path], attack_type)
+                        waiting = [f for f in verifiers if not self._is_cracked(f)]
+                        self._exploit_crack(file_path, hit, waiting)
+                except KeyboardInterrupt:
+                    # The interrupted round is repeated on resume
+                    self.interrupted = True
+                    for future in futures:
+                        future.cancel()
+                    break
+                finally:
+                    chunk.unlink()
+                
+                position += len(chunk)
+                size = int(size * self.round_growth)
+                self.breadth_state = {'index': position, 'size': size}
+                self._save_checkpoint()
+        
+        if self.interrupted:
+            return
+        for file_path in verifiers:
+            if str(file_path) not in self.results:
+                print(f"✗ {file_path.name}: Failed ({position:,} attempts in {seconds[file_path]:.1f}s)")
+                self._record_result(file_path, {'file': str(file_path), 'filename': file_path.name,
+                                                'success': False, 'password': None,
+                                                'attempts': position, 'time': seconds[file_path],
+                                                'error': None})
+    
+    def _crack_plan(self, target_files: List[Path]):
+        """
+        Escalate through the attack plan stage by stage across all files
+        
+        Every uncracked file runs a stage before any file runs the next, so
+        cheap stages crack what they can everywhere first. The plan's time
+        and guess budgets are shared by the whole batch; a stage's own
+        budgets apply to each file. The reuse stage tries every password
+        cracked in the batch so far.
+        """
+        plan = self.attack_plan
+        deadline = time.time() + plan.seconds if plan.seconds is not None else None
+        used = 0
+        crackers = {}
+        reports = {file_path: [] for file_path in target_files}
+        
+        for n, stage in enumerate(plan.stages, 1):
+            waiting = [f for f in target_files if str(f) not in self.results]
+            if not waiting:
+                break
+            print(f"\n>>> Stage {n}/{len(plan.stages)}: {stage_name(stage)} ({len(waiting)} files)")
+            
+            for file_path in waiting:
+                if str(file_path) in self.results:
+                    # Cracked by propagation earlier in this stage
+                    continue
+                if file_path not in crackers:
+                    try:
+                        crackers[file_path] = self._file_cracker(file_path)
+                    except Exception as e:
+                        print(f"✗ {file_path.name}: Error - {e}")
+                        self._record_result(file_path, {'file': str(file_path), 'filename': file_path.name,
+                                                        'success': False, 'password': None, 'attempts': 0,
+                                                        'time': 0, 'error': str(e)})
+                        continue
+                cracker = crackers[file_path]
+                
+                known = [r['password'] for r in self.results.values() if r.get('success')]
+                remaining = plan.guesses - used if plan.guesses is not None else None
+                start = time.time()
+                password, status = run_stage(cracker, stage, known, deadline, remaining)
+                elapsed = time.time() - start
+                used += cracker.attempts
+                reports[file_path].append({'stage': stage_name(stage), 'status': status,
+                                           'attempts': cracker.attempts, 'time': elapsed})
+                
+                if status == 'interrupted':
+                    # Finished stages are repeated on resume; the interrupted one continues
+                    self.interrupted = True
+                    print(f"⚠ {file_path.name}: Interrupted during {stage_name(stage)}")
+                    return
+                if password is None:
+                    continue
+                
+                stages = reports[file_path]
+                result = {'file': str(file_path), 'filename': file_path.name, 'success': True,
+                          'password': password, 'attempts': sum(r['attempts'] for r in stages),
+                          'time': sum(r['time'] for r in stages), 'error': None,
+                          'stage': stage_name(stage), 'stages': stages}
+                if cracker.from_potfile:
+                    result['potfile'] = True
+                print(f"✓ {file_path.name}: {password} ({stage_name(stage)}, "
+                      f"{cracker.attempts:,} attempts in {elapsed:.1f}s)")
+                self._record_result(file_path, result)
+                self._exploit_crack(file_path, password,
+                                    [f for f in target_files if str(f) not in self.results])
+            
+            if deadline is not None and time.time() >= deadline:
+                print(f"\n✗ Plan time budget used up")
+                break
+            if plan.guesses is not None and used >= plan.guesses:
+                print(f"\n✗ Plan guess budget used up")
+                break
+        
+        for file_path in target_files:
+            if str(file_path) not in self.results:
+                stages = reports[file_path]
+                attempts = sum(r['attempts'] for r in stages)
+                seconds = sum(r['time'] for r in stages)
+                print(f"✗ {file_path.name}: Failed ({attempts:,} attempts in {seconds:.1f}s)")
+                self._record_result(file_path, {'file': str(file_path), 'filename': file_path.name,
+                                                'success': False, 'password': None,
+                                                'attempts': attempts, 'time': seconds,
+                                                'error': None, 'stages': stages})
+    
+    def _resolve_backend(self, target_files: List[Path]) -> str:
+        """Resolve 'auto' to a concrete backend for these files"""
+        if self.backend != 'auto':
+            return self.backend
+        
+        verifiers = [verifier_class_for(f) for f in target_files]
+        return select_backend([v for v in verifiers if v is not None],
+                              self.max_workers, len(target_files))
     
     def _crack_parallel(self, target_files: List[Path], attack_type: str,
                        max_passwords: Optional[int]):
         """Crack files in parallel"""
         from functools import partial
         
+        # The files are the parallelism: a pool per file would nest pools
         crack_func = partial(self.crack_single_file, 
                            attack_type=attack_type,
-                           max_passwords=max_passwords)
+                           max_passwords=max_passwords,
+                           workers=1)
+        
+        backend = self._resolve_backend(target_files)
+        if backend == 'processes':
+            crack_func = partial(crack_func, report_metrics=True)
         
-        with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+        with create_executor(backend, self.max_workers) as executor:
             futures = {executor.submit(crack_func, f): f for f in target_files}
             
-            for future in concurrent.futures.as_completed(futures):
-                file_path = futures[future]
-                try:
-                    result = future.result()
-                    self.results[str(file_path)] = result
-                except Exception as e:
-                    print(f"✗ {file_path.name}: Exception - {e}")
-                    self.results[str(file_path)] = {
-                        'file': str(file_path),
-                        'filename': file_path.name,
-                        'success': False,
-                        'error': str(e)
-                    }
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    file_path = futures[future]
+                    if future.cancelled():
+                        continue
+                    try:
+                        result = future.result()
+                        if 'trace' in result:
+                            self.tracer.merge(result.pop('trace'))
+                        if self._is_cracked(file_path):
+                            # Already cracked by propagation while this one ran
+                            if 'metrics' in result:
+                                self.registry.merge(result.pop('metrics'))
+                            continue
+                        self._record_result(file_path, result)
+                        
+                        if result.get('success'):
+                            waiting = {futures[f]: f for f in futures if not f.done()}
+                            for cracked in self._exploit_crack(file_path, result['password'],
+                                                               list(waiting)):
+                                waiting[cracked].cancel()
+                    except Exception as e:
+                        print(f"✗ {file_path.name}: Exception - {e}")
+                        self._record_result(file_path, {
+                            'file': str(file_path),
+                            'filename': file_path.name,
+                            'success': False,
+                            'error': str(e)
+                        })
+            except KeyboardInterrupt:
+                # Workers save their own restore files when interrupted
+                self.interrupted = True
+                for future in futures:
+                    future.cancel()
     
     def _save_results(self):
-        """Save results to JSON and text files"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # Save JSON results
-        json_file = self.output_dir / f'results_{timestamp}.json'
-        with open(json_file, 'w') as f:
-            json.dump(self.results, f, indent=2)
-        
-        # Save cracked passwords to text file
-        passwords_file = self.output_dir / f'cracked_passwords_{timestamp}.txt'
-        with open(passwords_file, 'w') as f:
-            f.write("CRACKED PASSWORDS\n")
-            f.write("="*80 + "\n\n")
-            
-            for file_path, result in self.results.items():
-                if result.get('success'):
-                    f.write(f"File: {result['filename']}\n")
-                    f.write(f"Password: {result['password']}\n")
-                    f.write(f"Attempts: {result['attempts']:,}\n")
-                    f.write(f"Time: {result['time']:.2f}s\n")
-                    f.write("-" * 80 + "\n")
+        """Close the results journal and compact it into the JSON and text summaries"""
+        if self.journal is not None:
+            self.journal.close()
+        json_file, passwords_file = write_summaries(self.results, self.output_dir, self.run_stamp)
         
         print(f"\n✓ Results saved:")
+        if self.journal is not None:
+            print(f"  - {self.journal.path}")
         print(f"  - {json_file}")
         print(f"  - {passwords_file}")
     
@@ -235,12 +964,24 @@ class BatchCracker:
         print(f"SUMMARY")
         print(f"{'='*80}")
         print(f"Total files: {total_files}")
-        print(f"✓ Cracked: {successful} ({successful/total_files*100:.1f}%)")
-        print(f"✗ Failed: {failed} ({failed/total_files*100:.1f}%)")
+        if total_files:
+            print(f"✓ Cracked: {successful} ({successful/total_files*100:.1f}%)")
+            print(f"✗ Failed: {failed} ({failed/total_files*100:.1f}%)")
         print(f"Total attempts: {total_attempts:,}")
         print(f"Total time: {self._format_time(total_time)}")
         if total_time > 0:
             print(f"Average speed: {total_attempts/total_time:.2f} passwords/sec")
+            if self.governor is not None:
+                print(f"Per core: {self.governor.per_core(total_attempts/total_time):.2f} "
+                      f"passwords/sec ({self.governor.core_count} cores)")
+        if self.governor is not None and (self.governor.shrunk or self.governor.paused):
+            print(f"Memory ceiling: batches shrunk {self.governor.shrunk:,} times, "
+                  f"generation paused {self._format_time(self.governor.paused)}")
+        if self.adaptive and len(self.model):
+            learned = self.model.summary(top=3)
+            print(f"Learned from {learned['passwords']} passwords: "
+                  f"masks {[m for m, _ in learned['masks']]}, "
+                  f"suffixes {[s for s, _ in learned['suffixes']]}")
         print(f"{'='*80}\n")
         
         # List cracked files
@@ -293,16 +1034,89 @@ def main():
                        help='Use parallel processing')
     parser.add_argument('--workers', type=int, default=4,
                        help='Number of parallel workers')
+    parser.add_argument('--file-workers', type=int, default=1,
+                       help='Verification workers per file when files run one at a time')
+    parser.add_argument('--backend', choices=BACKENDS, default='auto',
+                       help='Execution backend for parallel mode (auto picks per verifier)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip finished files and continue interrupted ones')
+    parser.add_argument('--autotune', action='store_true',
+                       help='Tune backend, workers and batch size per file (files run one at a time)')
+    parser.add_argument('--metrics-file',
+                       help='Periodically write metrics here (.json for JSON, else Prometheus text)')
+    parser.add_argument('--metrics-interval', type=float, default=10.0,
+                       help='Seconds between metrics snapshots')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Only estimate the wall time for the whole batch')
+    parser.add_argument('--profile', action='store_true',
+                       help="Only report each file's encryption, cost per guess and duplicates")
+    parser.add_argument('--potfile', default=DEFAULT_POTFILE,
+                       help='Database of cracked files, checked before attacking')
+    parser.add_argument('--no-potfile', action='store_true',
+                       help='Neither consult nor update the potfile')
+    parser.add_argument('--no-propagate', action='store_true',
+                       help="Don't try cracked passwords on the remaining files first")
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Try guesses learned from passwords cracked so far before each file')
+    parser.add_argument('--adaptive-limit', type=int, default=1000,
+                       help='Maximum learned guesses per file and update')
+    parser.add_argument('--breadth-first', action='store_true',
+                       help='Try the first candidates on every file before the next ones')
+    parser.add_argument('--first-round', type=int, default=1000,
+                       help='Candidates per file in the first breadth-first round')
+    parser.add_argument('--round-growth', type=float, default=4.0,
+                       help='Growth factor of breadth-first rounds')
+    parser.add_argument('--policy',
+                       help="Password policy of the files, e.g. 'min=12,require=lud,allow=luds'")
+    parser.add_argument('--plan',
+                       help="Attack plan (JSON file, or 'default') run stage by stage "
+                            "across all files; overrides --type")
+    parser.add_argument('--trace',
+                       help='Write a timeline of the run here (Chrome trace JSON, for Perfetto)')
+    add_resource_arguments(parser)
     
     args = parser.parse_args()
+    governor = apply_resource_arguments(parser, args)
+    
+    attack_plan = None
+    if args.plan:
+        attack_plan = (AttackPlan.default(args.wordlist) if args.plan == 'default'
+                       else AttackPlan.load(args.plan))
+        if args.dry_run:
+            parser.error("--dry-run estimates a single attack; it does not support --plan")
     
     cracker = BatchCracker(
         args.dirs,
         args.wordlist,
         output_dir=args.output,
-        max_workers=args.workers
+        max_workers=args.workers,
+        file_workers=args.file_workers,
+        backend=args.backend,
+        resume=args.resume,
+        autotune=args.autotune,
+        metrics_file=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        potfile=None if args.no_potfile else args.potfile,
+        propagate=not args.no_propagate,
+        adaptive=args.adaptive,
+        adaptive_limit=args.adaptive_limit,
+        breadth_first=args.breadth_first,
+        first_round=args.first_round,
+        round_growth=args.round_growth,
+        policy=PasswordPolicy.parse(args.policy) if args.policy else None,
+        attack_plan=attack_plan,
+        governor=governor,
+        tracer=Tracer(args.trace) if args.trace else None
     )
     
+    if args.profile:
+        cracker.profile()
+        sys.exit(0)
+    
+    if args.dry_run:
+        cracker.plan(attack_type=args.type, max_passwords=args.max, parallel=args.parallel)
+        sys.exit(0)
+    
     results = cracker.crack_all_files(
         attack_type=args.type,
         max_passwords=args.max,
@@ -0,0 +1,288 @@
+"""
+Cracking Benchmark
+Measures verifier throughput and time-to-crack on locally generated fixtures
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cracker import PasswordCracker
+from executor import VerifierPool
+from fixtures import DEFAULT_PASSWORD, FIXTURES, generate_fixtures
+from verifiers import create_verifier
+
+DEFAULT_BATCH_SIZES = [1, 16, 64]
+DEFAULT_BACKENDS = ['inline', 'threads', 'processes']
+
+
+def _library_versions() -> Dict[str, Optional[str]]:
+    """Versions of the format libraries the numbers depend on"""
+    versions = {}
+    for name in ('pikepdf', 'msoffcrypto', 'cryptography'):
+        try:
+            module = __import__(name)
+            versions[name] = getattr(module, '__version__', 'unknown')
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+def measure_throughput(target_file: str, backend: str, workers: int, batch_size: int,
+                       duration: float) -> Dict:
+    """
+    Measure wrong-password guesses per second
+
+    Args:
+        target_file: Fixture to attack
+        backend: 'inline', 'threads' or 'processes'
+        workers: Number of workers
+        batch_size: Passwords per batch
+        duration: Seconds to keep submitting batches (at least one batch runs)
+
+    Returns:
+        Dictionary with guesses, seconds and rate
+    """
+    verifier = create_verifier(target_file)
+    pool = VerifierPool(verifier, backend, workers)
+    guesses = 0
+    try:
+        pool.warm_up()
+        start = time.perf_counter()
+        counter = 0
+        inflight = []
+
+        while True:
+            # Keep every worker busy with one batch queued behind it
+            while (len(inflight) < 2 * pool.max_workers
+                   and (counter == 0 or time.perf_counter() - start < duration)):
+                batch = [f'wrong{counter + i:08d}' for i in range(batch_size)]
+                counter += batch_size
+                inflight.append(pool.submit(batch))
+
+            if not inflight:
+                break
+            inflight.pop(0).result()
+            guesses += batch_size
+
+        seconds = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+    return {
+        'guesses': guesses,
+        'seconds': round(seconds, 4),
+        'rate': round(guesses / seconds, 2) if seconds > 0 else None,
+    }
+
+
+def measure_time_to_crack(target_file: str, password: str, position: int,
+                          work_dir: Path) -> Dict:
+    """
+    Time a dictionary attack whose wordlist has the password at a known position
+
+    Args:
+        target_file: Fixture to attack
+        password: Fixture password
+        position: 1-based wordlist line holding the password
+        work_dir: Directory for the generated wordlist
+
+    Returns:
+        Dictionary with found, attempts, seconds and rate
+    """
+    wordlist = work_dir / f'wordlist-{position}.txt'
+    if not wordlist.exists():
+        with open(wordlist, 'w', encoding='utf-8') as f:
+            for i in range(1, position):
+                f.write(f'decoy{i:08d}\n')
+            f.write(f'{password}\n')
+
+    cracker = PasswordCracker(target_file, verbose=False)
+    start = time.perf_counter()
+    found = cracker.dictionary_attack(str(wordlist))
+    seconds = time.perf_counter() - start
+
+    return {
+        'position': position,
+        'found': found == password,
+        'attempts': cracker.attempts,
+        'seconds': round(seconds, 4),
+        'rate': round(cracker.attempts / seconds, 2) if seconds > 0 else None,
+    }
+
+
+def run_benchmark(fixture_names: List[str], backends: List[str], batch_sizes: List[int],
+                  workers: int, duration: float, position: int,
+                  fixtures_dir: Optional[str] = None, verbose: bool = True) -> Dict:
+    """
+    Run the benchmark suite
+
+    Args:
+        fixture_names: Fixtures to benchmark
+        backends: Backends to measure
+        batch_sizes: Batch sizes to measure
+        workers: Workers for the threads and processes backends
+        duration: Seconds per throughput measurement
+        position: Wordlist position of the password for time-to-crack
+        fixtures_dir: Where to generate fixtures (default: a temporary directory)
+        verbose: Whether to print progress
+
+    Returns:
+        Machine-readable results
+    """
+    temp_dir = None
+    if fixtures_dir is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix='bench-')
+        fixtures_dir = temp_dir.name
+    work_dir = Path(fixtures_dir)
+
+    results = {
+        'generated_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'libraries': _library_versions(),
+        },
+        'settings': {
+            'backends': backends,
+            'batch_sizes': batch_sizes,
+            'workers': workers,
+            'duration': duration,
+            'position': position,
+        },
+        'fixtures': {},
+    }
+
+    try:
+        fixtures = generate_fixtures(fixtures_dir, DEFAULT_PASSWORD, fixture_names)
+
+        for name, fixture in fixtures.items():
+            entry = results['fixtures'][name] = {'throughput': []}
+            if 'error' in fixture:
+                entry['error'] = fixture['error']
+                if verbose:
+                    print(f"⚠ {name}: skipped ({fixture['error']})")
+                continue
+
+            if verbose:
+                print(f"\n{name}")
+
+            for backend in backends:
+                backend_workers = 1 if backend == 'inline' else workers
+                for batch_size in batch_sizes:
+                    sample = measure_throughput(fixture['path'], backend, backend_workers,
+                                                batch_size, duration)
+                    sample.update({'backend': backend, 'workers': backend_workers,
+                                   'batch_size': batch_size})
+                    entry['throughput'].append(sample)
+                    if verbose:
+                        print(f"  {backend:<10} workers={backend_workers:<3} batch={batch_size:<5} "
+                              f"{sample['rate']:>12,.2f} guesses/sec")
+
+            entry['time_to_crack'] = measure_time_to_crack(fixture['path'], DEFAULT_PASSWORD,
+                                                           position, work_dir)
+            if verbose:
+                ttc = entry['time_to_crack']
+                status = '✓' if ttc['found'] else '✗'
+                print(f"  {status} time to crack at position {position:,}: {ttc['seconds']:.2f}s "
+                      f"({ttc['attempts']:,} attempts)")
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    return results
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Find throughput regressions against a baseline run
+
+    Args:
+        current: Results of this run
+        baseline: Results of an earlier run
+        tolerance: Fractional slowdown allowed before reporting
+
+    Returns:
+        One message per regressed measurement
+    """
+    regressions = []
+    for name, entry in current['fixtures'].items():
+        base_entry = baseline.get('fixtures', {}).get(name, {})
+        base_rates = {(s['backend'], s['workers'], s['batch_size']): s['rate']
+                      for s in base_entry.get('throughput', [])}
+
+        for sample in entry.get('throughput', []):
+            key = (sample['backend'], sample['workers'], sample['batch_size'])
+            base_rate = base_rates.get(key)
+            if base_rate and sample['rate'] is not None and sample['rate'] < base_rate * (1 - tolerance):
+                regressions.append(
+                    f"{name} {key[0]} workers={key[1]} batch={key[2]}: "
+                    f"{sample['rate']:,.2f} vs {base_rate:,.2f} guesses/sec "
+                    f"({(1 - sample['rate'] / base_rate) * 100:.0f}% slower)")
+    return regressions
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark password verification on generated fixtures')
+    parser.add_argument('-f', '--fixtures', nargs='+', choices=list(FIXTURES), default=list(FIXTURES),
+                        help='Fixtures to benchmark (default: all)')
+    parser.add_argument('--backends', nargs='+', choices=DEFAULT_BACKENDS, default=DEFAULT_BACKENDS,
+                        help='Backends to measure')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=DEFAULT_BATCH_SIZES,
+                        help='Batch sizes to measure')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Workers for the threads and processes backends')
+    parser.add_argument('--duration', type=float, default=2.0,
+                        help='Seconds per throughput measurement')
+    parser.add_argument('--position', type=int, default=100,
+                        help='Wordlist position of the password for time-to-crack')
+    parser.add_argument('--fixtures-dir',
+                        help='Keep the generated fixtures in this directory')
+    parser.add_argument('-o', '--output', default='benchmark.json',
+                        help='JSON results file')
+    parser.add_argument('--compare',
+                        help='Earlier results file to check for throughput regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Fractional slowdown allowed by --compare')
+
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"CRACKING BENCHMARK")
+    print(f"{'='*60}")
+    print(f"Fixtures: {', '.join(args.fixtures)}")
+    print(f"Backends: {', '.join(args.backends)} (workers: {args.workers})")
+    print(f"Batch sizes: {args.batch_sizes}")
+    print(f"{'='*60}")
+
+    results = run_benchmark(args.fixtures, args.backends, args.batch_sizes, args.workers,
+                            args.duration, args.position, fixtures_dir=args.fixtures_dir)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results saved: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n✗ {len(regressions)} throughput regressions against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"✓ No throughput regressions against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Candidate Batches
+Candidates in one contiguous buffer, encoded once per batch and shared across targets
+"""
+
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Optional: matrix() for vectorized prefilters
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bytes per offset (array 'I'; a batch holds well under 4 GiB)
+OFFSET_SIZE = array('I').itemsize
+
+
+def _encode(password: str, encoding: str) -> Optional[bytes]:
+    try:
+        return password.encode(encoding)
+    except UnicodeEncodeError:
+        return None
+
+
+def _attach_shared(name: str):
+    try:
+        # Only the creator unlinks the segment
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+def _attach_batch(name: str, count: int) -> 'CandidateBatch':
+    """Unpickle a shared batch: map the segment, copy only the offsets"""
+    shm = _attach_shared(name)
+    header = OFFSET_SIZE * (count + 1)
+    offsets = array('I')
+    offsets.frombytes(bytes(shm.buf[:header]))
+    batch = CandidateBatch(None, offsets)
+    batch._shm = shm
+    return batch
+
+
+class CandidateBatch:
+    """
+    Candidates as one UTF-8 buffer plus an offsets array
+
+    Each byte form a verifier asks for (see Verifier.encoding) is built once
+    per batch and then shared by every target checking the batch. After
+    share() the buffer lives in shared memory and pickling the batch sends
+    only the segment's name, so worker processes read the candidates in
+    place instead of receiving a copy.
+    """
+
+    def __init__(self, buffer: Optional[bytes], offsets: array):
+        """
+        Args:
+            buffer: UTF-8 candidates back to back (None when attached to
+                    shared memory)
+            offsets: len(batch) + 1 offsets into buffer
+        """
+        self._buffer = buffer
+        self._offsets = offsets
+        self._shm = None
+        self._owner = False
+        self._passwords = None
+        self._encodings = {}
+
+    @classmethod
+    def from_passwords(cls, passwords: Iterable[str]) -> 'CandidateBatch':
+        passwords = list(passwords)
+        encoded = [p.encode('utf-8') for p in passwords]
+        offsets = array('I', [0])
+        total = 0
+        for data in encoded:
+            total += len(data)
+            offsets.append(total)
+
+        batch = cls(b''.join(encoded), offsets)
+        batch._passwords = passwords
+        batch._encodings['utf-8'] = encoded
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _slice(self, i: int) -> bytes:
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        if self._buffer is not None:
+            return self._buffer[start:stop]
+        base = OFFSET_SIZE * len(self._offsets)
+        return bytes(self._shm.buf[base + start:base + stop])
+
+    def passwords(self) -> List[str]:
+        """The candidates as strings (decoded once)"""
+        if self._passwords is None:
+            self._passwords = [data.decode('utf-8') for data in self.encoded('utf-8')]
+        return self._passwords
+
+    def __getitem__(self, i: int) -> str:
+        return self.passwords()[i]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.passwords())
+
+    def index(self, password: str) -> int:
+        return self.passwords().index(password)
+
+    def encoded(self, encoding: str) -> List[Optional[bytes]]:
+        """
+        Every candidate in one byte form, built on first use
+
+        Args:
+            encoding: Python codec name ('utf-8', 'utf-16-le', 'latin-1', ...)
+
+        Returns:
+            One bytes object per candidate; None where a candidate cannot be
+            encoded (e.g. non-Latin-1 characters for 'latin-1')
+        """
+        forms = self._encodings.get(encoding)
+        if forms is None:
+            if encoding == 'utf-8':
+                forms = [self._slice(i) for i in range(len(self))]
+            else:
+                forms = [_encode(p, encoding) for p in self.passwords()]
+            self._encodings[encoding] = forms
+        return forms
+
+    def matrix(self):
+        """
+        The UTF-8 candidates as a zero-padded uint8 matrix (needs NumPy)
+
+        Returns:
+            (matrix, lengths) like Keyspace.matrix_range()
+        """
+        offsets = np.frombuffer(self._offsets, dtype=np.uint32).astype(np.int64)
+        lengths = np.diff(offsets).astype(np.int32)
+        width = int(lengths.max()) if len(lengths) else 0
+        if self._buffer is not None:
+            data = np.frombuffer(self._buffer, dtype=np.uint8)
+        else:
+            base = OFFSET_SIZE * len(self._offsets)
+            data = np.frombuffer(bytes(self._shm.buf[base:base + self._offsets[-1]]), dtype=np.uint8)
+
+        columns = np.arange(width)
+        filled = columns < lengths[:, None]
+        matrix = np.zeros((len(lengths), width), dtype=np.uint8)
+        matrix[filled] = data[(offsets[:-1, None] + columns)[filled]]
+        return matrix, lengths
+
+    def share(self) -> 'CandidateBatch':
+        """
+        Copy the buffer into shared memory (once); pickles then carry only its name
+
+        The creator must call unlink() once every worker is done with it.
+        Without multiprocessing.shared_memory the batch pickles as a copy.
+        """
+        if self._shm is None and shared_memory is not None and self._buffer is not None:
+            header = self._offsets.tobytes()
+            shm = shared_memory.SharedMemory(create=True, size=max(len(header) + len(self._buffer), 1))
+            shm.buf[:len(header)] = header
+            shm.buf[len(header):len(header) + len(self._buffer)] = self._buffer
+            self._shm = shm
+            self._owner = True
+        return self
+
+    def unlink(self):
+        """Release the shared memory segment created by share()"""
+        if self._shm is not None and self._owner:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._owner = False
+
+    def __reduce__(self):
+        if self._shm is not None:
+            return _attach_batch, (self._shm.name, len(self))
+        return CandidateBatch, (self._buffer, self._offsets)
@@ -0,0 +1,113 @@
+"""
+Checkpoints
+Crash-safe, periodically persisted attack progress for --resume
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_RESTORE_DIR = 'restore'
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """
+    Write a file so that readers only ever see the old or the new contents
+
+    The text goes to a temporary file in the same directory, is fsynced,
+    then renamed over the destination.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (not supported on Windows)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json(path: str, data) -> None:
+    """Atomically write data as JSON (see atomic_write_text)"""
+    atomic_write_text(path, json.dumps(data))
+
+
+def job_digest(job: Dict) -> str:
+    """Stable short hash of a job description"""
+    return hashlib.sha1(json.dumps(job, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def checkpoint_path(restore_dir: str, job: Dict) -> Path:
+    """Restore file for a job: <target name>-<job hash>.restore.json"""
+    name = Path(job.get('target', 'job')).name
+    return Path(restore_dir) / f"{name}-{job_digest(job)}.restore.json"
+
+
+class Checkpoint:
+    """Progress of one job, saved at most once per interval"""
+
+    def __init__(self, path: str, job: Dict, interval: float = 30.0):
+        """
+        Args:
+            path: Restore file path
+            job: Description of the job (target, attack, parameters); a
+                 restore file written for a different job is ignored
+            interval: Minimum seconds between periodic saves
+        """
+        self.path = Path(path)
+        self.job = job
+        self.interval = interval
+        self._last_save = time.time()
+
+    def load(self) -> Optional[Dict]:
+        """Return the saved state, or None if there is none for this job"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('job') != self.job:
+            return None
+        return data.get('state')
+
+    def due(self) -> bool:
+        """Whether a periodic save is due"""
+        return time.time() - self._last_save >= self.interval
+
+    def save(self, state: Dict) -> None:
+        """Persist state now"""
+        atomic_write_json(self.path, {
+            'job': self.job,
+            'state': state,
+            'saved_at': datetime.now().isoformat(),
+        })
+        self._last_save = time.time()
+
+    def clear(self) -> None:
+        """Remove the restore file"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
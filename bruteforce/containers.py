@@ -0,0 +1,183 @@
+"""
+Target Containers
+Targets inside ZIP drops (nested too), addressed as 'archive.zip!member' and read in memory
+"""
+
+import io
+import os
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+# Between an archive and a member path: 'Level1.zip!Level1/Level1/a.pdf',
+# nested 'drop.zip!inner.zip!a.pdf'
+SEPARATOR = '!'
+
+# Leading bytes of each container -> verifier file type. Encrypted OOXML
+# and Office 97-2003 files are both OLE2 compound files.
+MAGIC_TYPES = [
+    (b'%PDF-', 'pdf'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'office'),
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),
+    (b'PK\x07\x08', 'zip'),
+]
+
+# Readers accept a PDF header anywhere in the first kilobyte
+HEAD_SIZE = 1024
+
+# Archives nested deeper than this are not opened
+MAX_DEPTH = 8
+
+# Archive bytes kept between member reads (nested archives only)
+_ARCHIVE_CACHE_SIZE = 4
+_archive_cache = OrderedDict()
+
+
+def sniff_bytes(head: bytes) -> Optional[str]:
+    """Verifier file type of a file's first HEAD_SIZE bytes ('pdf', 'office', 'zip' or None)"""
+    for magic, file_type in MAGIC_TYPES:
+        if head.startswith(magic):
+            return file_type
+    if b'%PDF-' in head:
+        return 'pdf'
+    return None
+
+
+def split_member(path) -> Tuple[str, List[str]]:
+    """
+    Split a target path into the file on disk and its member chain
+
+    'drop.zip!inner.zip!a.pdf' -> ('drop.zip', ['inner.zip', 'a.pdf']);
+    a plain path has no members. A '!' that is part of a real file name is
+    left alone. Members are ZIP names, so they keep '/' even where a Path
+    made of the whole address turned it into the platform's separator.
+    """
+    path = str(path)
+    if SEPARATOR not in path or Path(path).exists():
+        return path, []
+    parts = path.split(SEPARATOR)
+    for i in range(1, len(parts)):
+        outer = SEPARATOR.join(parts[:i])
+        if Path(outer).is_file():
+            members = parts[i:]
+            if os.sep != '/':
+                members = [member.replace(os.sep, '/') for member in members]
+            return outer, members
+    return path, []
+
+
+def is_member(path) -> bool:
+    return bool(split_member(path)[1])
+
+
+def _archive_bytes(outer: str, chain: Tuple[str, ...]) -> bytes:
+    """Bytes of a nested archive (cached; the outermost file is read from disk)"""
+    key = (outer, chain)
+    if key in _archive_cache:
+        _archive_cache.move_to_end(key)
+        return _archive_cache[key]
+    data = _read_chain(outer, list(chain))
+    _archive_cache[key] = data
+    if len(_archive_cache) > _ARCHIVE_CACHE_SIZE:
+        _archive_cache.popitem(last=False)
+    return data
+
+
+def _parent(outer: str, members: List[str]):
+    """The archive holding the last member (a path or in-memory bytes)"""
+    if len(members) > 1:
+        return io.BytesIO(_archive_bytes(outer, tuple(members[:-1])))
+    return outer
+
+
+def _read_chain(outer: str, members: List[str]) -> bytes:
+    with zipfile.ZipFile(_parent(outer, members)) as zf:
+        return zf.read(members[-1])
+
+
+def read_target(path) -> bytes:
+    """Contents of a target file or archive member"""
+    outer, members = split_member(path)
+    if not members:
+        return Path(outer).read_bytes()
+    return _read_chain(outer, members)
+
+
+def open_target(path) -> BinaryIO:
+    """Binary file object of a target file or archive member"""
+    outer, members = split_member(path)
+    if not members:
+        return open(outer, 'rb')
+    return io.BytesIO(_read_chain(outer, members))
+
+
+def target_exists(path) -> bool:
+    outer, members = split_member(path)
+    if not members:
+        return Path(outer).exists()
+    try:
+        with zipfile.ZipFile(_parent(outer, members)) as zf:
+            zf.getinfo(members[-1])
+        return True
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return False
+
+
+def _is_container(zf: zipfile.ZipFile) -> bool:
+    """An archive holding targets rather than a target itself (nothing encrypted)"""
+    return not any(info.flag_bits & 0x1 for info in zf.infolist())
+
+
+def is_container(path) -> bool:
+    """Whether path is a ZIP drop rather than an encrypted ZIP target"""
+    try:
+        with zipfile.ZipFile(open_target(path)) as zf:
+            return _is_container(zf)
+    except (zipfile.BadZipFile, KeyError, OSError):
+        return False
+
+
+def _walk(zf: zipfile.ZipFile, prefix: str, depth: int, found: List[str]):
+    for info in zf.infolist():
+        if info.is_dir() or info.flag_bits & 0x1:
+            continue
+        member = f"{prefix}{SEPARATOR}{info.filename}"
+        with zf.open(info) as f:
+            file_type = sniff_bytes(f.read(HEAD_SIZE))
+        if file_type in ('pdf', 'office'):
+            found.append(member)
+        elif file_type == 'zip':
+            try:
+                inner = zipfile.ZipFile(io.BytesIO(zf.read(info)))
+            except zipfile.BadZipFile:
+                continue
+            with inner:
+                if not _is_container(inner):
+                    found.append(member)
+                elif depth < MAX_DEPTH:
+                    _walk(inner, member, depth + 1, found)
+
+
+def discover(path) -> List[str]:
+    """
+    Targets inside a ZIP drop, without extracting anything to disk
+
+    Archives with no encrypted entries are containers: their PDFs, Office
+    files and encrypted ZIPs are targets, and unencrypted ZIPs inside them
+    are walked in turn.
+
+    Returns:
+        Member paths ('archive.zip!dir/file.pdf'); [] if path is not a
+        container
+    """
+    try:
+        with zipfile.ZipFile(open_target(path)) as zf:
+            if not _is_container(zf):
+                return []
+            found = []
+            _walk(zf, str(path), 1, found)
+            return found
+    except (zipfile.BadZipFile, KeyError, OSError):
+        return []
@@ -6,65 +6,139 @@ Supports PDF, DOCX, PPTX, and ZIP files
 import os
 import sys
 import time
-import string
+import hashlib
 import itertools
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import multiprocessing as mp
 from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
-# File format libraries
-try:
-    import pikepdf
-except ImportError:
-    pikepdf = None
-
-try:
-    import msoffcrypto
-except ImportError:
-    msoffcrypto = None
-
-import zipfile
+from autotune import Autotuner, DriftMonitor
+from candidate_batch import CandidateBatch
+from checkpoint import Checkpoint, DEFAULT_RESTORE_DIR, checkpoint_path
+from containers import target_exists
+from escalation import AttackPlan, print_report, run_plan
+from executor import BACKENDS, VerifierPool, WarmPools, select_backend
+from governor import ResourceGovernor, add_resource_arguments, apply_resource_arguments
+from keyspace import (DEFAULT_CHARSET, DEFAULT_MUTATIONS, MATRIX_BATCH, BruteForceKeyspace,
+                      Keyspace, MaskKeyspace, index_dir_for, parse_mask)
+from merge import DEFAULT_WINDOW, merge_sources, parse_source
+from metrics import Metrics, MetricsExporter, MetricsRegistry
+from planner import count_candidates, estimate_attack, format_time
+from policy import PasswordPolicy
+from potfile import DEFAULT_POTFILE, Potfile, check_potfile, content_hash
+from tracing import Tracer
+from verifiers import create_verifier, file_type_for
 
 
 class PasswordCracker:
     """Multi-format password cracker with dictionary and brute force attacks"""
     
-    def __init__(self, target_file: str, verbose: bool = True):
+    def __init__(self, target_file: str, verbose: bool = True,
+                 restore_dir: Optional[str] = None, resume: bool = False,
+                 checkpoint_interval: float = 30.0, workers: int = 1,
+                 backend: str = 'auto', batch_size: int = 1, autotune: bool = False,
+                 probe_time: float = 2.0, metrics_file: Optional[str] = None,
+                 metrics_interval: float = 10.0,
+                 metrics_exporter: Optional[MetricsExporter] = None,
+                 potfile: Optional[str] = None, policy: Optional[PasswordPolicy] = None,
+                 pools: Optional[WarmPools] = None,
+                 governor: Optional[ResourceGovernor] = None,
+                 tracer: Optional[Tracer] = None):
         """
         Initialize the password cracker
         
         Args:
             target_file: Path to the password-protected file
             verbose: Whether to print progress information
+            restore_dir: Directory for periodic restore files (None disables them)
+            resume: Continue attacks from their restore files
+            checkpoint_interval: Seconds between restore file updates
+            workers: Number of workers verifying batches of this target
+            backend: Execution backend for the workers ('auto', 'inline',
+                     'threads', 'processes')
+            batch_size: Passwords per batch handed to a worker
+            autotune: Pick backend, workers and batch size from timed probes
+                      (workers is then the upper bound)
+            probe_time: Seconds per autotuning probe
+            metrics_file: Snapshot file for this target's metrics ('.json'
+                          for JSON, otherwise Prometheus text)
+            metrics_interval: Seconds between metrics snapshots
+            metrics_exporter: Shared exporter to drive instead of metrics_file
+                              (the caller registers self.metrics with it)
+            potfile: Potfile consulted before and updated after every attack
+                     (None disables it)
+            policy: Password policy of the target; candidates that violate it
+                    are dropped by the generators, before verification
+            pools: Warm worker pools shared with other attacks (daemon mode)
+                   instead of a new executor per attack
+            governor: Resource governor; batches shrink under its memory
+                      ceiling and speeds are also reported per assigned core
+            tracer: Timeline tracer; attacks, generation, verification (per
+                    worker), confirmation, checkpoints and waits become spans
         """
         self.target_file = Path(target_file)
         self.verbose = verbose
         self.attempts = 0
         self.start_time = None
+        self.restore_dir = restore_dir
+        self.index_dir = index_dir_for(restore_dir)
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint = None
+        self.interrupted = False
+        self.total_candidates = None
+        self.attack = None
+        self.from_potfile = False
+        self.policy = policy
+        
+        # Budgets for the next attack (set by attack plans): absolute
+        # time.time() deadline and maximum attempts
+        self.deadline = None
+        self.guess_budget = None
+        self._limit_reached = False
+        self._cancelled = False
+        
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown execution backend: {backend}")
+        self.workers = workers
+        self.backend = backend
+        self.pools = pools
+        self.governor = governor
+        self.tracer = tracer
+        self.batch_size = batch_size
+        self.autotune = autotune
+        self.autotuner = Autotuner(max_workers=workers if workers > 1 else None,
+                                   probe_time=probe_time) if autotune else None
+        self.tuning = None
         
-        if not self.target_file.exists():
+        if not target_exists(self.target_file):
             raise FileNotFoundError(f"Target file not found: {target_file}")
         
         # Detect file type
         self.file_type = self._detect_file_type()
+        self.verifier = create_verifier(self.target_file, self.file_type)
+        
+        self.metrics = Metrics(self.target_file.name, self.file_type)
+        self.metrics.tracer = tracer
+        self.metrics_exporter = metrics_exporter
+        if metrics_file is not None and metrics_exporter is None:
+            registry = MetricsRegistry()
+            registry.register(self.metrics)
+            self.metrics_exporter = MetricsExporter(metrics_file, registry, metrics_interval)
+        
+        self.potfile = Potfile(potfile) if potfile is not None else None
+        self.file_hash = content_hash(self.target_file) if self.potfile is not None else None
         
     def _detect_file_type(self) -> str:
-        """Detect the type of password-protected file"""
-        suffix = self.target_file.suffix.lower()
-        
-        if suffix == '.pdf':
-            if pikepdf is None:
-                raise ImportError("pikepdf is required for PDF files. Install: pip install pikepdf")
-            return 'pdf'
-        elif suffix in ['.docx', '.xlsx', '.pptx']:
-            if msoffcrypto is None:
-                raise ImportError("msoffcrypto-tool is required for Office files. Install: pip install msoffcrypto-tool")
-            return 'office'
-        elif suffix == '.zip':
-            return 'zip'
-        else:
-            raise ValueError(f"Unsupported file type: {suffix}")
+        """Detect the type of password-protected file from its content"""
+        file_type = file_type_for(str(self.target_file))
+        if file_type is None:
+            raise ValueError(f"Unsupported file type: {self.target_file.name} "
+                             f"(not a PDF, OLE2 compound file or ZIP)")
+        return file_type
     
     def try_password(self, password: str) -> bool:
         """
@@ -76,53 +150,490 @@ class PasswordCracker:
         Returns:
             True if password is correct, False otherwise
         """
+        start = time.perf_counter()
+        try:
+            found = self.verifier.verify(password)
+        except Exception:
+            found = False
+        self.metrics.add_time('verify', time.perf_counter() - start)
+        
+        # Counted once finished, so an interrupted guess is retried on resume
         self.attempts += 1
+        self.metrics.guesses()
+        return found
+    
+    def _open_checkpoint(self, attack: str, params: Dict) -> Dict:
+        """
+        Set up the restore file for an attack
+        
+        Args:
+            attack: Attack name
+            params: Parameters that identify the attack's candidate stream
+            
+        Returns:
+            Saved state to resume from ({} when starting fresh)
+        """
+        self.attack = attack
+        self.checkpoint = None
+        if self.restore_dir is None:
+            return {}
+        
+        job = {'target': str(self.target_file.resolve()), 'attack': attack, **params}
+        if self.policy is not None:
+            job['policy'] = self.policy.describe()
+        self.checkpoint = Checkpoint(checkpoint_path(self.restore_dir, job), job,
+                                     self.checkpoint_interval)
+        
+        state = self.checkpoint.load() if self.resume else None
+        if not state:
+            return {}
+        
+        self.attempts = state.get('attempts', 0)
+        self.start_time = time.time() - state.get('elapsed', 0)
+        if self.verbose:
+            print(f"Resuming from {self.checkpoint.path} ({self.attempts:,} attempts done)")
+        return state
+    
+    def _save_checkpoint(self, force: bool = False, **position):
+        """Persist the attack position if a periodic save is due (or forced)"""
+        if self.checkpoint is not None and (force or self.checkpoint.due()):
+            with self.metrics.timed('checkpoint'):
+                self.checkpoint.save({
+                    'attempts': self.attempts,
+                    'elapsed': time.time() - self.start_time,
+                    **position
+                })
+    
+    def _finish_checkpoint(self, password: Optional[str]):
+        """Record that the attack ran to completion"""
+        self._save_checkpoint(force=True, complete=True, password=password)
+    
+    def _policy_excludes(self, what: str) -> bool:
+        """Report an attack the policy leaves no candidates for (always True)"""
+        if self.verbose:
+            print(f"\n✗ Policy {self.policy} excludes every candidate of {what}")
+        return True
+    
+    def _known_password(self) -> Optional[str]:
+        """
+        The target's password from the potfile, if it was cracked before
+        
+        Attacks check this first, before counting candidates or printing
+        their header.
+        """
+        if self.potfile is None:
+            return None
+        known = check_potfile(self.potfile, self.verifier, self.file_hash)
+        if known is not None:
+            self.from_potfile = True
+            if self.verbose:
+                print(f"✓ Already cracked (potfile {self.potfile.path}): {known}")
+        return known
+    
+    def _resumed_result(self, state: Dict) -> Tuple[bool, Optional[str]]:
+        """(True, result) if a restored attack had already finished"""
+        if not state.get('complete'):
+            return False, None
+        if self.verbose:
+            result = state.get('password')
+            print(f"Attack already finished: {'password ' + result if result else 'not found'}")
+        return True, state.get('password')
+    
+    def _run(self, candidates: Iterator[Tuple[str, Dict]], position: Dict,
+             max_passwords: Optional[int] = None,
+             matrices: Optional[Iterator[Tuple]] = None) -> Optional[str]:
+        """
+        Verify a candidate stream
+        
+        Args:
+            candidates: (password, position after this password) pairs
+            position: Position before the first candidate
+            max_passwords: Maximum number of passwords to try
+            matrices: (matrix, lengths, position after the batch) triples of
+                      the same candidates, used instead of candidates when
+                      given (see _matrix_batches)
+            
+        Returns:
+            Correct password if found, None otherwise
+        """
+        self._position = position
+        limits = [n for n in (max_passwords, self.guess_budget) if n]
+        self._max_passwords = min(limits) if limits else None
+        self._limit_reached = False
+        self._retune_requested = False
         
+        traced_from = time.perf_counter()
         try:
-            if self.file_type == 'pdf':
-                return self._try_pdf_password(password)
-            elif self.file_type == 'office':
-                return self._try_office_password(password)
-            elif self.file_type == 'zip':
-                return self._try_zip_password(password)
-        except Exception:
-            return False
+            if matrices is not None:
+                result = self._run_matrices(matrices)
+            elif self.autotune:
+                result = self._run_autotuned(candidates)
+            elif (self.workers <= 1 and self.backend in ('auto', 'inline')
+                  and self.verifier.has_prefilter):
+                result = self._run_two_tier(candidates)
+            elif self.workers <= 1 and self.batch_size <= 1 and self.backend in ('auto', 'inline'):
+                result = self._run_serial(candidates)
+            else:
+                backend = self.backend
+                if backend == 'auto':
+                    backend = select_backend([self.verifier], self.workers, self.workers)
+                self.tuning = {'backend': backend, 'workers': self.workers,
+                               'batch_size': self.batch_size}
+                result = self._run_batched(candidates, backend, self.workers, self.batch_size)
+        
+        except KeyboardInterrupt:
+            self.interrupted = True
+            self._save_checkpoint(force=True, **self._position)
+            if self.verbose:
+                print(f"\n\n⚠ Attack interrupted by user")
+                if 'line' in self._position:
+                    print(f"Stopped at line: {self._position['line'] + 1}")
+                print(f"Resume with: --resume")
+            self._export_metrics()
+            return None
+        finally:
+            if self.tracer is not None:
+                self.tracer.add(self.attack or 'attack', traced_from,
+                                time.perf_counter() - traced_from, 'attack',
+                                args={'target': self.target_file.name, 'attempts': self.attempts})
+        
+        if result is not None:
+            self.metrics.count('cracked')
+            if self.verbose:
+                self._print_success(result)
+            self._finish_checkpoint(result)
+            if self.potfile is not None:
+                self.potfile.add(self.file_hash, result, self.target_file.name, self.file_type,
+                                 self.attack, self.attempts, time.time() - self.start_time)
+        elif self._limit_reached:
+            self._save_checkpoint(force=True, **self._position)
+            if self._cancelled:
+                # Saved like an interrupt, so --resume continues it
+                self.interrupted = True
+            elif self.verbose:
+                if self.deadline is not None and time.time() >= self.deadline:
+                    print(f"\n✗ Time budget used up")
+                else:
+                    print(f"\n✗ Reached maximum attempts ({self._max_passwords:,})")
+        else:
+            self._finish_checkpoint(None)
+        
+        self._export_metrics()
+        return result
+    
+    def cancel(self):
+        """Stop the running attack at its next recorded position (safe from any thread)"""
+        self._cancelled = True
+    
+    @property
+    def limit_reached(self) -> bool:
+        """Whether the last attack stopped at its attempt limit or budget"""
+        return self._limit_reached
+    
+    def _export_metrics(self):
+        """Write a final metrics snapshot"""
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.write()
+    
+    def _advance(self, position: Dict) -> bool:
+        """
+        Record candidates up to position as done
+        
+        Returns:
+            True if the attempt limit has been reached
+        """
+        self._position = position
+        self._save_checkpoint(**position)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.maybe_write()
         
-        return False
+        if self._max_passwords and self.attempts >= self._max_passwords:
+            self._limit_reached = True
+        if self._cancelled:
+            self._limit_reached = True
+        if self.deadline is not None and time.time() >= self.deadline:
+            self._limit_reached = True
+        return self._limit_reached
     
-    def _try_pdf_password(self, password: str) -> bool:
-        """Try password on PDF file"""
+    def _run_serial(self, candidates: Iterator[Tuple[str, Dict]]) -> Optional[str]:
+        """Verify candidates one at a time in this thread"""
+        block = (time.perf_counter(), self.attempts)
         try:
-            with pikepdf.open(self.target_file, password=password):
-                return True
-        except pikepdf.PasswordError:
-            return False
+            for password, position in candidates:
+                if self.try_password(password):
+                    return password
+                
+                if self.attempts % 1000 == 0:
+                    if self.verbose:
+                        self._print_progress(position.get('line'))
+                    if self.tracer is not None:
+                        block = self._trace_verify(block)
+                
+                if self._advance(position):
+                    break
+            
+            return None
+        finally:
+            if self.tracer is not None:
+                self._trace_verify(block)
+    
+    def _trace_verify(self, block: Tuple[float, int]) -> Tuple[float, int]:
+        """Record the guesses since block (start, attempts) as one span; returns the next block"""
+        start, attempts = block
+        now = time.perf_counter()
+        if self.attempts > attempts:
+            self.tracer.add('verify', start, now - start, args={'guesses': self.attempts - attempts})
+        return now, self.attempts
     
-    def _try_office_password(self, password: str) -> bool:
-        """Try password on Office file"""
+    def _run_two_tier(self, candidates: Iterator[Tuple[str, Dict]]) -> Optional[str]:
+        """
+        Prefilter batches in this thread, confirm survivors on a helper thread
+        
+        The next batch is prefiltered while the last one's survivors are
+        being confirmed. Batches retire in order, so the recorded position
+        only covers candidates whose survivors have all been confirmed.
+        """
+        size = self.batch_size if self.batch_size > 1 else self.verifier.prefilter_batch
+        confirmer = ThreadPoolExecutor(max_workers=1)
+        pending = deque()
+        
+        def confirm(batch: CandidateBatch, survivors: List[int]) -> Optional[int]:
+            start = time.perf_counter()
+            try:
+                for i in survivors:
+                    try:
+                        if self.verifier.confirm(batch[i]):
+                            return i
+                    except Exception:
+                        pass
+                return None
+            finally:
+                self.metrics.add_time('confirm', time.perf_counter() - start)
+                if self.tracer is not None:
+                    self.tracer.add('confirm', start, time.perf_counter() - start,
+                                    args={'survivors': len(survivors)})
+        
+        def retire() -> Optional[str]:
+            future, batch, position = pending.popleft()
+            hit = future.result()
+            done = hit + 1 if hit is not None else len(batch)
+            before = self.attempts
+            self.attempts += done
+            self.metrics.guesses(done)
+            if hit is not None:
+                return batch[hit]
+            if self.verbose and before // 1000 != self.attempts // 1000:
+                self._print_progress(position.get('line'))
+            self._advance(position)
+            return None
+        
         try:
-            import io
-            with open(self.target_file, 'rb') as f:
-                file_obj = msoffcrypto.OfficeFile(f)
-                file_obj.load_key(password=password)
-                # Try to decrypt to memory to verify password
-                output = io.BytesIO()
-                file_obj.decrypt(output)
-                return True
-        except Exception:
-            return False
+            queued = 0
+            while not self._limit_reached:
+                limit = size
+                if self._max_passwords:
+                    limit = min(limit, self._max_passwords - self.attempts - queued)
+                chunk = list(itertools.islice(candidates, limit)) if limit > 0 else []
+                if not chunk:
+                    break
+                
+                batch = CandidateBatch.from_passwords(p for p, _ in chunk)
+                start = time.perf_counter()
+                survivors = self.verifier.prefilter(batch)
+                self.metrics.add_time('prefilter', time.perf_counter() - start)
+                if self.tracer is not None:
+                    self.tracer.add('prefilter', start, time.perf_counter() - start,
+                                    args={'passwords': len(batch)})
+                self.metrics.count('prefilter_survivors', len(survivors))
+                
+                future = confirmer.submit(confirm, batch, survivors)
+                pending.append((future, batch, chunk[-1][1]))
+                queued += len(batch)
+                # One batch being confirmed while the next is prefiltered
+                while len(pending) > 1 or (pending and pending[0][0].done()):
+                    queued -= len(pending[0][1])
+                    result = retire()
+                    if result is not None:
+                        return result
+            
+            while pending:
+                result = retire()
+                if result is not None:
+                    return result
+            return None
+        finally:
+            for future, _, _ in pending:
+                future.cancel()
+            confirmer.shutdown(wait=True)
+    
+    def _vectorizable(self, keyspace: Keyspace) -> bool:
+        """Whether a keyspace can run on the verifier's vectorized path in this thread"""
+        return (self.verifier.vectorized and keyspace.supports_matrices
+                and (self.policy is None or not self.policy.needs_filter)
+                and self.workers <= 1 and not self.autotune
+                and self.backend in ('auto', 'inline'))
+    
+    def _matrix_batches(self, keyspace: Keyspace, start: int) -> Iterator[Tuple]:
+        """uint8 candidate matrices of a keyspace from start, clipped to the attempt limit"""
+        index = start
+        size = len(keyspace)
+        batch = self.batch_size if self.batch_size > 1 else MATRIX_BATCH
+        while index < size:
+            stop = min(index + batch, size)
+            if self._max_passwords:
+                stop = min(stop, index + self._max_passwords - self.attempts)
+            with self.metrics.timed('generate'):
+                matrix, lengths = keyspace.matrix_range(index, stop)
+            index = stop
+            yield matrix, lengths, {'index': index}
+    
+    def _run_matrices(self, batches: Iterator[Tuple]) -> Optional[str]:
+        """Verify candidate matrices with the verifier's vectorized check"""
+        for matrix, lengths, position in batches:
+            start = time.perf_counter()
+            hit = self.verifier.verify_matrix(matrix, lengths)
+            self.metrics.add_time('verify', time.perf_counter() - start)
+            if self.tracer is not None:
+                self.tracer.add('verify', start, time.perf_counter() - start,
+                                args={'passwords': len(lengths)})
+            
+            done = hit + 1 if hit is not None else len(lengths)
+            before = self.attempts
+            self.attempts += done
+            self.metrics.guesses(done)
+            if hit is not None:
+                # The only candidate ever turned into a string
+                return matrix[hit, :lengths[hit]].tobytes().decode('ascii')
+            
+            if self.verbose and before // 1000 != self.attempts // 1000:
+                self._print_progress()
+            if self._advance(position):
+                break
+        
+        return None
     
-    def _try_zip_password(self, password: str) -> bool:
-        """Try password on ZIP file"""
+    def _run_batched(self, candidates: Iterator[Tuple[str, Dict]], backend: str, workers: int,
+                     batch_size: int, time_limit: Optional[float] = None,
+                     monitor: Optional[DriftMonitor] = None) -> Optional[str]:
+        """
+        Verify candidates in batches on a worker pool
+        
+        Batches complete in submission order, so the recorded position only
+        ever covers candidates that have really been checked.
+        
+        Args:
+            candidates: (password, position) pairs
+            backend: 'inline', 'threads' or 'processes'
+            workers: Number of workers
+            batch_size: Passwords per batch
+            time_limit: Stop submitting after this many seconds (probes)
+            monitor: Drift monitor; stops early when it asks for a re-tune
+            
+        Returns:
+            Correct password if found, None otherwise
+        """
+        pool = VerifierPool(self.verifier, backend, workers, self.pools, self.tracer)
+        inflight = deque()
+        queued = 0
+        self._stream_ended = False
         try:
-            with zipfile.ZipFile(self.target_file, 'r') as zf:
-                # Get first file in archive
-                first_file = zf.namelist()[0]
-                # Try to extract with password
-                zf.read(first_file, pwd=password.encode('utf-8'))
-                return True
-        except (RuntimeError, zipfile.BadZipFile, KeyError):
-            return False
+            pool.warm_up()
+            # Probes are timed from here, so worker startup is not charged to a backend
+            self._pool_ready = time.time()
+            deadline = self._pool_ready + time_limit if time_limit is not None else None
+            
+            while True:
+                # Keep every worker busy with one batch queued behind it
+                while (not self._stream_ended and not self._retune_requested
+                       and not self._limit_reached
+                       and len(inflight) < 2 * pool.max_workers
+                       and (deadline is None or time.time() < deadline)):
+                    size = batch_size
+                    if self.governor is not None:
+                        size = self.governor.batch_size(size)
+                    if self._max_passwords:
+                        size = min(size, self._max_passwords - self.attempts - queued)
+                        if size <= 0:
+                            break
+                    start = time.perf_counter()
+                    batch = list(itertools.islice(candidates, size))
+                    if not batch:
+                        self._stream_ended = True
+                        break
+                    passwords = CandidateBatch.from_passwords(p for p, _ in batch)
+                    if self.tracer is not None:
+                        self.tracer.add('generate', start, time.perf_counter() - start,
+                                        args={'passwords': len(batch)})
+                    inflight.append((pool.submit(passwords), batch))
+                    queued += len(batch)
+                
+                if not inflight:
+                    return None
+                
+                future, batch = inflight.popleft()
+                queued -= len(batch)
+                start = time.perf_counter()
+                hit, seconds = pool.result(future)
+                if self.tracer is not None:
+                    self.tracer.add('wait', start, time.perf_counter() - start, 'queue')
+                self.metrics.add_time('verify', seconds)
+                if hit is not None:
+                    done = [p for p, _ in batch].index(hit) + 1
+                    self.attempts += done
+                    self.metrics.guesses(done)
+                    return hit
+                
+                before = self.attempts
+                self.attempts += len(batch)
+                self.metrics.guesses(len(batch))
+                if self.verbose and before // 1000 != self.attempts // 1000:
+                    self._print_progress(batch[-1][1].get('line'))
+                self._advance(batch[-1][1])
+                
+                if monitor is not None and monitor.update(len(batch)):
+                    self._retune_requested = True
+        finally:
+            pool.shutdown()
+    
+    def _run_autotuned(self, candidates: Iterator[Tuple[str, Dict]]) -> Optional[str]:
+        """Tune on the live candidate stream, run, and re-tune on throughput drift"""
+        self.tuning = {'probes': [], 'history': []}
+        found = []
+        
+        def probe(backend, workers, batch_size, seconds):
+            before = self.attempts
+            hit = self._run_batched(candidates, backend, workers, batch_size, time_limit=seconds)
+            if hit is not None:
+                found.append(hit)
+                return None
+            if self._stream_ended or self._limit_reached:
+                return None
+            return (self.attempts - before) / max(time.time() - self._pool_ready, 1e-9)
+        
+        while True:
+            if self.verbose:
+                print(f"\nAutotuning (probes of {self.autotuner.probe_time:.1f}s)...")
+            best = self.autotuner.tune(probe)
+            self.tuning['probes'].extend(self.autotuner.probes)
+            if best is None:
+                return found[0] if found else None
+            
+            best['at_attempt'] = self.attempts
+            self.tuning['history'].append(best)
+            self.tuning.update({k: best[k] for k in ('backend', 'workers', 'batch_size', 'rate')})
+            if self.verbose:
+                print(f"Tuned: backend={best['backend']} workers={best['workers']} "
+                      f"batch={best['batch_size']} ({best['rate']:.2f} pwd/s)")
+            
+            self._retune_requested = False
+            monitor = DriftMonitor(best['rate'])
+            hit = self._run_batched(candidates, best['backend'], best['workers'],
+                                    best['batch_size'], monitor=monitor)
+            if hit is not None or not self._retune_requested:
+                return hit
+            
+            if self.verbose:
+                print(f"\n⚠ Throughput drifted below the tuned rate, re-tuning")
     
     def dictionary_attack(self, wordlist_path: str, start_line: int = 0, 
                          max_passwords: Optional[int] = None) -> Optional[str]:
@@ -140,10 +651,25 @@ class PasswordCracker:
         wordlist = Path(wordlist_path)
         if not wordlist.exists():
             raise FileNotFoundError(f"Wordlist not found: {wordlist_path}")
+
+        known = self._known_password()
+        if known is not None:
+            return known
         
         self.start_time = time.time()
         self.attempts = 0
         
+        state = self._open_checkpoint('dictionary', {'wordlist': str(wordlist.resolve())})
+        finished, result = self._resumed_result(state)
+        if finished:
+            return result
+        start_line = state.get('line', start_line)
+        offset = state.get('offset')
+        self.total_candidates = count_candidates('dictionary', str(wordlist),
+                                                 max_passwords=max_passwords,
+                                                 index_dir=self.index_dir)
+        policy = self.policy
+        
         if self.verbose:
             print(f"\n{'='*60}")
             print(f"DICTIONARY ATTACK")
@@ -151,51 +677,43 @@ class PasswordCracker:
             print(f"Target file: {self.target_file}")
             print(f"File type: {self.file_type.upper()}")
             print(f"Wordlist: {wordlist}")
+            print(f"Candidates: {self.total_candidates:,}")
             print(f"Starting from line: {start_line + 1}")
+            if policy is not None:
+                print(f"Policy: {policy}")
             if max_passwords:
                 print(f"Max attempts: {max_passwords:,}")
             print(f"{'='*60}\n")
         
-        try:
-            with open(wordlist, 'r', encoding='utf-8', errors='ignore') as f:
-                # Skip to start line
+        if offset is None:
+            # Skip to start line
+            offset = 0
+            with open(wordlist, 'rb') as f:
                 for _ in range(start_line):
-                    next(f)
-                
-                for line_num, line in enumerate(f, start=start_line + 1):
-                    password = line.strip()
-                    
-                    if not password:
-                        continue
-                    
-                    if self.try_password(password):
-                        self._print_success(password)
-                        return password
-                    
-                    if self.verbose and self.attempts % 1000 == 0:
-                        self._print_progress(line_num)
-                    
-                    if max_passwords and self.attempts >= max_passwords:
-                        if self.verbose:
-                            print(f"\n✗ Reached maximum attempts ({max_passwords:,})")
-                        break
+                    offset += len(next(f, b''))
         
-        except KeyboardInterrupt:
-            if self.verbose:
-                print(f"\n\n⚠ Attack interrupted by user")
-                print(f"Stopped at line: {line_num}")
-                print(f"Resume with: start_line={line_num}")
-        
-        if self.verbose:
-            elapsed = time.time() - self.start_time
-            print(f"\n{'='*60}")
-            print(f"✗ Password not found")
-            print(f"Attempts: {self.attempts:,}")
-            print(f"Time elapsed: {self._format_time(elapsed)}")
-            print(f"Speed: {self.attempts / elapsed:.2f} passwords/sec")
-            print(f"{'='*60}\n")
+        def candidates():
+            # Position: lines fully done and their byte length
+            lines_done, pos = start_line, offset
+            with open(wordlist, 'rb') as f:
+                f.seek(pos)
+                for line in self.metrics.timed_iter(f, 'read'):
+                    lines_done += 1
+                    pos += len(line)
+                    # A line has at least as many bytes as characters, so
+                    # short lines are dropped without decoding them
+                    if policy is not None and len(line.strip()) < policy.min_length:
+                        continue
+                    started = time.perf_counter()
+                    password = line.decode('utf-8', errors='ignore').strip()
+                    self.metrics.add_time('decode', time.perf_counter() - started)
+                    if password and (policy is None or policy.allows(password)):
+                        yield password, {'line': lines_done, 'offset': pos}
         
-        return None
+        result = self._run(candidates(), {'line': start_line, 'offset': offset}, max_passwords)
+        if result is None:
+            self._print_failure()
+        return result
     
     def brute_force_attack(self, charset: str = None, min_length: int = 1, 
                           max_length: int = 6) -> Optional[str]:
@@ -210,14 +728,34 @@ class PasswordCracker:
         Returns:
             Correct password if found, None otherwise
         """
-        if charset is None:
-            charset = string.digits + string.ascii_lowercase + string.ascii_uppercase
+        known = self._known_password()
+        if known is not None:
+            return known
         
         self.start_time = time.time()
         self.attempts = 0
         
+        policy = self.policy
+        if policy is not None:
+            lengths = policy.length_range(min_length, max_length)
+            charset = policy.prune_charset(charset or DEFAULT_CHARSET)
+            if lengths is None or not charset:
+                self._policy_excludes('the brute force attack')
+                return None
+            min_length, max_length = lengths
+        
+        keyspace = BruteForceKeyspace(charset, min_length, max_length)
+        charset = keyspace.charset
+        
+        state = self._open_checkpoint('brute_force', keyspace.describe())
+        finished, result = self._resumed_result(state)
+        if finished:
+            return result
+        start = state.get('index', 0)
+        
         # Calculate total combinations
-        total = sum(len(charset) ** length for length in range(min_length, max_length + 1))
+        total = len(keyspace)
+        self.total_candidates = total
         
         if self.verbose:
             print(f"\n{'='*60}")
@@ -228,38 +766,97 @@ class PasswordCracker:
             print(f"Character set: {charset}")
             print(f"Character set size: {len(charset)}")
             print(f"Length range: {min_length}-{max_length}")
+            if policy is not None:
+                print(f"Policy: {policy}")
             print(f"Total combinations: {total:,}")
+            if start:
+                print(f"Resuming at combination: {start:,}")
             print(f"{'='*60}\n")
         
-        try:
-            for length in range(min_length, max_length + 1):
-                if self.verbose:
-                    print(f"\nTrying passwords of length {length}...")
-                
-                for combo in itertools.product(charset, repeat=length):
-                    password = ''.join(combo)
-                    
-                    if self.try_password(password):
-                        self._print_success(password)
-                        return password
-                    
-                    if self.verbose and self.attempts % 1000 == 0:
-                        self._print_progress()
+        def candidates():
+            index = start
+            offset = 0
+            for segment in keyspace.segments:
+                size = len(segment)
+                if index < offset + size:
+                    if self.verbose:
+                        print(f"\nTrying passwords of length {len(segment.charsets)}...")
+                    for password in self.metrics.timed_iter(segment.iter_range(index - offset, size),
+                                                            'generate'):
+                        index += 1
+                        if policy is None or not policy.needs_filter or policy.allows(password):
+                            yield password, {'index': index}
+                offset += size
         
-        except KeyboardInterrupt:
-            if self.verbose:
-                print(f"\n\n⚠ Attack interrupted by user")
+        matrices = self._matrix_batches(keyspace, start) if self._vectorizable(keyspace) else None
+        if matrices is not None and self.verbose:
+            print(f"Vectorized: {self.file_type.upper()} candidates checked as uint8 matrices")
+        result = self._run(candidates(), {'index': start}, matrices=matrices)
+        if result is None:
+            self._print_failure()
+        return result
+    
+    def mask_attack(self, mask: str) -> Optional[str]:
+        """
+        Perform mask attack (brute force with a per-position charset)
+        
+        Args:
+            mask: Mask such as '?u?l?l?l?d?d' (?l ?u ?d ?s ?a, ?? for '?')
+            
+        Returns:
+            Correct password if found, None otherwise
+        """
+        known = self._known_password()
+        if known is not None:
+            return known
+        
+        self.start_time = time.time()
+        self.attempts = 0
+        
+        policy = self.policy
+        if policy is None:
+            keyspace = MaskKeyspace.from_mask(mask)
+        else:
+            charsets = policy.prune_mask(parse_mask(mask))
+            if charsets is None:
+                self._policy_excludes(f"mask {mask}")
+                return None
+            keyspace = MaskKeyspace(charsets)
+        
+        state = self._open_checkpoint('mask', keyspace.describe())
+        finished, result = self._resumed_result(state)
+        if finished:
+            return result
+        start = state.get('index', 0)
+        self.total_candidates = len(keyspace)
         
         if self.verbose:
-            elapsed = time.time() - self.start_time
             print(f"\n{'='*60}")
-            print(f"✗ Password not found")
-            print(f"Attempts: {self.attempts:,}")
-            print(f"Time elapsed: {self._format_time(elapsed)}")
-            print(f"Speed: {self.attempts / elapsed:.2f} passwords/sec")
+            print(f"MASK ATTACK")
+            print(f"{'='*60}")
+            print(f"Target file: {self.target_file}")
+            print(f"File type: {self.file_type.upper()}")
+            print(f"Mask: {mask}")
+            if policy is not None:
+                print(f"Policy: {policy}")
+            print(f"Total combinations: {len(keyspace):,}")
+            if start:
+                print(f"Resuming at combination: {start:,}")
             print(f"{'='*60}\n")
         
-        return None
+        def candidates():
+            passwords = self.metrics.timed_iter(keyspace.iter_range(start, len(keyspace)), 'generate')
+            for index, password in enumerate(passwords, start + 1):
+                if policy is None or not policy.needs_filter or policy.allows(password):
+                    yield password, {'index': index}
+        
+        matrices = self._matrix_batches(keyspace, start) if self._vectorizable(keyspace) else None
+        if matrices is not None and self.verbose:
+            print(f"Vectorized: {self.file_type.upper()} candidates checked as uint8 matrices")
+        result = self._run(candidates(), {'index': start}, matrices=matrices)
+        if result is None:
+            self._print_failure()
+        return result
     
     def hybrid_attack(self, wordlist_path: str, mutations: List[str] = None) -> Optional[str]:
         """
@@ -273,15 +870,34 @@ class PasswordCracker:
             Correct password if found, None otherwise
         """
         if mutations is None:
-            mutations = ['', '!', '123', '1', '12', '2024', '2025', '!@#']
+            mutations = DEFAULT_MUTATIONS
         
         wordlist = Path(wordlist_path)
         if not wordlist.exists():
             raise FileNotFoundError(f"Wordlist not found: {wordlist_path}")
+
+        known = self._known_password()
+        if known is not None:
+            return known
         
         self.start_time = time.time()
         self.attempts = 0
         
+        state = self._open_checkpoint('hybrid', {'wordlist': str(wordlist.resolve()),
+                                                 'mutations': mutations})
+        finished, result = self._resumed_result(state)
+        if finished:
+            return result
+        
+        # Position: lines fully done, their byte length, and the next
+        # candidate (rule) within the following line
+        position = {'line': state.get('line', 0), 'offset': state.get('offset', 0),
+                    'rule': state.get('rule', 0)}
+        self.total_candidates = count_candidates('hybrid', str(wordlist), mutations=mutations,
+                                                 index_dir=self.index_dir)
+        policy = self.policy
+        longest = max((len(m) for m in mutations), default=0)
+        
         if self.verbose:
             print(f"\n{'='*60}")
             print(f"HYBRID ATTACK")
@@ -290,37 +906,161 @@ class PasswordCracker:
             print(f"File type: {self.file_type.upper()}")
             print(f"Wordlist: {wordlist}")
             print(f"Mutations: {mutations}")
+            if policy is not None:
+                print(f"Policy: {policy}")
+            print(f"Candidates: {self.total_candidates:,}")
+            if position['line'] or position['rule']:
+                print(f"Resuming at line {position['line'] + 1:,}, rule {position['rule']}")
             print(f"{'='*60}\n")
         
-        try:
-            with open(wordlist, 'r', encoding='utf-8', errors='ignore') as f:
-                for line_num, line in enumerate(f, start=1):
-                    base_password = line.strip()
+        def candidates():
+            lines_done, offset, first_rule = position['line'], position['offset'], position['rule']
+            with open(wordlist, 'rb') as f:
+                f.seek(offset)
+                for line in self.metrics.timed_iter(f, 'read'):
+                    # Words too short even with the longest mutation are
+                    # dropped before decoding (bytes >= characters)
+                    if policy is not None and len(line.strip()) + longest < policy.min_length:
+                        base_password = ''
+                    else:
+                        started = time.perf_counter()
+                        base_password = line.decode('utf-8', errors='ignore').strip()
+                        self.metrics.add_time('decode', time.perf_counter() - started)
                     
-                    if not base_password:
-                        continue
-                    
-                    # Try base password + all mutations
-                    for mutation in mutations:
-                        password = base_password + mutation
-                        
-                        if self.try_password(password):
-                            self._print_success(password)
-                            return password
+                    if base_password:
+                        # Try base password + all mutations, each also as prefix
+                        started = time.perf_counter()
+                        variants = []
+                        for mutation in mutations:
+                            variants.append(base_password + mutation)
+                            variants.append(mutation + base_password)
+                        self.metrics.add_time('mutate', time.perf_counter() - started)
                         
-                        # Also try mutation as prefix
-                        password = mutation + base_password
-                        if self.try_password(password):
-                            self._print_success(password)
-                            return password
+                        for rule in range(first_rule, len(variants)):
+                            if policy is None or policy.allows(variants[rule]):
+                                yield variants[rule], {'line': lines_done, 'offset': offset,
+                                                       'rule': rule + 1}
                     
-                    if self.verbose and self.attempts % 1000 == 0:
-                        self._print_progress(line_num)
+                    lines_done += 1
+                    offset += len(line)
+                    first_rule = 0
         
-        except KeyboardInterrupt:
-            if self.verbose:
-                print(f"\n\n⚠ Attack interrupted by user")
+        result = self._run(candidates(), position)
+        if result is None:
+            self._print_failure()
+        return result
+    
+    def list_attack(self, passwords: List[str], name: str = 'list') -> Optional[str]:
+        """
+        Try an explicit list of candidates (reused or learned passwords)
+        
+        Args:
+            passwords: Candidates in the order to try
+            name: Attack name for the restore file, metrics and potfile
+            
+        Returns:
+            Correct password if found, None otherwise
+        """
+        known = self._known_password()
+        if known is not None:
+            return known
+        
+        self.start_time = time.time()
+        self.attempts = 0
+        
+        digest = hashlib.sha256('\n'.join(passwords).encode('utf-8')).hexdigest()[:16]
+        state = self._open_checkpoint(name, {'candidates': len(passwords), 'digest': digest})
+        finished, result = self._resumed_result(state)
+        if finished:
+            return result
+        start = state.get('index', 0)
+        self.total_candidates = len(passwords)
+        policy = self.policy
+        
+        if self.verbose:
+            print(f"\n{'='*60}")
+            print(f"{name.upper()} ATTACK")
+            print(f"{'='*60}")
+            print(f"Target file: {self.target_file}")
+            print(f"File type: {self.file_type.upper()}")
+            print(f"Candidates: {len(passwords):,}")
+            if start:
+                print(f"Resuming at candidate: {start:,}")
+            print(f"{'='*60}\n")
+        
+        def candidates():
+            for index in range(start, len(passwords)):
+                if policy is None or policy.allows(passwords[index]):
+                    yield passwords[index], {'index': index + 1}
+        
+        result = self._run(candidates(), {'index': start})
+        if result is None:
+            self._print_failure()
+        return result
+    
+    def merged_attack(self, sources: List[str], max_passwords: Optional[int] = None,
+                      window: int = DEFAULT_WINDOW) -> Optional[str]:
+        """
+        Perform merged attack: several scored sources, most probable guesses first
+        
+        Args:
+            sources: Source specifications such as 'wordlist:rockyou.txt:0.6',
+                     'scored:passgan.tsv:0.3', 'hybrid:rockyou.txt:0.1' or
+                     'mask:?d?d?d?d:0.05' (see merge.parse_source)
+            max_passwords: Maximum number of passwords to try
+            window: Reorder window per source
+            
+        Returns:
+            Correct password if found, None otherwise
+        """
+        known = self._known_password()
+        if known is not None:
+            return known
+        
+        parsed = [parse_source(spec, self.index_dir) for spec in sources]
+        if not parsed:
+            raise ValueError("At least one candidate source required for merged attack")
+        
+        self.start_time = time.time()
+        self.attempts = 0
+        
+        state = self._open_checkpoint('merged', {'sources': [src.spec for src in parsed],
+                                                 'window': window})
+        finished, result = self._resumed_result(state)
+        if finished:
+            return result
+        start = state.get('index', 0)
+        self.total_candidates = count_candidates('merged', sources=sources,
+                                                 max_passwords=max_passwords,
+                                                 index_dir=self.index_dir)
+        
+        if self.verbose:
+            print(f"\n{'='*60}")
+            print(f"MERGED ATTACK")
+            print(f"{'='*60}")
+            print(f"Target file: {self.target_file}")
+            print(f"File type: {self.file_type.upper()}")
+            for src in parsed:
+                print(f"Source: {src.spec} ({len(src):,} candidates)")
+            print(f"Candidates: up to {self.total_candidates:,} (before dedupe)")
+            if start:
+                print(f"Resuming at candidate: {start:,}")
+            print(f"{'='*60}\n")
         
+        def candidates():
+            # Position: merged candidates done; the merge is replayed to get back there
+            merged = self.metrics.timed_iter(merge_sources(parsed, window), 'generate')
+            for index, (password, _, _) in enumerate(merged, 1):
+                if index > start and (self.policy is None or self.policy.allows(password)):
+                    yield password, {'index': index}
+        
+        result = self._run(candidates(), {'index': start}, max_passwords)
+        if result is None:
+            self._print_failure()
+        return result
+    
+    def _print_failure(self):
+        """Print failure summary"""
         if self.verbose:
             elapsed = time.time() - self.start_time
             print(f"\n{'='*60}")
@@ -328,9 +1068,8 @@ class PasswordCracker:
             print(f"Attempts: {self.attempts:,}")
             print(f"Time elapsed: {self._format_time(elapsed)}")
             print(f"Speed: {self.attempts / elapsed:.2f} passwords/sec")
+            self._print_per_core(self.attempts / elapsed)
             print(f"{'='*60}\n")
-        
-        return None
     
     def _print_progress(self, line_num: Optional[int] = None):
         """Print progress information"""
@@ -340,6 +1079,12 @@ class PasswordCracker:
         progress = f"Attempts: {self.attempts:,} | Speed: {speed:.2f} pwd/s | Time: {self._format_time(elapsed)}"
         if line_num:
             progress = f"Line: {line_num:,} | {progress}"
+        if self.total_candidates:
+            percent = min(self.attempts / self.total_candidates * 100, 100.0)
+            progress += f" | {percent:.1f}%"
+            if speed > 0:
+                eta = max(self.total_candidates - self.attempts, 0) / speed
+                progress += f" | ETA: {format_time(eta)}"
         
         print(f"\r{progress}", end='', flush=True)
     
@@ -354,8 +1099,15 @@ class PasswordCracker:
         print(f"Attempts: {self.attempts:,}")
         print(f"Time elapsed: {self._format_time(elapsed)}")
         print(f"Speed: {self.attempts / elapsed:.2f} passwords/sec")
+        self._print_per_core(self.attempts / elapsed)
         print(f"{'='*60}\n")
     
+    def _print_per_core(self, rate: float):
+        """Print throughput per assigned core (governed runs)"""
+        if self.governor is not None:
+            print(f"Per core: {self.governor.per_core(rate):.2f} passwords/sec "
+                  f"({self.governor.core_count} cores)")
+    
     @staticmethod
     def _format_time(seconds: float) -> str:
         """Format elapsed time"""
@@ -380,14 +1132,32 @@ def crack_file(target_file: str, wordlist: str = None, attack_type: str = 'dicti
     Args:
         target_file: Path to the password-protected file
         wordlist: Path to wordlist file (for dictionary/hybrid attacks)
-        attack_type: Type of attack ('dictionary', 'brute_force', 'hybrid')
+        attack_type: Type of attack ('dictionary', 'brute_force', 'mask', 'hybrid',
+                     'merged', or 'plan' to escalate through an AttackPlan)
         max_passwords: Maximum number of passwords to try
         **kwargs: Additional arguments for specific attack types
+                  (restore_dir / resume for checkpointing, workers / backend /
+                  batch_size / autotune for execution, metrics_file /
+                  metrics_interval for metrics snapshots, potfile, policy,
+                  plan for the plan attack, governor for resource limits,
+                  tracer for a timeline trace)
         
     Returns:
         Correct password if found, None otherwise
     """
-    cracker = PasswordCracker(target_file)
+    cracker = PasswordCracker(target_file,
+                              restore_dir=kwargs.get('restore_dir'),
+                              resume=kwargs.get('resume', False),
+                              workers=kwargs.get('workers', 1),
+                              backend=kwargs.get('backend', 'auto'),
+                              batch_size=kwargs.get('batch_size', 1),
+                              autotune=kwargs.get('autotune', False),
+                              metrics_file=kwargs.get('metrics_file'),
+                              metrics_interval=kwargs.get('metrics_interval', 10.0),
+                              potfile=kwargs.get('potfile'),
+                              policy=kwargs.get('policy'),
+                              governor=kwargs.get('governor'),
+                              tracer=kwargs.get('tracer'))
     
     if attack_type == 'dictionary':
         if wordlist is None:
@@ -400,12 +1170,32 @@ def crack_file(target_file: str, wordlist: str = None, attack_type: str = 'dicti
         charset = kwargs.get('charset', None)
         return cracker.brute_force_attack(charset, min_length, max_length)
     
+    elif attack_type == 'mask':
+        mask = kwargs.get('mask')
+        if not mask:
+            raise ValueError("Mask required for mask attack")
+        return cracker.mask_attack(mask)
+    
     elif attack_type == 'hybrid':
         if wordlist is None:
             raise ValueError("Wordlist required for hybrid attack")
         mutations = kwargs.get('mutations', None)
         return cracker.hybrid_attack(wordlist, mutations)
     
+    elif attack_type == 'merged':
+        sources = kwargs.get('sources')
+        if not sources:
+            raise ValueError("Sources required for merged attack")
+        return cracker.merged_attack(sources, max_passwords=max_passwords)
+    
+    elif attack_type == 'plan':
+        plan = kwargs.get('plan')
+        if plan is None:
+            raise ValueError("Attack plan required for plan attack")
+        password, report = run_plan(cracker, plan)
+        print_report(report)
+        return password
+    
     else:
         raise ValueError(f"Unknown attack type: {attack_type}")
 
@@ -417,24 +1207,104 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Password cracker for PDF, Office, and ZIP files')
     parser.add_argument('file', help='Target file to crack')
     parser.add_argument('-w', '--wordlist', help='Path to wordlist file')
-    parser.add_argument('-t', '--type', choices=['dictionary', 'brute_force', 'hybrid'], 
+    parser.add_argument('-t', '--type', choices=['dictionary', 'brute_force', 'mask', 'hybrid', 'merged'], 
                        default='dictionary', help='Attack type')
     parser.add_argument('-m', '--max', type=int, help='Maximum passwords to try')
     parser.add_argument('--min-length', type=int, default=1, help='Minimum password length (brute force)')
     parser.add_argument('--max-length', type=int, default=6, help='Maximum password length (brute force)')
     parser.add_argument('--charset', help='Character set for brute force')
+    parser.add_argument('--mask', help='Mask for mask attack, e.g. ?u?l?l?l?d?d')
+    parser.add_argument('--source', action='append', dest='sources',
+                       help="Candidate source for merged attack, 'kind:argument[:weight]' "
+                            "(kinds: wordlist, scored, hybrid, mask); repeatable")
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue the attack from its restore file')
+    parser.add_argument('--restore-dir', default=DEFAULT_RESTORE_DIR,
+                       help='Directory for periodic restore files')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Workers verifying batches of candidates')
+    parser.add_argument('--backend', choices=BACKENDS, default='auto',
+                       help='Execution backend for the workers')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Candidates per batch handed to a worker')
+    parser.add_argument('--autotune', action='store_true',
+                       help='Pick backend, workers and batch size from timed probes '
+                            '(--workers is the upper bound)')
+    parser.add_argument('--metrics-file',
+                       help='Periodically write metrics here (.json for JSON, else Prometheus text)')
+    parser.add_argument('--metrics-interval', type=float, default=10.0,
+                       help='Seconds between metrics snapshots')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Only estimate how long the attack takes to exhaust')
+    parser.add_argument('--potfile', default=DEFAULT_POTFILE,
+                       help='Database of cracked files, checked before attacking')
+    parser.add_argument('--no-potfile', action='store_true',
+                       help='Neither consult nor update the potfile')
+    parser.add_argument('--policy',
+                       help="Password policy, e.g. 'min=12,max=64,require=lud,allow=luds' "
+                            "(l lower, u upper, d digits, s symbols)")
+    parser.add_argument('--plan',
+                       help="Attack plan (JSON file, or 'default') escalated stage by stage; "
+                            "overrides --type")
+    parser.add_argument('--trace',
+                       help='Write a timeline of the run here (Chrome trace JSON, for Perfetto)')
+    add_resource_arguments(parser)
     
     args = parser.parse_args()
+    policy = PasswordPolicy.parse(args.policy) if args.policy else None
+    governor = apply_resource_arguments(parser, args)
+    plan = None
+    if args.plan:
+        plan = AttackPlan.default(args.wordlist) if args.plan == 'default' else AttackPlan.load(args.plan)
+        if args.dry_run:
+            parser.error("--dry-run estimates a single attack; it does not support --plan")
+    
+    if args.dry_run:
+        estimate = estimate_attack(args.file, args.type, workers=args.workers,
+                                   wordlist=args.wordlist, mask=args.mask, charset=args.charset,
+                                   min_length=args.min_length, max_length=args.max_length,
+                                   sources=args.sources, policy=policy,
+                                   max_passwords=args.max,
+                                   index_dir=index_dir_for(args.restore_dir))
+        print(f"\n{'='*60}")
+        print(f"DRY RUN")
+        print(f"{'='*60}")
+        print(f"Target file: {args.file}")
+        print(f"Attack type: {args.type}")
+        print(f"Candidates: {estimate['candidates']:,}")
+        print(f"Measured speed: {estimate['rate']:.2f} passwords/sec"
+              + (f" ({args.workers} workers, assuming linear scaling)" if args.workers > 1 else ""))
+        print(f"Time to exhaust: {format_time(estimate['seconds'])}")
+        print(f"{'='*60}\n")
+        sys.exit(0)
     
+    tracer = Tracer(args.trace) if args.trace else None
     result = crack_file(
         args.file,
         wordlist=args.wordlist,
-        attack_type=args.type,
+        attack_type='plan' if plan else args.type,
         max_passwords=args.max,
         min_length=args.min_length,
         max_length=args.max_length,
-        charset=args.charset
+        charset=args.charset,
+        mask=args.mask,
+        sources=args.sources,
+        restore_dir=args.restore_dir,
+        resume=args.resume,
+        workers=args.workers,
+        backend=args.backend,
+        batch_size=args.batch_size,
+        autotune=args.autotune,
+        metrics_file=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        potfile=None if args.no_potfile else args.potfile,
+        policy=policy,
+        plan=plan,
+        governor=governor,
+        tracer=tracer
     )
+    if tracer is not None:
+        print(f"Trace written to {tracer.save()}")
     
     if result:
         print(f"\n✓ Success! Password: {result}")
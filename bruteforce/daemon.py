@@ -0,0 +1,563 @@
+"""
+Cracking Daemon
+Long-running job queue with a local HTTP API, warm worker pools and resident wordlists
+
+Endpoints (JSON in and out):
+    POST   /jobs        submit {"target", "plan" | "wordlist", "priority", "workers",
+                                "policy", "generate": {"generator", "count"}}
+    GET    /jobs        every job, newest first
+    GET    /jobs/<id>   one job with its live progress
+    DELETE /jobs/<id>   cancel a queued or running job
+    GET    /status      queue, pools, wordlists and generators
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import heapq
+import signal
+import itertools
+import importlib.util
+import threading
+import socketserver
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from checkpoint import DEFAULT_RESTORE_DIR
+from containers import target_exists
+from escalation import AttackPlan, run_plan, stage_name
+from executor import WarmPools
+from governor import ResourceGovernor, add_resource_arguments, apply_resource_arguments
+from keyspace import WordlistKeyspace, index_dir_for
+from policy import PasswordPolicy
+from potfile import DEFAULT_POTFILE
+
+DEFAULT_PORT = 8765
+
+# Job states; the last four are final
+STATES = ['queued', 'running', 'cracked', 'exhausted', 'cancelled', 'error']
+
+
+def _engine_cracker_class() -> type:
+    """
+    PasswordCracker of this directory
+
+    pasgan/ has a cracker module of its own that shadows this one when the
+    daemon is started from there, so the file is loaded by path if needed.
+    """
+    engine = Path(__file__).with_name('cracker.py')
+    module = sys.modules.get('cracker')
+    if module is None or Path(getattr(module, '__file__', '')).resolve() != engine.resolve():
+        spec = importlib.util.spec_from_file_location('bruteforce_cracker', engine)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module.PasswordCracker
+
+
+class WordlistCache:
+    """
+    Wordlists kept resident in the page cache for every job that reads them
+
+    Jobs read wordlists through WordlistKeyspace and the attacks' own file
+    reads, not through the mapping: it only pins the file's pages in the
+    shared page cache between jobs so those reads never go to disk. The
+    line index is built on first use and cached in index_dir, if given. A
+    wordlist that changes on disk is mapped again.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None):
+        self.index_dir = index_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def warm(self, path: str) -> int:
+        """
+        Map a wordlist and load its index
+
+        Returns:
+            Number of candidates (non-blank lines)
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry['stamp'] == stamp:
+                return entry['words']
+            if entry is not None and entry['map'] is not None:
+                entry['map'].close()
+
+            mapped = None
+            if stat.st_size:
+                with open(path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+                    mapped.madvise(mmap.MADV_WILLNEED)
+            words = WordlistKeyspace(str(path), self.index_dir).word_count()
+            self._entries[path] = {'stamp': stamp, 'map': mapped, 'words': words}
+            return words
+
+    def describe(self) -> List[Dict]:
+        with self._lock:
+            return [{'path': str(path), 'bytes': entry['stamp'][0], 'words': entry['words']}
+                    for path, entry in self._entries.items()]
+
+    def close(self):
+        with self._lock:
+            for entry in self._entries.values():
+                if entry['map'] is not None:
+                    entry['map'].close()
+            self._entries = {}
+
+
+class Job:
+    """One target and the attack plan run against it"""
+
+    def __init__(self, job_id: int, target: str, plan: AttackPlan, priority: int = 0,
+                 workers: int = 1, policy: Optional[PasswordPolicy] = None,
+                 generate: Optional[Dict] = None):
+        self.id = job_id
+        self.target = target
+        self.plan = plan
+        self.priority = priority
+        self.workers = workers
+        self.policy = policy
+        self.generate = generate
+        self.state = 'queued'
+        self.password = None
+        self.error = None
+        self.report = []
+        self.cracker = None
+        self.cancel_requested = False
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ('cracked', 'exhausted', 'cancelled', 'error')
+
+    def cancel(self):
+        self.cancel_requested = True
+        if self.cracker is not None:
+            self.cracker.cancel()
+
+    def to_dict(self) -> Dict:
+        data = {
+            'id': self.id,
+            'target': self.target,
+            'priority': self.priority,
+            'workers': self.workers,
+            'state': self.state,
+            'password': self.password,
+            'error': self.error,
+            'stages': [stage_name(s) for s in self.plan.stages],
+            'report': self.report,
+            'submitted_at': datetime.fromtimestamp(self.submitted_at).isoformat(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+        }
+        cracker = self.cracker
+        if self.state == 'running' and cracker is not None:
+            elapsed = time.time() - cracker.start_time if cracker.start_time else 0
+            data['progress'] = {
+                'attack': cracker.attack,
+                'attempts': cracker.attempts,
+                'candidates': cracker.total_candidates,
+                'rate': cracker.attempts / elapsed if elapsed > 0 else 0.0,
+            }
+        return data
+
+
+class JobQueue:
+    """Highest priority first, first come first served within a priority"""
+
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, job: Job):
+        with self._cond:
+            heapq.heappush(self._heap, (-job.priority, next(self._order), job))
+            self._cond.notify()
+
+    def get(self) -> Optional[Job]:
+        """Next job to run (cancelled ones are dropped); None once closed"""
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].cancel_requested:
+                    heapq.heappop(self._heap)
+                if self._closed:
+                    return None
+                if self._heap:
+                    return heapq.heappop(self._heap)[2]
+                self._cond.wait()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for _, _, job in self._heap if not job.cancel_requested)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class CrackDaemon:
+    """Runs submitted jobs on warm pools, a few at a time"""
+
+    def __init__(self, slots: int = 1, workers: int = 4, restore_dir: Optional[str] = DEFAULT_RESTORE_DIR,
+                 potfile: Optional[str] = DEFAULT_POTFILE, verbose: bool = True,
+                 governor: Optional[ResourceGovernor] = None):
+        """
+        Args:
+            slots: Jobs run at the same time (the rest wait in priority order)
+            workers: Size of the shared worker pools (a job's own 'workers'
+                     is capped at this)
+            restore_dir: Restore files of the jobs' attacks; a cancelled job
+                         continues where it stopped when submitted again
+            potfile: Potfile consulted and updated by every job (None disables it)
+            verbose: Print a line as each job starts and finishes
+            governor: Resource governor shared by the jobs (memory ceiling:
+                      smaller batches, generators wait for memory)
+        """
+        self.slots = slots
+        self.workers = workers
+        self.restore_dir = restore_dir
+        self.potfile = potfile
+        self.verbose = verbose
+        self.governor = governor
+        self.cracker_class = _engine_cracker_class()
+
+        self.pools = WarmPools(workers)
+        self.wordlists = WordlistCache(index_dir_for(restore_dir))
+        self.queue = JobQueue()
+        self.jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._cracked = []
+        self._generators = {}
+        self._runners = []
+
+    def add_generator(self, name: str, generate: Callable[[int, Optional[PasswordPolicy]], List[str]]):
+        """
+        Keep a candidate generator loaded for jobs that ask for it
+
+        Args:
+            name: Name jobs use in their 'generate' field
+            generate: Function (count, policy) -> passwords; calls are
+                      serialized per generator
+        """
+        self._generators[name] = (generate, threading.Lock())
+
+    def start(self):
+        """Start the job runners and the worker processes"""
+        self.pools.warm_up('processes')
+        for slot in range(self.slots):
+            runner = threading.Thread(target=self._runner, name=f'job-slot-{slot}', daemon=True)
+            runner.start()
+            self._runners.append(runner)
+
+    def stop(self):
+        """Cancel running jobs and release the pools"""
+        self.queue.close()
+        with self._lock:
+            for job in self.jobs.values():
+                if job.state == 'running':
+                    job.cancel()
+        for runner in self._runners:
+            runner.join()
+        self.pools.shutdown()
+        self.wordlists.close()
+
+    def submit(self, spec: Dict) -> Job:
+        """
+        Queue a job
+
+        Args:
+            spec: {"target": path, "plan": plan dict (see AttackPlan) or
+                  "wordlist": path for the default plan, "priority": int
+                  (higher first), "workers": int, "policy": policy string,
+                  "generate": {"generator": name, "count": n}}
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the specification is invalid
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("A job must be a JSON object")
+        target = spec.get('target')
+        if not target or not target_exists(target):
+            raise ValueError(f"Target not found: {target}")
+
+        if spec.get('plan') is not None:
+            plan = spec['plan']
+            if not isinstance(plan, dict):
+                raise ValueError("'plan' must be an object with 'stages'")
+            plan = AttackPlan(plan.get('stages'), plan.get('seconds'), plan.get('guesses'))
+        else:
+            plan = AttackPlan.default(spec.get('wordlist'))
+        for stage in plan.stages:
+            if 'wordlist' in stage:
+                if not Path(stage['wordlist']).exists():
+                    raise ValueError(f"Wordlist not found: {stage['wordlist']}")
+                self.wordlists.warm(stage['wordlist'])
+
+        generate = spec.get('generate')
+        if generate is not None and not isinstance(generate, dict):
+            raise ValueError("'generate' must be an object with 'generator' and 'count'")
+        if generate is not None and generate.get('generator') not in self._generators:
+            raise ValueError(f"Unknown generator: {generate.get('generator')} "
+                             f"(loaded: {sorted(self._generators) or 'none'})")
+
+        policy = PasswordPolicy.parse(spec['policy']) if spec.get('policy') else None
+        with self._lock:
+            job = Job(next(self._ids), str(target), plan, int(spec.get('priority', 0)),
+                      min(int(spec.get('workers', self.workers)), self.workers), policy, generate)
+            self.jobs[job.id] = job
+        self.queue.put(job)
+        return job
+
+    def cancel(self, job_id: int) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job.finished:
+            return job
+        job.cancel()
+        if job.state == 'queued':
+            job.state = 'cancelled'
+            job.finished_at = time.time()
+        return job
+
+    def status(self) -> Dict:
+        with self._lock:
+            states = {state: 0 for state in STATES}
+            for job in self.jobs.values():
+                states[job.state] += 1
+        status = {'slots': self.slots, 'queued': len(self.queue), 'jobs': states,
+                  'pools': self.pools.describe(), 'wordlists': self.wordlists.describe(),
+                  'generators': sorted(self._generators)}
+        if self.governor is not None:
+            status['resources'] = self.governor.describe()
+        return status
+
+    def _runner(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            self._run_job(job)
+
+    def _run_job(self, job: Job):
+        job.state = 'running'
+        job.started_at = time.time()
+        name = Path(job.target).name
+        if self.verbose:
+            print(f"▶ Job {job.id} ({name}): started")
+        try:
+            cracker = self.cracker_class(job.target, verbose=False, restore_dir=self.restore_dir,
+                                         resume=True, workers=job.workers,
+                                         backend='auto' if job.workers > 1 else 'inline',
+                                         potfile=self.potfile, policy=job.policy, pools=self.pools,
+                                         governor=self.governor)
+            job.cracker = cracker
+            if job.cancel_requested:
+                cracker.cancel()
+
+            password = None
+            if job.generate is not None:
+                password = self._run_generator(job, cracker)
+            if password is None and not cracker.interrupted:
+                password, report = run_plan(cracker, job.plan, list(self._cracked))
+                job.report.extend(report)
+        except Exception as e:
+            job.state = 'error'
+            job.error = str(e)
+            job.finished_at = time.time()
+            if self.verbose:
+                print(f"✗ Job {job.id} ({name}): error - {e}")
+            return
+
+        job.password = password
+        if password is not None:
+            job.state = 'cracked'
+            self._cracked.append(password)
+        elif cracker.interrupted or job.cancel_requested:
+            job.state = 'cancelled'
+        else:
+            job.state = 'exhausted'
+        job.finished_at = time.time()
+        if self.verbose:
+            mark = {'cracked': '✓', 'cancelled': '⚠'}.get(job.state, '✗')
+            detail = password if password is not None else job.state
+            print(f"{mark} Job {job.id} ({name}): {detail} ({job.finished_at - job.started_at:.1f}s)")
+
+    def _run_generator(self, job: Job, cracker) -> Optional[str]:
+        """Try a batch from a loaded generator before the plan"""
+        generator = job.generate['generator']
+        generate, lock = self._generators[generator]
+        start = time.time()
+        if self.governor is not None:
+            self.governor.wait_for_memory()
+        with lock:
+            candidates = generate(int(job.generate.get('count', 10000)), job.policy)
+        password = cracker.list_attack(candidates, generator)
+        status = 'cracked' if password else ('interrupted' if cracker.interrupted else 'exhausted')
+        job.report.append({'stage': generator, 'status': status,
+                           'attempts': cracker.attempts, 'time': time.time() - start})
+        return password
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def address_string(self):
+                # Unix socket peers have no address
+                return self.client_address[0] if self.client_address else 'local'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, data: Dict):
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _job_id(self) -> Optional[int]:
+                parts = self.path.strip('/').split('/')
+                if len(parts) == 2 and parts[0] == 'jobs' and parts[1].isdigit():
+                    return int(parts[1])
+                return None
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/status':
+                    self._send(200, daemon.status())
+                elif self.path.rstrip('/') == '/jobs':
+                    jobs = sorted(daemon.jobs.values(), key=lambda j: -j.id)
+                    self._send(200, {'jobs': [job.to_dict() for job in jobs]})
+                elif self._job_id() in daemon.jobs:
+                    self._send(200, {'job': daemon.jobs[self._job_id()].to_dict()})
+                else:
+                    self._send(404, {'error': f"Not found: {self.path}"})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != '/jobs':
+                    self._send(404, {'error': f"Not found: {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    spec = json.loads(self.rfile.read(length) or b'{}')
+                    job = daemon.submit(spec)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    self._send(400, {'error': str(e)})
+                    return
+                self._send(201, {'job': job.to_dict()})
+
+            def do_DELETE(self):
+                job = daemon.cancel(self._job_id()) if self._job_id() is not None else None
+                if job is None:
+                    self._send(404, {'error': f"Not found: {self.path}"})
+                else:
+                    self._send(200, {'job': job.to_dict()})
+
+        return Handler
+
+    def serve(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+              socket_path: Optional[str] = None):
+        """
+        Serve the API until interrupted
+
+        Args:
+            host: Interface to listen on (local by default)
+            port: TCP port
+            socket_path: Listen on this Unix socket instead of TCP
+        """
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = _UnixHTTPServer(socket_path, self._make_handler())
+            address = socket_path
+        else:
+            server = ThreadingHTTPServer((host, port), self._make_handler())
+            address = f"http://{host}:{server.server_address[1]}"
+        server.daemon_threads = True
+
+        # A service manager's SIGTERM stops the daemon like Ctrl-C
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, _interrupt)
+
+        self.start()
+        if self.verbose:
+            print(f"\n{'='*60}")
+            print(f"CRACKING DAEMON")
+            print(f"{'='*60}")
+            print(f"Listening on: {address}")
+            print(f"Job slots: {self.slots} | Pool workers: {self.workers}")
+            print(f"Generators: {', '.join(sorted(self._generators)) or 'none'}")
+            print(f"{'='*60}\n")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            if self.verbose:
+                print(f"\n⚠ Daemon stopping (running jobs are cancelled and can be resumed)")
+        finally:
+            server.server_close()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.stop()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve a local job-queue API for cracking jobs')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port')
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--slots', type=int, default=1, help='Jobs run at the same time')
+    parser.add_argument('--workers', type=int, default=4, help='Workers in the shared pools')
+    parser.add_argument('--wordlist', action='append', default=[],
+                        help='Wordlist to map and index at startup (repeatable)')
+    parser.add_argument('--restore-dir', default=DEFAULT_RESTORE_DIR,
+                        help='Directory for the jobs\' restore files')
+    parser.add_argument('--potfile', default=DEFAULT_POTFILE,
+                        help='Database of cracked files, checked before attacking')
+    parser.add_argument('--no-potfile', action='store_true',
+                        help='Neither consult nor update the potfile')
+    add_resource_arguments(parser)
+    args = parser.parse_args()
+
+    # Before the pools start, so their workers inherit cores and niceness
+    governor = apply_resource_arguments(parser, args)
+    daemon = CrackDaemon(slots=args.slots, workers=args.workers, restore_dir=args.restore_dir,
+                         potfile=None if args.no_potfile else args.potfile, governor=governor)
+    for wordlist in args.wordlist:
+        print(f"Wordlist {wordlist}: {daemon.wordlists.warm(wordlist):,} candidates")
+    daemon.serve(args.host, args.port, args.socket)
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
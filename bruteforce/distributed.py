@@ -0,0 +1,689 @@
+"""
+Distributed Cracking
+A coordinator leases keyspace index ranges to worker hosts over TCP
+
+Protocol: one JSON object per line, one response per request. Every request
+carries the coordinator's shared token; a connection with a wrong one is
+dropped. When the job ends the coordinator also pushes 'stop' to every
+connected worker unasked.
+    hello      -> job        (target description + keyspace description)
+    lease      -> lease | wait | stop
+    heartbeat  -> ok | revoked | stop
+    complete   -> ok | stop
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import base64
+import select
+import socket
+import secrets
+import tempfile
+import threading
+import socketserver
+import multiprocessing as mp
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from candidate_batch import CandidateBatch
+from checkpoint import Checkpoint, DEFAULT_RESTORE_DIR, checkpoint_path
+from containers import read_target
+from keyspace import (MATRIX_BATCH, BruteForceKeyspace, Keyspace, MaskKeyspace,
+                      WordlistKeyspace, index_dir_for, keyspace_from_description)
+from verifiers import create_verifier, file_type_for
+
+# Seconds of verifying between a worker's checks for a pushed 'stop'
+STOP_POLL = 0.1
+
+
+def describe_target(target_file: str) -> Dict:
+    """Compact, self-contained description of a target for remote workers"""
+    path = Path(target_file)
+    file_type = file_type_for(path)
+    if file_type is None:
+        raise ValueError(f"Unsupported file type: {path.suffix.lower()}")
+    return {
+        'name': path.name,
+        'file_type': file_type,
+        'data': base64.b64encode(read_target(path)).decode('ascii'),
+    }
+
+
+class Lease:
+    """An index range handed to one worker"""
+
+    def __init__(self, lease_id: int, start: int, stop: int, worker: str, deadline: float):
+        self.lease_id = lease_id
+        self.start = start
+        self.stop = stop
+        self.progress = start
+        self.worker = worker
+        self.deadline = deadline
+
+
+class Coordinator:
+    """Leases keyspace ranges to workers and collects the result"""
+
+    def __init__(self, target_file: str, keyspace: Keyspace, host: str = '127.0.0.1',
+                 port: int = 5555, token: Optional[str] = None, lease_size: int = 10000,
+                 lease_timeout: float = 30.0, restore_dir: Optional[str] = None,
+                 resume: bool = False, verbose: bool = True):
+        """
+        Args:
+            target_file: Path to the password-protected file
+            keyspace: Keyspace to distribute
+            host: Interface to listen on
+            port: TCP port to listen on (0 picks a free port)
+            token: Shared secret workers must present (default: a random one,
+                   printed at startup)
+            lease_size: Number of indices per lease
+            lease_timeout: Seconds without a heartbeat before a lease is re-leased
+            restore_dir: Directory for the periodic restore file (None disables it)
+            resume: Continue from the restore file (outstanding leases are re-leased)
+            verbose: Whether to print progress information
+        """
+        self.target_file = Path(target_file)
+        self.keyspace = keyspace
+        self.host = host
+        self.port = port
+        self.token = token or secrets.token_urlsafe(16)
+        self._generated_token = token is None
+        self.lease_size = lease_size
+        self.lease_timeout = lease_timeout
+        self.verbose = verbose
+
+        self.verifier = create_verifier(self.target_file)
+        self.target = describe_target(self.target_file)
+        self.total = len(keyspace)
+
+        self.attempts = 0
+        self.password = None
+        self.start_time = None
+
+        # Worker name -> leases handed out
+        self.workers = {}
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._requeue = deque()
+        self._leases = {}
+        self._lease_ids = 0
+        # _done stops the run; _finished means there is nothing left to do
+        # (an interrupted run is done but not finished)
+        self._done = threading.Event()
+        self._finished = False
+        self._listening = threading.Event()
+        self._server = None
+        self._clients = set()
+        
+        self.checkpoint = None
+        if restore_dir is not None:
+            job = {'target': str(self.target_file.resolve()), 'attack': 'distributed',
+                   'keyspace': keyspace.describe()}
+            self.checkpoint = Checkpoint(checkpoint_path(restore_dir, job), job)
+            if resume:
+                self._restore(self.checkpoint.load() or {})
+
+    # Restore file
+
+    def _restore(self, state: Dict):
+        """Reload lease state; ranges that were leased out go back in the queue"""
+        self._next = state.get('next', 0)
+        self._requeue.extend(tuple(r) for r in state.get('pending', []))
+        self.attempts = state.get('attempts', 0)
+        if state.get('complete'):
+            self.password = state.get('password')
+            self._finish()
+
+    def _save_checkpoint(self, force: bool = False):
+        """Persist lease state (caller holds the lock)"""
+        if self.checkpoint is None or not (force or self.checkpoint.due()):
+            return
+        pending = list(self._requeue) + [(l.progress, l.stop) for l in self._leases.values()
+                                         if l.progress < l.stop]
+        self.checkpoint.save({
+            'next': self._next,
+            'pending': pending,
+            'attempts': self.attempts,
+            'complete': self._finished,
+            'password': self.password,
+        })
+
+    # Lease bookkeeping (caller holds the lock)
+
+    def _reap_expired(self):
+        now = time.time()
+        for lease_id, lease in list(self._leases.items()):
+            if lease.deadline < now:
+                del self._leases[lease_id]
+                if lease.progress < lease.stop:
+                    self._requeue.append((lease.progress, lease.stop))
+                if self.verbose:
+                    print(f"⚠ Lease {lease_id} from {lease.worker} expired, "
+                          f"re-leasing {lease.progress:,}-{lease.stop:,}")
+
+    def _finish(self):
+        self._finished = True
+        self._done.set()
+
+    def _check_exhausted(self):
+        if self._next >= self.total and not self._requeue and not self._leases:
+            self._finish()
+
+    def _stop_message(self) -> Dict:
+        return {'op': 'stop', 'password': self.password}
+
+    # Request handlers
+
+    def authorized(self, msg: Dict) -> bool:
+        return hmac.compare_digest(str(msg.get('token', '')).encode('utf-8'),
+                                   self.token.encode('utf-8'))
+
+    def handle(self, msg: Dict, worker: str) -> Dict:
+        op = msg.get('op')
+        if not self.authorized(msg):
+            return {'op': 'error', 'error': 'bad token'}
+        with self._lock:
+            if op == 'hello':
+                return self._handle_hello()
+            if self._done.is_set():
+                return self._stop_message()
+            if op == 'lease':
+                return self._handle_lease(worker)
+            elif op == 'heartbeat':
+                return self._handle_heartbeat(msg)
+            elif op == 'complete':
+                return self._handle_complete(msg)
+            return {'op': 'error', 'error': f"unknown op: {op}"}
+
+    def _handle_hello(self) -> Dict:
+        keyspace = self.keyspace.describe()
+        if isinstance(self.keyspace, WordlistKeyspace):
+            # Workers get the words with each lease instead of the wordlist
+            keyspace = {'type': 'inline'}
+        return {
+            'op': 'job',
+            'target': self.target,
+            'keyspace': keyspace,
+            'heartbeat_interval': self.lease_timeout / 3,
+        }
+
+    def _handle_lease(self, worker: str) -> Dict:
+        self._reap_expired()
+
+        if self._requeue:
+            start, stop = self._requeue.popleft()
+        elif self._next < self.total:
+            start = self._next
+            stop = min(start + self.lease_size, self.total)
+            self._next = stop
+        elif self._leases:
+            return {'op': 'wait', 'retry': min(1.0, self.lease_timeout / 3)}
+        else:
+            self._check_exhausted()
+            return self._stop_message()
+
+        self._lease_ids += 1
+        lease = Lease(self._lease_ids, start, stop, worker, time.time() + self.lease_timeout)
+        self._leases[lease.lease_id] = lease
+        self.workers[worker] = self.workers.get(worker, 0) + 1
+
+        reply = {'op': 'lease', 'lease_id': lease.lease_id, 'start': start, 'stop': stop}
+        if isinstance(self.keyspace, WordlistKeyspace):
+            reply['words'] = list(self.keyspace.iter_lines(start, stop))
+        return reply
+
+    def _handle_heartbeat(self, msg: Dict) -> Dict:
+        lease = self._leases.get(msg.get('lease_id'))
+        if lease is None:
+            return {'op': 'revoked'}
+        lease.progress = max(lease.progress, min(int(msg.get('progress', lease.start)), lease.stop))
+        lease.deadline = time.time() + self.lease_timeout
+        return {'op': 'ok'}
+
+    def _handle_complete(self, msg: Dict) -> Dict:
+        lease = self._leases.pop(msg.get('lease_id'), None)
+        self.attempts += int(msg.get('attempts', 0))
+
+        password = msg.get('password')
+        if password is not None:
+            # Never trust a remote hit blindly
+            if self.verifier.verify(password):
+                self.password = password
+                self._finish()
+                if self.verbose:
+                    print(f"\n✓ Password found by {lease.worker if lease else 'worker'}: {password}")
+                return self._stop_message()
+            if self.verbose:
+                print(f"\n⚠ Rejected unverifiable hit {password!r} from "
+                      f"{lease.worker if lease else 'worker'}")
+
+        self._check_exhausted()
+        if self._done.is_set():
+            return self._stop_message()
+        return {'op': 'ok'}
+
+    # Server
+
+    def _make_handler(self):
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def setup(self):
+                super().setup()
+                # Replies and pushed stops come from different threads
+                self.send_lock = threading.Lock()
+                with coordinator._lock:
+                    coordinator._clients.add(self)
+
+            def finish(self):
+                with coordinator._lock:
+                    coordinator._clients.discard(self)
+                super().finish()
+
+            def send(self, reply: Dict):
+                with self.send_lock:
+                    self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+
+            def handle(self):
+                worker = f"{self.client_address[0]}:{self.client_address[1]}"
+                try:
+                    for line in self.rfile:
+                        try:
+                            msg = json.loads(line)
+                        except ValueError:
+                            break
+                        worker = msg.get('worker', worker)
+                        reply = coordinator.handle(msg, worker)
+                        self.send(reply)
+                        if reply.get('error') == 'bad token':
+                            break
+                except ConnectionError:
+                    # A worker that exits with a pushed 'stop' still unread resets the connection
+                    pass
+
+        return Handler
+
+    def _push_stop(self):
+        """Tell every connected worker to stop now rather than at its next request"""
+        with self._lock:
+            clients = list(self._clients)
+            message = self._stop_message()
+        for client in clients:
+            try:
+                client.send(message)
+            except OSError:
+                pass
+
+    def run(self, linger: Optional[float] = None) -> Optional[str]:
+        """
+        Serve leases until the password is found or the keyspace is exhausted
+
+        Args:
+            linger: Seconds to keep answering 'stop' after the end
+                    (default: one heartbeat interval)
+
+        Returns:
+            Correct password if found, None otherwise
+        """
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._listening.set()
+
+        self.start_time = time.time()
+        if self.verbose:
+            print(f"\n{'='*60}")
+            print(f"DISTRIBUTED COORDINATOR")
+            print(f"{'='*60}")
+            print(f"Target file: {self.target_file}")
+            print(f"Keyspace: {self.keyspace.describe()['type']} ({self.total:,} indices)")
+            print(f"Listening on: {self.host}:{self.port}")
+            if self._generated_token:
+                print(f"Token: {self.token} (pass to workers with --token)")
+            print(f"Lease size: {self.lease_size:,} | Lease timeout: {self.lease_timeout:.0f}s")
+            print(f"{'='*60}\n")
+
+        try:
+            while not self._done.wait(1.0):
+                with self._lock:
+                    self._reap_expired()
+                    self._save_checkpoint()
+                    done = min([self._next] + [l.start for l in self._leases.values()]
+                               + [s for s, _ in self._requeue])
+                    active = len(self._leases)
+                if self.verbose:
+                    print(f"\rCompleted below: {done:,}/{self.total:,} | Active leases: {active} | "
+                          f"Attempts: {self.attempts:,}", end='', flush=True)
+        except KeyboardInterrupt:
+            if self.verbose:
+                print(f"\n\n⚠ Coordinator interrupted by user")
+            self._done.set()
+
+        with self._lock:
+            self._save_checkpoint(force=True)
+        self._push_stop()
+
+        # Let workers between connections hear 'stop' before going away
+        time.sleep(self.lease_timeout / 3 if linger is None else linger)
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self.verbose:
+            elapsed = time.time() - self.start_time
+            print(f"\n{'='*60}")
+            print(f"✓ Password: {self.password}" if self.password else "✗ Password not found")
+            print(f"Attempts: {self.attempts:,}")
+            print(f"Workers: {len(self.workers)} ({sum(self.workers.values()):,} leases)")
+            print(f"Time elapsed: {elapsed:.2f}s")
+            print(f"{'='*60}\n")
+
+        return self.password
+
+
+class Worker:
+    """Requests leases from a coordinator and verifies them locally"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 5555, token: str = '',
+                 name: str = None, connect_timeout: float = 30.0, verbose: bool = True):
+        """
+        Args:
+            host: Coordinator host
+            port: Coordinator port
+            token: The coordinator's shared token
+            name: Worker name reported to the coordinator
+            connect_timeout: Seconds to keep retrying the initial connection
+            verbose: Whether to print progress information
+        """
+        self.host = host
+        self.port = port
+        self.token = token
+        self.name = name or f"{socket.gethostname()}/{os.getpid()}"
+        self.connect_timeout = connect_timeout
+        self.verbose = verbose
+        self.attempts = 0
+
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        deadline = time.time() + self.connect_timeout
+        while True:
+            try:
+                self._sock = socket.create_connection((self.host, self.port))
+                break
+            except OSError:
+                if time.time() >= deadline:
+                    raise
+                time.sleep(0.5)
+        self._file = self._sock.makefile('rwb')
+
+    def _read(self) -> Dict:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed the connection")
+        reply = json.loads(line)
+        if reply.get('error') == 'bad token':
+            raise PermissionError("Coordinator rejected the token")
+        return reply
+
+    def _request(self, msg: Dict) -> Dict:
+        # A stop pushed since the last reply is read in place of this reply
+        msg['worker'] = self.name
+        msg['token'] = self.token
+        self._file.write(json.dumps(msg).encode('utf-8') + b'\n')
+        self._file.flush()
+        return self._read()
+
+    def _pushed(self) -> Optional[Dict]:
+        """A message the coordinator pushed unasked (only ever 'stop'), if one arrived"""
+        if not select.select([self._sock], [], [], 0)[0]:
+            return None
+        return self._read()
+
+    def _work(self, lease: Dict, keyspace: Optional[Keyspace], verifier,
+              heartbeat_interval: float) -> Tuple[Optional[str], int, Optional[Dict]]:
+        """
+        Verify one lease
+
+        Candidates go through the verifier in chunks like a local attack:
+        uint8 matrices through verify_matrix() for vectorized mask and brute
+        force keyspaces, otherwise CandidateBatch batches through
+        verify_batch() (prefilter and confirm where the verifier has them).
+        Chunks grow or shrink to take about STOP_POLL seconds; pushed stops
+        and heartbeats are handled between them.
+
+        Returns:
+            (password or None, attempts, interrupting reply or None)
+        """
+        start, stop = lease['start'], lease['stop']
+        matrices = keyspace is not None and keyspace.supports_matrices and verifier.vectorized
+        largest = MATRIX_BATCH if matrices else verifier.prefilter_batch
+
+        attempts = 0
+        size = 1
+        index = start
+        last_beat = time.time()
+        while index < stop:
+            end = min(index + size, stop)
+            started = time.time()
+            if matrices:
+                matrix, lengths = keyspace.matrix_range(index, end)
+                hit = verifier.verify_matrix(matrix, lengths)
+                if hit is not None:
+                    password = matrix[hit, :lengths[hit]].tobytes().decode('ascii')
+                    return password, attempts + hit + 1, None
+                attempts += len(lengths)
+            else:
+                if keyspace is None:
+                    chunk = [word for word in lease['words'][index - start:end - start] if word]
+                else:
+                    chunk = list(keyspace.iter_range(index, end))
+                password = verifier.verify_batch(CandidateBatch.from_passwords(chunk))
+                if password is not None:
+                    return password, attempts + chunk.index(password) + 1, None
+                attempts += len(chunk)
+            index = end
+
+            elapsed = time.time() - started
+            if elapsed < STOP_POLL / 2:
+                size = min(size * 2, largest)
+            elif elapsed > STOP_POLL * 2:
+                size = max(1, size // 2)
+
+            pushed = self._pushed()
+            if pushed is not None:
+                return None, attempts, pushed
+
+            if time.time() - last_beat >= heartbeat_interval:
+                reply = self._request({'op': 'heartbeat', 'lease_id': lease['lease_id'],
+                                       'progress': index})
+                if reply['op'] != 'ok':
+                    return None, attempts, reply
+                last_beat = time.time()
+
+        return None, attempts, None
+
+    def run(self) -> Optional[str]:
+        """
+        Work until the coordinator says stop
+
+        Returns:
+            Password reported by the coordinator, if any
+        """
+        self._connect()
+        try:
+            job = self._request({'op': 'hello'})
+            target = job['target']
+            heartbeat_interval = job.get('heartbeat_interval', 10.0)
+            keyspace = None
+            if job['keyspace']['type'] != 'inline':
+                keyspace = keyspace_from_description(job['keyspace'])
+
+            with tempfile.TemporaryDirectory(prefix='crackworker_') as tmp:
+                target_path = Path(tmp) / target['name']
+                target_path.write_bytes(base64.b64decode(target['data']))
+                verifier = create_verifier(target_path, target['file_type'])
+
+                while True:
+                    reply = self._request({'op': 'lease'})
+                    if reply['op'] == 'stop':
+                        return reply.get('password')
+                    if reply['op'] == 'wait':
+                        time.sleep(reply.get('retry', 1.0))
+                        continue
+
+                    password, attempts, interrupt = self._work(reply, keyspace, verifier,
+                                                               heartbeat_interval)
+                    self.attempts += attempts
+                    if interrupt is not None:
+                        if interrupt['op'] == 'stop':
+                            return interrupt.get('password')
+                        # Revoked: somebody else owns the range now
+                        continue
+
+                    if self.verbose:
+                        print(f"[{self.name}] lease {reply['lease_id']} "
+                              f"({reply['start']:,}-{reply['stop']:,}) done", flush=True)
+
+                    done = self._request({'op': 'complete', 'lease_id': reply['lease_id'],
+                                          'attempts': attempts, 'password': password})
+                    if done['op'] == 'stop':
+                        return done.get('password')
+        except ConnectionError:
+            return None
+        except PermissionError as e:
+            print(f"✗ [{self.name}] {e}")
+            return None
+        finally:
+            self._file.close()
+            self._sock.close()
+
+
+def _worker_process(host: str, port: int, token: str, index: int, verbose: bool):
+    """Process entry point for run_workers()"""
+    Worker(host, port, token, name=f"{socket.gethostname()}/{os.getpid()}#{index}",
+           verbose=verbose).run()
+
+
+def run_workers(host: str, port: int, token: str, procs: int = 1, verbose: bool = True):
+    """Run several worker processes on this host and wait for them"""
+    if procs <= 1:
+        return Worker(host, port, token, verbose=verbose).run()
+
+    processes = [mp.Process(target=_worker_process, args=(host, port, token, i, verbose))
+                 for i in range(procs)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+def run_local(target_file: str, keyspace: Keyspace, procs: int = 3,
+              lease_size: int = 1000, verbose: bool = True) -> Coordinator:
+    """
+    Run a coordinator and several worker processes on localhost
+
+    Returns:
+        The finished coordinator (password, attempts, workers)
+    """
+    coordinator = Coordinator(target_file, keyspace, host='127.0.0.1', port=0,
+                              lease_size=lease_size, lease_timeout=10.0, verbose=verbose)
+    thread = threading.Thread(target=coordinator.run, kwargs={'linger': 0.5})
+    thread.start()
+    coordinator._listening.wait()
+    run_workers('127.0.0.1', coordinator.port, coordinator.token, procs, verbose=False)
+    thread.join()
+    return coordinator
+
+
+def self_check(procs: int = 3, verbose: bool = True) -> bool:
+    """
+    Crack a generated ZipCrypto fixture with several worker processes on localhost
+
+    The password sits near the end of a 4-digit mask keyspace, so every
+    worker takes leases before the hit stops them all.
+    """
+    from fixtures import make_zipcrypto
+
+    password = '9137'
+    procs = max(2, procs)
+    with tempfile.TemporaryDirectory(prefix='distcheck_') as tmp:
+        target = str(Path(tmp) / 'check.zip')
+        make_zipcrypto(target, password)
+        coordinator = run_local(target, MaskKeyspace.from_mask('?d?d?d?d'), procs,
+                                lease_size=500, verbose=verbose)
+
+    ok = coordinator.password == password and len(coordinator.workers) == procs
+    print(f"{'✓' if ok else '✗'} Local check: {coordinator.password or 'no password'} "
+          f"with {len(coordinator.workers)} workers "
+          f"({', '.join(f'{n} leases' for n in coordinator.workers.values())})")
+    return ok
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Distributed keyspace cracking over TCP')
+    sub = parser.add_subparsers(dest='role', required=True)
+
+    coord = sub.add_parser('coordinator', help='Lease a keyspace to workers')
+    coord.add_argument('file', help='Target file to crack')
+    coord.add_argument('-w', '--wordlist', help='Wordlist keyspace')
+    coord.add_argument('--mask', help='Mask keyspace, e.g. ?u?l?l?l?d?d')
+    coord.add_argument('--charset', help='Brute force charset (default: alphanumeric)')
+    coord.add_argument('--min-length', type=int, default=1, help='Minimum length (brute force)')
+    coord.add_argument('--max-length', type=int, default=6, help='Maximum length (brute force)')
+    coord.add_argument('--host', default='127.0.0.1',
+                       help="Interface to listen on (e.g. 0.0.0.0 to accept remote workers)")
+    coord.add_argument('--port', type=int, default=5555, help='TCP port')
+    coord.add_argument('--token', help='Shared secret workers must present (default: random, printed)')
+    coord.add_argument('--lease-size', type=int, default=10000, help='Indices per lease')
+    coord.add_argument('--lease-timeout', type=float, default=30.0,
+                       help='Seconds without heartbeat before re-leasing')
+    coord.add_argument('--resume', action='store_true',
+                       help='Continue from the restore file')
+    coord.add_argument('--restore-dir', default=DEFAULT_RESTORE_DIR,
+                       help='Directory for periodic restore files')
+
+    work = sub.add_parser('worker', help='Crack leases from a coordinator')
+    work.add_argument('--host', default='127.0.0.1', help='Coordinator host')
+    work.add_argument('--port', type=int, default=5555, help='Coordinator port')
+    work.add_argument('--token', required=True, help="The coordinator's shared token")
+    work.add_argument('--procs', type=int, default=1, help='Worker processes on this host')
+    work.add_argument('-q', '--quiet', action='store_true', help='Only print the result')
+
+    check = sub.add_parser('check', help='Crack a generated file with local worker processes')
+    check.add_argument('--procs', type=int, default=3, help='Worker processes (at least 2)')
+
+    args = parser.parse_args()
+
+    if args.role == 'coordinator':
+        if args.wordlist:
+            keyspace = WordlistKeyspace(args.wordlist, index_dir_for(args.restore_dir))
+        elif args.mask:
+            keyspace = MaskKeyspace.from_mask(args.mask)
+        else:
+            keyspace = BruteForceKeyspace(args.charset, args.min_length, args.max_length)
+
+        coordinator = Coordinator(args.file, keyspace, host=args.host, port=args.port,
+                                  token=args.token, lease_size=args.lease_size, lease_timeout=args.lease_timeout,
+                                  restore_dir=args.restore_dir, resume=args.resume)
+        password = coordinator.run()
+        sys.exit(0 if password else 1)
+    elif args.role == 'check':
+        sys.exit(0 if self_check(args.procs) else 1)
+    else:
+        run_workers(args.host, args.port, args.token, args.procs, verbose=not args.quiet)
+
+
+if __name__ == '__main__':
+    main()
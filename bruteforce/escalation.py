@@ -0,0 +1,262 @@
+"""
+Attack Plans
+Ordered attack stages with time and guess budgets, escalated automatically
+"""
+
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from merge import DEFAULT_WINDOW
+from potfile import check_potfile
+from rules import neighborhood
+
+# Attack of each stage type and the parameters it requires
+STAGE_TYPES = {
+    'potfile': [],
+    'reuse': [],
+    'dictionary': ['wordlist'],
+    'hybrid': ['wordlist'],
+    'mask': ['masks'],
+    'brute_force': [],
+    'merged': ['sources'],
+}
+
+# Masks tried by the default plan, shortest first within each class
+DEFAULT_MASKS = (['?d' * n for n in range(4, 9)] +
+                 ['?l' * n for n in range(4, 7)] +
+                 ['?u' + '?l' * n + '?d?d' for n in range(3, 6)])
+
+
+def stage_name(stage: Dict) -> str:
+    return stage.get('name') or stage['attack']
+
+
+class AttackPlan:
+    """
+    Ordered attack stages with optional budgets
+
+    A plan file is JSON:
+
+        {"seconds": 3600, "guesses": 50000000,
+         "stages": [{"attack": "potfile"},
+                    {"attack": "reuse"},
+                    {"attack": "dictionary", "name": "top-10k",
+                     "wordlist": "wordlists/top10k.txt", "seconds": 60},
+                    {"attack": "hybrid", "wordlist": "wordlists/top10k.txt"},
+                    {"attack": "mask", "masks": ["?d?d?d?d", "?d?d?d?d?d?d"]},
+                    {"attack": "dictionary", "name": "passgan",
+                     "wordlist": "../pasgan/generated_passwords.txt"},
+                    {"attack": "merged", "name": "markov",
+                     "sources": ["scored:markov.tsv"]}]}
+
+    Every stage may set "seconds" and "guesses" budgets; the top-level ones
+    bound the whole plan. A stage ends when it is exhausted or over budget,
+    and the plan escalates to the next one.
+    """
+
+    def __init__(self, stages: List[Dict], seconds: Optional[float] = None,
+                 guesses: Optional[int] = None):
+        """
+        Args:
+            stages: Stage dictionaries ('attack' plus its parameters)
+            seconds: Time budget for the whole plan
+            guesses: Guess budget for the whole plan
+        """
+        if not stages:
+            raise ValueError("An attack plan needs at least one stage")
+        if not isinstance(stages, list) or not all(isinstance(s, dict) for s in stages):
+            raise ValueError("An attack plan's stages must be a list of objects")
+        for stage in stages:
+            attack = stage.get('attack')
+            if attack not in STAGE_TYPES:
+                raise ValueError(f"Unknown stage attack '{attack}' "
+                                 f"(expected one of {sorted(STAGE_TYPES)})")
+            if attack == 'mask' and 'mask' in stage:
+                stage['masks'] = [stage.pop('mask')]
+            for param in STAGE_TYPES[attack]:
+                if param not in stage:
+                    raise ValueError(f"Stage '{stage_name(stage)}' needs '{param}'")
+
+        self.stages = stages
+        self.seconds = seconds
+        self.guesses = guesses
+
+    @classmethod
+    def load(cls, path: str) -> 'AttackPlan':
+        """Read a plan file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['stages'], data.get('seconds'), data.get('guesses'))
+
+    @classmethod
+    def default(cls, wordlist: Optional[str] = None) -> 'AttackPlan':
+        """
+        Cheap to expensive: potfile, reuse, top of the wordlist, hybrid,
+        masks by length, the whole wordlist, short brute force
+        """
+        stages = [{'attack': 'potfile'}, {'attack': 'reuse'}]
+        if wordlist is not None:
+            stages += [
+                {'attack': 'dictionary', 'name': 'top-10k', 'wordlist': wordlist, 'guesses': 10000},
+                {'attack': 'hybrid', 'wordlist': wordlist, 'guesses': 1000000},
+            ]
+        stages.append({'attack': 'mask', 'masks': DEFAULT_MASKS})
+        if wordlist is not None:
+            stages.append({'attack': 'dictionary', 'wordlist': wordlist})
+        stages.append({'attack': 'brute_force', 'max_length': 5})
+        return cls(stages)
+
+    def to_dict(self) -> Dict:
+        return {'seconds': self.seconds, 'guesses': self.guesses, 'stages': self.stages}
+
+
+def reuse_candidates(known: Iterable[str], potfile=None, limit: int = 10000) -> List[str]:
+    """Known passwords (and the potfile's) with their close variants"""
+    passwords = list(known)
+    if potfile is not None:
+        passwords += [entry['password'] for entry in potfile.entries()]
+
+    candidates = []
+    seen = set()
+    for password in passwords:
+        for candidate in neighborhood(password):
+            if candidate not in seen:
+                seen.add(candidate)
+                candidates.append(candidate)
+    return candidates[:limit]
+
+
+def run_stage(cracker, stage: Dict, known: Iterable[str] = (), deadline: Optional[float] = None,
+              guesses: Optional[int] = None) -> Tuple[Optional[str], str]:
+    """
+    Run one stage on a PasswordCracker
+
+    Args:
+        cracker: PasswordCracker for the target
+        stage: Stage dictionary
+        known: Passwords cracked elsewhere (for the reuse stage)
+        deadline: time.time() by which the stage must stop (plan budget)
+        guesses: Guesses left in the plan budget
+
+    Returns:
+        (password or None, status): status is 'cracked', 'exhausted',
+        'budget' (stopped by a budget), 'interrupted' or 'skipped'
+    """
+    attack = stage['attack']
+    if stage.get('seconds') is not None:
+        stage_deadline = time.time() + stage['seconds']
+        deadline = stage_deadline if deadline is None else min(deadline, stage_deadline)
+    limits = [n for n in (stage.get('guesses'), guesses) if n is not None]
+    budget = min(limits) if limits else None
+
+    cracker.attempts = 0
+    if deadline is not None and time.time() >= deadline:
+        return None, 'budget'
+    if budget is not None and budget <= 0:
+        return None, 'budget'
+
+    if attack == 'potfile':
+        if cracker.potfile is None:
+            return None, 'skipped'
+        password = check_potfile(cracker.potfile, cracker.verifier, cracker.file_hash)
+        cracker.from_potfile = password is not None
+        return (password, 'cracked') if password else (None, 'exhausted')
+
+    cracker.deadline = deadline
+    cracker.guess_budget = budget
+    over_budget = False
+    used = 0
+    password = None
+    try:
+        if attack == 'reuse':
+            candidates = reuse_candidates(known, cracker.potfile)
+            if not candidates:
+                return None, 'skipped'
+            password = cracker.list_attack(candidates, 'reuse')
+        elif attack == 'dictionary':
+            password = cracker.dictionary_attack(stage['wordlist'],
+                                                 max_passwords=stage.get('max_passwords'))
+        elif attack == 'hybrid':
+            password = cracker.hybrid_attack(stage['wordlist'], stage.get('mutations'))
+        elif attack == 'mask':
+            for mask in stage['masks']:
+                password = cracker.mask_attack(mask)
+                used += cracker.attempts
+                if password or cracker.interrupted or cracker.limit_reached:
+                    break
+                if budget is not None:
+                    cracker.guess_budget = budget - used
+                    if cracker.guess_budget <= 0:
+                        over_budget = True
+                        break
+            # Report the stage's attempts rather than the last mask's
+            cracker.attempts = used
+        elif attack == 'brute_force':
+            password = cracker.brute_force_attack(stage.get('charset'), stage.get('min_length', 1),
+                                                  stage.get('max_length', 6))
+        elif attack == 'merged':
+            password = cracker.merged_attack(stage['sources'], max_passwords=stage.get('max_passwords'),
+                                             window=stage.get('window', DEFAULT_WINDOW))
+    finally:
+        cracker.deadline = None
+        cracker.guess_budget = None
+
+    if password is not None:
+        return password, 'cracked'
+    if cracker.interrupted:
+        return None, 'interrupted'
+    if over_budget or cracker.limit_reached:
+        return None, 'budget'
+    return None, 'exhausted'
+
+
+def run_plan(cracker, plan: AttackPlan, known: Iterable[str] = ()) -> Tuple[Optional[str], List[Dict]]:
+    """
+    Escalate through a plan's stages on one target until it cracks
+
+    Args:
+        cracker: PasswordCracker for the target
+        plan: Attack plan
+        known: Passwords cracked elsewhere (for the reuse stage)
+
+    Returns:
+        (password or None, per-stage report)
+    """
+    start = time.time()
+    deadline = start + plan.seconds if plan.seconds is not None else None
+    used = 0
+    report = []
+    known = list(known)
+
+    for n, stage in enumerate(plan.stages, 1):
+        remaining = plan.guesses - used if plan.guesses is not None else None
+        if cracker.verbose:
+            print(f"\n>>> Stage {n}/{len(plan.stages)}: {stage_name(stage)}")
+        stage_start = time.time()
+        password, status = run_stage(cracker, stage, known, deadline, remaining)
+        used += cracker.attempts
+        report.append({'stage': stage_name(stage), 'status': status,
+                       'attempts': cracker.attempts, 'time': time.time() - stage_start})
+        if cracker.verbose and status in ('skipped', 'budget', 'exhausted'):
+            print(f"<<< Stage {stage_name(stage)}: {status}")
+
+        if password is not None or status == 'interrupted':
+            return password, report
+        if deadline is not None and time.time() >= deadline:
+            break
+        if plan.guesses is not None and used >= plan.guesses:
+            break
+
+    return None, report
+
+
+def print_report(report: List[Dict]):
+    """Print the per-stage report of run_plan()"""
+    print(f"\n{'='*60}")
+    print(f"ATTACK PLAN")
+    print(f"{'='*60}")
+    for n, entry in enumerate(report, 1):
+        print(f"{n:>3}. {entry['stage']:<20} {entry['status']:<12} "
+              f"{entry['attempts']:>12,} attempts  {entry['time']:.2f}s")
+    print(f"{'='*60}\n")
@@ -0,0 +1,270 @@
+"""
+Execution Backends
+Inline, thread-pool and process-pool executors shared by the crackers
+"""
+
+import os
+import time
+import uuid
+import pickle
+import signal
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+BACKENDS = ['auto', 'inline', 'threads', 'processes']
+
+
+class InlineExecutor(concurrent.futures.Executor):
+    """Executor that runs every task immediately in the calling thread"""
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        if initializer is not None:
+            initializer(*initargs)
+        self._shutdown = False
+
+    def submit(self, fn, *args, **kwargs):
+        if self._shutdown:
+            raise RuntimeError('cannot schedule new futures after shutdown')
+
+        future = concurrent.futures.Future()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._shutdown = True
+
+
+# Verifier installed in each process-pool worker by VerifierPool
+_worker_verifier = None
+
+
+def _install_verifier(verifier):
+    global _worker_verifier
+    _worker_verifier = verifier
+
+
+def timed_verify_batch(verifier, passwords):
+    """Verify a batch, returning (correct password or None, seconds taken)"""
+    start = time.perf_counter()
+    hit = verifier.verify_batch(passwords)
+    return hit, time.perf_counter() - start
+
+
+def _verify_batch(passwords):
+    return timed_verify_batch(_worker_verifier, passwords)
+
+
+def _noop():
+    return None
+
+
+# Verifiers of the jobs sharing a warm process pool, by VerifierPool token
+_SHARED_VERIFIER_LIMIT = 8
+_shared_verifiers = OrderedDict()
+
+
+def _ignore_interrupts():
+    # Ctrl-C reaches the whole process group; the owner shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _verify_shared(token: str, payload: bytes, passwords):
+    """Warm-pool task: unpickle the job's verifier once per worker, then verify"""
+    verifier = _shared_verifiers.get(token)
+    if verifier is None:
+        verifier = pickle.loads(payload)
+        _shared_verifiers[token] = verifier
+        if len(_shared_verifiers) > _SHARED_VERIFIER_LIMIT:
+            _shared_verifiers.popitem(last=False)
+    return timed_verify_batch(verifier, passwords)
+
+
+class WarmPools:
+    """
+    Thread and process pools kept alive across attacks (daemon mode)
+
+    VerifierPools built on them skip worker startup: the processes and their
+    imports stay warm, and each attack only ships its verifier (pickled once
+    per attack, unpickled once per worker).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Workers per pool (default: CPU count)
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self._executors: Dict[str, concurrent.futures.Executor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, backend: str) -> concurrent.futures.Executor:
+        """The shared executor of a backend, started on first use"""
+        with self._lock:
+            executor = self._executors.get(backend)
+            if executor is None:
+                initializer = _ignore_interrupts if backend == 'processes' else None
+                executor = create_executor(backend, self.max_workers, initializer=initializer)
+                self._executors[backend] = executor
+            return executor
+
+    def warm_up(self, backend: str = 'processes'):
+        """Start every worker of a backend now rather than on the first attack"""
+        executor = self.get(backend)
+        for future in [executor.submit(_noop) for _ in range(self.max_workers)]:
+            future.result()
+
+    def describe(self) -> Dict:
+        with self._lock:
+            return {'max_workers': self.max_workers, 'backends': sorted(self._executors)}
+
+    def shutdown(self):
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+            self._executors = {}
+
+
+class VerifierPool:
+    """Executor that checks batches of passwords against one verifier"""
+
+    def __init__(self, verifier, backend: str, max_workers: int,
+                 pools: Optional[WarmPools] = None, tracer=None):
+        """
+        Args:
+            verifier: Verifier for the target
+            backend: 'inline', 'threads' or 'processes'
+            max_workers: Number of workers
+            pools: Warm pools to run on instead of starting a new executor
+                   (max_workers is then capped at the pools' size)
+            tracer: Tracer (tracing.py) recording each batch on the worker
+                    that verified it; read results with result()
+        """
+        self.verifier = verifier
+        self.backend = backend
+        self.tracer = tracer
+        self.max_workers = max_workers if backend != 'inline' else 1
+        self.pools = pools if backend != 'inline' else None
+        self._submitted = []
+
+        if self.pools is not None:
+            self.max_workers = min(self.max_workers, self.pools.max_workers)
+            self.executor = self.pools.get(backend)
+            if backend == 'processes':
+                self._token = uuid.uuid4().hex
+                self._payload = pickle.dumps(verifier)
+        # Worker processes get the verifier pickled once, not once per batch
+        elif backend == 'processes':
+            self.executor = create_executor(backend, max_workers,
+                                            initializer=_install_verifier,
+                                            initargs=(verifier,))
+        else:
+            self.executor = create_executor(backend, max_workers)
+
+    def warm_up(self):
+        """Start every worker so that pool startup is not timed as work"""
+        if self.pools is not None:
+            return
+        futures = [self.executor.submit(_noop) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, passwords):
+        """
+        Check a batch (a list or CandidateBatch of passwords)
+
+        The future resolves to (first hit or None, seconds the worker spent
+        verifying), so verification time can be accounted per worker; with
+        a tracer, pass it to result() instead.
+        """
+        if self.pools is not None and self.backend == 'processes':
+            task = (_verify_shared, self._token, self._payload, passwords)
+        elif self.backend == 'processes':
+            task = (_verify_batch, passwords)
+        else:
+            task = (timed_verify_batch, self.verifier, passwords)
+
+        if self.tracer is not None:
+            future = self.tracer.submit(self.executor, *task)
+        else:
+            future = self.executor.submit(*task)
+        if self.pools is not None:
+            self._submitted = [f for f in self._submitted if not f.done()]
+            self._submitted.append(future)
+        return future
+
+    def result(self, future):
+        """(first hit or None, seconds) of a submitted batch, recording its span when tracing"""
+        if self.tracer is not None:
+            return self.tracer.unwrap('verify', future.result(), backend=self.backend)
+        return future.result()
+
+    def shutdown(self):
+        if self.pools is not None:
+            # The executor outlives this attack; drop only its queued batches
+            for future in self._submitted:
+                future.cancel()
+            self._submitted = []
+            return
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def select_backend(verifiers: Iterable, max_workers: int, num_tasks: int) -> str:
+    """
+    Pick the cheapest backend that can keep every worker busy
+
+    Args:
+        verifiers: Verifier classes or instances the tasks will run
+        max_workers: Number of workers available
+        num_tasks: Number of tasks to schedule
+
+    Returns:
+        'inline', 'threads' or 'processes'
+    """
+    if max_workers <= 1 or num_tasks <= 1:
+        return 'inline'
+
+    # Threads avoid pickling entirely but only help when the hot loop
+    # releases the GIL; otherwise they serialize on it. A class that decides
+    # per file (a property, as ZIP does) only counts once instantiated.
+    verifiers = list(verifiers)
+    if verifiers and all(getattr(v, 'releases_gil', False) is True for v in verifiers):
+        return 'threads'
+
+    return 'processes'
+
+
+def create_executor(backend: str, max_workers: int,
+                    initializer: Optional[Callable] = None,
+                    initargs: tuple = ()) -> concurrent.futures.Executor:
+    """
+    Create an executor for a concrete backend
+
+    Args:
+        backend: 'inline', 'threads' or 'processes'
+        max_workers: Number of workers
+        initializer: Optional callable run once per worker
+        initargs: Arguments for the initializer
+
+    Returns:
+        Executor instance (usable as a context manager)
+    """
+    max_workers = max(1, max_workers or os.cpu_count() or 1)
+
+    if backend == 'inline':
+        return InlineExecutor(initializer=initializer, initargs=initargs)
+    elif backend == 'threads':
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, initializer=initializer, initargs=initargs)
+    elif backend == 'processes':
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=initializer, initargs=initargs)
+    else:
+        raise ValueError(f"Unknown execution backend: {backend}")
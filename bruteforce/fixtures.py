@@ -0,0 +1,234 @@
+"""
+Benchmark Fixtures
+Encrypted sample files with known passwords, generated locally
+"""
+
+import io
+import os
+import hmac
+import struct
+import hashlib
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from verifiers import ZipCryptoDecrypter
+
+# File format libraries
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+try:
+    import msoffcrypto
+    from msoffcrypto.format.ooxml import OOXMLFile
+    from msoffcrypto.method.ecma376_standard import ECMA376Standard
+    from msoffcrypto.method.container.ecma376_encrypted import ECMA376Encrypted
+except ImportError:
+    msoffcrypto = None
+
+# AES primitives (a dependency of msoffcrypto-tool)
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+DEFAULT_PASSWORD = 'bench2024'
+
+# Plaintext stored in every fixture: compressible, a few KB
+PAYLOAD = b'The quick brown fox jumps over the lazy dog. ' * 200
+
+
+# ---------------------------------------------------------------------------
+# PDF
+# ---------------------------------------------------------------------------
+
+def make_pdf(path: str, password: str, revision: int):
+    """
+    Write a one-page PDF encrypted with a standard security handler revision
+
+    Args:
+        path: Output path
+        password: User password
+        revision: 2 (RC4-40), 3 (RC4-128), 4 (AES-128) or 6 (AES-256)
+    """
+    if pikepdf is None:
+        raise ImportError("pikepdf is required for PDF fixtures. Install: pip install pikepdf")
+
+    # RC4 revisions cannot leave metadata unencrypted
+    options = {'aes': False, 'metadata': False} if revision in (2, 3) else {}
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    pdf.save(path, encryption=pikepdf.Encryption(owner=password + '-owner', user=password,
+                                                 R=revision, **options))
+
+
+# ---------------------------------------------------------------------------
+# Office
+# ---------------------------------------------------------------------------
+
+def _plain_docx() -> bytes:
+    """Minimal OOXML package accepted by msoffcrypto"""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml',
+                    '<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/'
+                    'package/2006/content-types"/>')
+        zf.writestr('word/document.xml', PAYLOAD)
+        # Incompressible padding: msoffcrypto rejects packages that are too small
+        zf.writestr('word/media/blob.bin', os.urandom(8000), compress_type=zipfile.ZIP_STORED)
+    return buf.getvalue()
+
+
+def make_office_agile(path: str, password: str):
+    """Write a .docx with ECMA-376 Agile encryption (Office 2010+)"""
+    if msoffcrypto is None:
+        raise ImportError("msoffcrypto-tool is required for Office fixtures. Install: pip install msoffcrypto-tool")
+
+    with open(path, 'wb') as out:
+        OOXMLFile(io.BytesIO(_plain_docx())).encrypt(password, out)
+
+
+def make_office_standard(path: str, password: str):
+    """Write a .docx with ECMA-376 Standard encryption (Office 2007, AES-128)"""
+    if msoffcrypto is None:
+        raise ImportError("msoffcrypto-tool is required for Office fixtures. Install: pip install msoffcrypto-tool")
+
+    salt = os.urandom(16)
+    key = ECMA376Standard.makekey_from_password(password, 0x660E, 0x8004, 0x18, 128, 16, salt)
+    aes = Cipher(algorithms.AES(key), modes.ECB())
+
+    def encrypt(data):
+        data += b'\x00' * (-len(data) % 16)
+        encryptor = aes.encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+    # EncryptionHeader: fCryptoAPI | fAES, AES-128, SHA-1, PROV_RSA_AES
+    csp = 'Microsoft Enhanced RSA and AES Cryptographic Provider\0'.encode('utf-16le')
+    header = struct.pack('<8I', 0x24, 0, 0x660E, 0x8004, 128, 0x18, 0, 0) + csp
+
+    verifier = os.urandom(16)
+    verifier_block = (struct.pack('<I', 16) + salt + encrypt(verifier)
+                      + struct.pack('<I', 20) + encrypt(hashlib.sha1(verifier).digest()))
+
+    info = struct.pack('<HHII', 4, 2, 0x24, len(header)) + header + verifier_block
+
+    plain = _plain_docx()
+    package = struct.pack('<Q', len(plain)) + encrypt(plain)
+
+    with open(path, 'wb') as out:
+        ECMA376Encrypted(package, info).write_to(out)
+
+
+# ---------------------------------------------------------------------------
+# ZIP
+# ---------------------------------------------------------------------------
+
+def _write_zip(path: str, name: str, method: int, crc: int, compressed: bytes,
+               size: int, extra: bytes = b''):
+    """Write a single-entry encrypted archive (general purpose flag bit 0)"""
+    fname = name.encode('utf-8')
+    local = struct.pack('<4sHHHHHIIIHH', b'PK\x03\x04', 51 if method == 99 else 20, 1, method,
+                        0, 0x21, crc, len(compressed), size, len(fname), len(extra))
+    central = struct.pack('<4sHHHHHHIIIHHHHHII', b'PK\x01\x02', 63, 51 if method == 99 else 20,
+                          1, method, 0, 0x21, crc, len(compressed), size, len(fname),
+                          len(extra), 0, 0, 0, 0, 0)
+    body = local + fname + extra + compressed
+    directory = central + fname + extra
+    end = struct.pack('<4sHHHHIIH', b'PK\x05\x06', 0, 0, 1, 1, len(directory), len(body), 0)
+
+    with open(path, 'wb') as f:
+        f.write(body + directory + end)
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def make_zipcrypto(path: str, password: str):
+    """Write a ZIP with traditional PKWARE (ZipCrypto) encryption"""
+    checksum = zlib.crc32(PAYLOAD)
+    # 12-byte encryption header; the last byte is the check byte (CRC high byte)
+    plain = os.urandom(11) + bytes([checksum >> 24]) + _deflate(PAYLOAD)
+
+    # The verifier's own cipher, so fixture and verifier cannot drift apart
+    encrypted = ZipCryptoDecrypter(password.encode('utf-8')).encrypt(plain)
+
+    _write_zip(path, 'payload.txt', zipfile.ZIP_DEFLATED, checksum, encrypted, len(PAYLOAD))
+
+
+def make_aes_zip(path: str, password: str, strength: int = 3):
+    """
+    Write a ZIP with WinZip AES encryption (AE-2)
+
+    Args:
+        path: Output path
+        password: Password
+        strength: 1 (AES-128), 2 (AES-192) or 3 (AES-256)
+    """
+    if Cipher is None:
+        raise ImportError("cryptography is required for AES-ZIP fixtures. Install: pip install cryptography")
+
+    key_length = 8 + 8 * strength
+    salt = os.urandom(key_length // 2)
+    derived = hashlib.pbkdf2_hmac('sha1', password.encode('utf-8'), salt, 1000, 2 * key_length + 2)
+    enc_key, auth_key, check = derived[:key_length], derived[key_length:-2], derived[-2:]
+
+    # AES-CTR with a little-endian counter starting at 1
+    compressed = _deflate(PAYLOAD)
+    encryptor = Cipher(algorithms.AES(enc_key), modes.ECB()).encryptor()
+    blocks = (len(compressed) + 15) // 16
+    keystream = encryptor.update(b''.join((i + 1).to_bytes(16, 'little') for i in range(blocks)))
+    ciphertext = bytes(a ^ b for a, b in zip(compressed, keystream))
+
+    auth = hmac.new(auth_key, ciphertext, hashlib.sha1).digest()[:10]
+    extra = struct.pack('<HHH2sBH', 0x9901, 7, 2, b'AE', strength, zipfile.ZIP_DEFLATED)
+
+    # AE-2 stores no CRC; the authentication code protects the data instead
+    _write_zip(path, 'payload.txt', 99, 0, salt + check + ciphertext + auth, len(PAYLOAD), extra)
+
+
+# Fixture name -> (builder, extension, extra arguments)
+FIXTURES = {
+    'pdf-r2': (make_pdf, '.pdf', {'revision': 2}),
+    'pdf-r3': (make_pdf, '.pdf', {'revision': 3}),
+    'pdf-r4': (make_pdf, '.pdf', {'revision': 4}),
+    'pdf-r6': (make_pdf, '.pdf', {'revision': 6}),
+    'office-standard': (make_office_standard, '.docx', {}),
+    'office-agile': (make_office_agile, '.docx', {}),
+    'zip-zipcrypto': (make_zipcrypto, '.zip', {}),
+    'zip-aes': (make_aes_zip, '.zip', {}),
+}
+
+
+def generate_fixtures(output_dir: str, password: str = DEFAULT_PASSWORD,
+                      names: Optional[list] = None) -> Dict[str, Dict]:
+    """
+    Generate encrypted fixtures
+
+    Args:
+        output_dir: Directory to write the fixtures to
+        password: Password for every fixture
+        names: Fixture names to generate (default: all)
+
+    Returns:
+        Dictionary mapping fixture name to {'path'} or {'error'} when a
+        format library is missing
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    fixtures = {}
+    for name in names or FIXTURES:
+        builder, extension, options = FIXTURES[name]
+        path = output_dir / f'{name}{extension}'
+        try:
+            builder(str(path), password, **options)
+            fixtures[name] = {'path': str(path)}
+        except ImportError as e:
+            fixtures[name] = {'error': str(e)}
+
+    return fixtures
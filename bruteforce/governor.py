@@ -0,0 +1,272 @@
+"""
+Resource Governor
+CPU cores, niceness, torch threads and a memory ceiling for cracking on shared machines
+"""
+
+import gc
+import os
+import time
+import multiprocessing as mp
+from typing import List, Optional
+
+# Above this share of the memory ceiling batches shrink; above the ceiling
+# itself generation pauses
+SOFT_LIMIT = 0.8
+
+# Seconds between memory readings (each reads /proc for every worker)
+CHECK_INTERVAL = 0.5
+
+# Longest generation waits for memory before carrying on regardless (the
+# pressure may be its own)
+MAX_PAUSE = 30.0
+
+_SIZE_UNITS = {'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+
+def parse_cores(spec: str) -> List[int]:
+    """
+    Parse a core set such as '0-3,6'
+
+    Returns:
+        Sorted core numbers ([0, 1, 2, 3, 6])
+    """
+    cores = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        first, last = int(first), int(last or first)
+        if first < 0 or last < first:
+            raise ValueError(f"Invalid core range: {part}")
+        cores.update(range(first, last + 1))
+    if not cores:
+        raise ValueError(f"Empty core set: {spec!r}")
+    return sorted(cores)
+
+
+def format_cores(cores: List[int]) -> str:
+    """[0, 1, 2, 3, 6] -> '0-3,6'"""
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ','.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def parse_size(spec: str) -> int:
+    """Parse a memory size such as '512M', '4g' or '1073741824' into bytes"""
+    spec = spec.strip().lower().rstrip('ib')
+    if spec and spec[-1] in _SIZE_UNITS:
+        size = float(spec[:-1]) * _SIZE_UNITS[spec[-1]]
+    else:
+        size = float(spec)
+    if size <= 0:
+        raise ValueError(f"Invalid memory size: {spec!r}")
+    return int(size)
+
+
+def format_size(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def _rss(pid: int) -> Optional[int]:
+    """Resident set size of a process in bytes (None where /proc is unavailable)"""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ResourceGovernor:
+    """
+    Keeps a cracking run inside the share of the machine it was given
+
+    apply() pins the process to its cores and lowers its priority; threads
+    and worker pools started afterwards inherit both. The memory ceiling
+    covers this process and its worker processes: near it batch sizes
+    shrink, above it generation pauses until memory is released.
+    """
+
+    def __init__(self, cores: Optional[List[int]] = None, nice: Optional[int] = None,
+                 memory_limit: Optional[int] = None, torch_threads: Optional[int] = None,
+                 check_interval: float = CHECK_INTERVAL):
+        """
+        Args:
+            cores: CPU cores to run on (None: all the process may use)
+            nice: Niceness to run at (only raised without privileges)
+            memory_limit: Memory ceiling in bytes (None disables it)
+            torch_threads: Intra-op threads for password generation
+                           (default: one per assigned core)
+            check_interval: Seconds between memory readings
+        """
+        self.cores = sorted(set(cores)) if cores else None
+        self.nice = nice
+        self.memory_limit = memory_limit
+        self.torch_threads = torch_threads
+        self.check_interval = check_interval
+
+        # Times batches were shrunk and seconds generation was paused
+        self.shrunk = 0
+        self.paused = 0.0
+
+        self._pressure = 0.0
+        self._checked = 0.0
+        self._measurable = True
+
+    @property
+    def core_count(self) -> int:
+        """Cores the run may use, for per-core throughput"""
+        if self.cores:
+            return len(self.cores)
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    def apply(self) -> None:
+        """Pin this process to the assigned cores and set its niceness"""
+        if self.cores is not None:
+            if not hasattr(os, 'sched_setaffinity'):
+                print("⚠ CPU affinity is not supported on this platform; cores not pinned")
+            else:
+                available = os.sched_getaffinity(0)
+                outside = [c for c in self.cores if c not in available]
+                if outside:
+                    raise ValueError(f"Cores {format_cores(outside)} are not available "
+                                     f"(allowed: {format_cores(list(available))})")
+                os.sched_setaffinity(0, self.cores)
+
+        if self.nice is not None:
+            increment = self.nice - os.nice(0)
+            if increment:
+                try:
+                    os.nice(increment)
+                except PermissionError:
+                    print(f"⚠ Not permitted to lower niceness to {self.nice}; "
+                          f"staying at {os.nice(0)}")
+
+    def limit_torch(self) -> None:
+        """Cap torch's intra-op threads (generation) to the assigned cores"""
+        threads = self.torch_threads or (len(self.cores) if self.cores else None)
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+    def memory_used(self) -> Optional[int]:
+        """Resident memory of this process and its worker processes, in bytes"""
+        used = _rss(os.getpid())
+        if used is None:
+            return None
+        for child in mp.active_children():
+            used += _rss(child.pid) or 0
+        return used
+
+    def pressure(self) -> float:
+        """Memory used as a share of the ceiling (0.0 without one; read at most every check_interval)"""
+        if self.memory_limit is None or not self._measurable:
+            return 0.0
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            used = self.memory_used()
+            if used is None:
+                print("⚠ Memory usage cannot be read on this platform; memory ceiling ignored")
+                self._measurable = False
+                return 0.0
+            self._pressure = used / self.memory_limit
+            self._checked = now
+        return self._pressure
+
+    def batch_size(self, size: int) -> int:
+        """
+        Scale a batch size to the memory pressure
+
+        Halved above SOFT_LIMIT of the ceiling, quartered above the ceiling.
+        """
+        pressure = self.pressure()
+        if pressure < SOFT_LIMIT:
+            return size
+        self.shrunk += 1
+        return max(1, size // (4 if pressure >= 1.0 else 2))
+
+    def wait_for_memory(self, max_pause: float = MAX_PAUSE) -> float:
+        """
+        Pause generation while memory is above the ceiling
+
+        Args:
+            max_pause: Seconds after which to carry on regardless
+
+        Returns:
+            Seconds paused
+        """
+        if self.pressure() < 1.0:
+            return 0.0
+        gc.collect()
+        self._checked = 0.0
+        if self.pressure() < 1.0:
+            return 0.0
+
+        print(f"⚠ Memory at {self._pressure * 100:.0f}% of the "
+              f"{format_size(self.memory_limit)} ceiling; pausing generation")
+        start = time.monotonic()
+        while self.pressure() >= 1.0 and time.monotonic() - start < max_pause:
+            time.sleep(self.check_interval)
+        paused = time.monotonic() - start
+        self.paused += paused
+        return paused
+
+    def per_core(self, rate: float) -> float:
+        """A passwords/sec rate divided over the assigned cores"""
+        return rate / self.core_count
+
+    def describe(self) -> str:
+        parts = [f"cores {format_cores(self.cores)}" if self.cores
+                 else f"{self.core_count} cores"]
+        if self.nice is not None:
+            parts.append(f"nice {self.nice}")
+        if self.memory_limit is not None:
+            parts.append(f"memory ceiling {format_size(self.memory_limit)}")
+        if self.torch_threads is not None:
+            parts.append(f"{self.torch_threads} torch threads")
+        return ', '.join(parts)
+
+
+def add_resource_arguments(parser) -> None:
+    """Add --cores, --nice, --memory-limit and --torch-threads to an argument parser"""
+    parser.add_argument('--cores', type=parse_cores,
+                        help="CPU cores to run on, e.g. '0-3,6' (default: all)")
+    parser.add_argument('--nice', type=int,
+                        help='Niceness to run at (higher yields to other workloads)')
+    parser.add_argument('--memory-limit', type=parse_size,
+                        help="Memory ceiling for the run and its workers, e.g. '4G'; "
+                             "batches shrink near it and generation pauses above it")
+    parser.add_argument('--torch-threads', type=int,
+                        help='Intra-op threads for password generation (default: one per core)')
+
+
+def apply_resource_arguments(parser, args) -> Optional[ResourceGovernor]:
+    """
+    Governor for parsed add_resource_arguments() options, applied to this process
+
+    Call it before any worker pool starts. Unavailable cores are reported
+    as a usage error.
+
+    Returns:
+        The governor, or None if no option was given
+    """
+    if (args.cores is None and args.nice is None and args.memory_limit is None
+            and args.torch_threads is None):
+        return None
+    governor = ResourceGovernor(cores=args.cores, nice=args.nice,
+                                memory_limit=args.memory_limit, torch_threads=args.torch_threads)
+    try:
+        governor.apply()
+    except ValueError as e:
+        parser.error(str(e))
+    return governor
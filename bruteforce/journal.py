@@ -0,0 +1,194 @@
+"""
+Results Journal
+Append-only JSON-lines log of finished targets, written as each one finishes
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from checkpoint import atomic_write_text
+
+# Records between fsyncs, and the longest a record waits for one
+SYNC_EVERY = 16
+SYNC_INTERVAL = 5.0
+
+
+class ResultsJournal:
+    """
+    One line per finished target: {"file", "result", "logged_at"}
+
+    Every record is flushed as soon as it is written, so `tail -f` and other
+    readers see it immediately; fsyncs are batched (every SYNC_EVERY
+    records or SYNC_INTERVAL seconds, and on close). A cracked password is
+    fsynced at once. After a crash at most the last unsynced batch of
+    failures is lost, and a torn last line is skipped when reading.
+    """
+
+    def __init__(self, path: str, sync_every: int = SYNC_EVERY,
+                 sync_interval: float = SYNC_INTERVAL):
+        """
+        Args:
+            path: Journal file (appended to if it exists)
+            sync_every: Records between fsyncs
+            sync_interval: Maximum seconds between fsyncs while records arrive
+        """
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # File handles and locks stay in their process (crackers are sent
+        # to worker processes); a copy opens its own handle if it appends
+        state = self.__dict__.copy()
+        state['_file'] = None
+        state['_unsynced'] = 0
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def append(self, file: str, result: Dict) -> None:
+        """Log a target's final result"""
+        line = json.dumps({'file': file, 'result': result,
+                           'logged_at': datetime.now().isoformat()}, default=str)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+            self._unsynced += 1
+            if (result.get('success') or self._unsynced >= self.sync_every
+                    or time.time() - self._last_sync >= self.sync_interval):
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def sync(self) -> None:
+        """fsync whatever has been written"""
+        with self._lock:
+            if self._unsynced and self._file is not None:
+                self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            if self._unsynced:
+                self._sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'ResultsJournal':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_journal(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Records of a journal in write order (a truncated last line is skipped)
+
+    Yields:
+        (file, result) pairs
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            yield record['file'], record['result']
+
+
+def load_journal(path: str) -> Dict[str, Dict]:
+    """Latest result per file, in the order files first finished"""
+    results = {}
+    for file, result in read_journal(path):
+        results[file] = result
+    return results
+
+
+def write_summaries(results: Dict[str, Dict], output_dir: str,
+                    timestamp: Optional[str] = None) -> Tuple[Path, Path]:
+    """
+    Write the end-of-run summaries: results_<timestamp>.json and cracked_passwords_<timestamp>.txt
+
+    Both files are replaced atomically, so a crash mid-write leaves no
+    half-written summary.
+
+    Returns:
+        (json_file, passwords_file)
+    """
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_dir = Path(output_dir)
+
+    json_file = output_dir / f'results_{timestamp}.json'
+    atomic_write_text(json_file, json.dumps(results, indent=2))
+
+    lines = ["CRACKED PASSWORDS", "=" * 80, ""]
+    for result in results.values():
+        if result.get('success'):
+            lines.append(f"File: {result['filename']}")
+            lines.append(f"Password: {result['password']}")
+            lines.append(f"Attempts: {result['attempts']:,}")
+            lines.append(f"Time: {result['time']:.2f}s")
+            lines.append("-" * 80)
+    passwords_file = output_dir / f'cracked_passwords_{timestamp}.txt'
+    atomic_write_text(passwords_file, '\n'.join(lines) + '\n')
+
+    return json_file, passwords_file
+
+
+def compact(path: str, output_dir: Optional[str] = None) -> Tuple[Path, Path]:
+    """
+    Summaries of a journal (e.g. one left behind by a crashed run)
+
+    Args:
+        path: Journal file (results_<timestamp>.jsonl)
+        output_dir: Where to write the summaries (default: next to the journal)
+
+    Returns:
+        (json_file, passwords_file)
+    """
+    path = Path(path)
+    timestamp = path.stem[len('results_'):] if path.stem.startswith('results_') else None
+    return write_summaries(load_journal(path), output_dir or path.parent, timestamp)
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rebuild batch result summaries from a results journal')
+    parser.add_argument('journal', help='Results journal (results_<timestamp>.jsonl)')
+    parser.add_argument('-o', '--output', help='Output directory (default: the journal\'s)')
+    args = parser.parse_args()
+
+    results = load_journal(args.journal)
+    json_file, passwords_file = compact(args.journal, args.output)
+    cracked = sum(1 for r in results.values() if r.get('success'))
+    print(f"✓ {len(results)} results ({cracked} cracked) compacted:")
+    print(f"  - {json_file}")
+    print(f"  - {passwords_file}")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
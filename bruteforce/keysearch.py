@@ -0,0 +1,467 @@
+"""
+RC4 Key Search
+Exhausts the 40-bit key space of RC4-40 PDFs and Office 97 documents
+
+With 40-bit RC4 the file key is 5 bytes however long the password is, so
+the key space can be searched directly when password guessing cannot
+finish. A recovered key decrypts the document even though the password
+itself stays unknown.
+"""
+
+import os
+import sys
+import math
+import time
+import hashlib
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from struct import pack
+from typing import Dict, Optional
+
+from checkpoint import Checkpoint, DEFAULT_RESTORE_DIR, checkpoint_path
+from containers import open_target
+from executor import create_executor
+from pdfcrypt import PAD, StandardSecurity, rc4
+from planner import format_time
+from verifiers import file_type_for
+
+# Optional: vectorized key checks
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: Office 97 documents
+try:
+    import msoffcrypto
+    import msoffcrypto.method.rc4 as msoffcrypto_rc4
+except ImportError:
+    msoffcrypto = None
+
+KEY_BYTES = 5
+KEY_SPACE = 1 << (8 * KEY_BYTES)
+
+# Keys per vectorized step, and per task handed to a worker
+KEY_BATCH = 1 << 12
+SHARD_SIZE = 1 << 22
+
+
+def key_bytes(index: int) -> bytes:
+    """The 5-byte key at a key space index (big-endian)"""
+    return index.to_bytes(KEY_BYTES, 'big')
+
+
+# ---------------------------------------------------------------------------
+# Vectorized primitives (one row per key)
+# ---------------------------------------------------------------------------
+
+def key_matrix(start: int, stop: int):
+    """Keys start..stop-1 as an (n, 5) uint8 matrix"""
+    indices = np.arange(start, stop, dtype=np.uint64)
+    shifts = np.arange(8 * (KEY_BYTES - 1), -1, -8, dtype=np.uint64)
+    return ((indices[:, None] >> shifts) & np.uint64(0xff)).astype(np.uint8)
+
+
+def rc4_keystreams(keys, length: int):
+    """
+    First bytes of the RC4 keystream of every row key
+
+    Args:
+        keys: (n, key length) uint8 matrix
+        length: Keystream bytes per key
+
+    Returns:
+        (n, length) uint8 matrix
+    """
+    n, key_length = keys.shape
+    # One row of lanes per state byte keeps S[i] contiguous; S[j] is
+    # gathered through the flat view
+    state = np.repeat(np.arange(256, dtype=np.uint8), n).reshape(256, n)
+    flat = state.reshape(-1)
+    lanes = np.arange(n, dtype=np.intp)
+    columns = np.ascontiguousarray(keys.T)
+    # uint8 arithmetic wraps modulo 256 like the cipher
+    j = np.zeros(n, dtype=np.uint8)
+    for i in range(256):
+        si = state[i].copy()
+        j += si + columns[i % key_length]
+        swap = j.astype(np.intp) * n + lanes
+        state[i] = flat[swap]
+        flat[swap] = si
+
+    out = np.empty((n, length), dtype=np.uint8)
+    j = np.zeros(n, dtype=np.uint8)
+    for k in range(length):
+        i = (k + 1) & 0xff
+        si = state[i].copy()
+        j += si
+        swap = j.astype(np.intp) * n + lanes
+        sj = flat[swap]
+        state[i] = sj
+        flat[swap] = si
+        out[:, k] = flat[(si + sj).astype(np.intp) * n + lanes]
+    return out
+
+
+_MD5_SHIFTS = [7, 12, 17, 22] * 4 + [5, 9, 14, 20] * 4 + [4, 11, 16, 23] * 4 + [6, 10, 15, 21] * 4
+_MD5_CONSTANTS = [int(abs(math.sin(i + 1)) * 2 ** 32) & 0xffffffff for i in range(64)]
+
+
+def md5_rows(messages):
+    """
+    MD5 of every row of a (n, length < 56) uint8 matrix
+
+    Single-block messages only, which covers the short inputs of the
+    Office 97 key derivation and verifier.
+    """
+    n, length = messages.shape
+    block = np.zeros((n, 64), dtype=np.uint8)
+    block[:, :length] = messages
+    block[:, length] = 0x80
+    block[:, 56:64] = np.frombuffer(pack('<Q', 8 * length), dtype=np.uint8)
+    words = block.view('<u4')
+
+    a0, b0, c0, d0 = (np.full(n, v, dtype=np.uint32)
+                      for v in (0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476))
+    a, b, c, d = a0.copy(), b0.copy(), c0.copy(), d0.copy()
+    for i in range(64):
+        if i < 16:
+            f, g = (b & c) | (~b & d), i
+        elif i < 32:
+            f, g = (d & b) | (~d & c), (5 * i + 1) % 16
+        elif i < 48:
+            f, g = b ^ c ^ d, (3 * i + 5) % 16
+        else:
+            f, g = c ^ (b | ~d), (7 * i) % 16
+        f = f + a + np.uint32(_MD5_CONSTANTS[i]) + words[:, g]
+        s = _MD5_SHIFTS[i]
+        a, d, c = d, c, b
+        b = b + ((f << np.uint32(s)) | (f >> np.uint32(32 - s)))
+
+    digest = np.stack([a0 + a, b0 + b, c0 + c, d0 + d], axis=1).astype('<u4')
+    return digest.view(np.uint8).reshape(n, 16)
+
+
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
+
+class Rc4PdfTarget:
+    """PDF Standard security handler with a 40-bit RC4 key"""
+
+    file_type = 'pdf'
+
+    def __init__(self, target_file: str, security: StandardSecurity):
+        self.target_file = target_file
+        self.security = security
+        # Revision 3+ compares /U after 20 RC4 passes of MD5(PAD + ID)
+        self._seed = hashlib.md5(PAD + security.file_id).digest()
+
+    def check_key(self, key: bytes) -> bool:
+        return self.security.check_key(key)
+
+    def check_matrix(self, keys):
+        """Row indices whose first /U bytes match (then confirmed by check_key)"""
+        user = np.frombuffer(self.security.user[:2], dtype=np.uint8)
+        if self.security.revision == 2:
+            expected = user ^ np.frombuffer(PAD[:2], dtype=np.uint8)
+            stream = rc4_keystreams(keys, 2)
+        else:
+            expected = user ^ np.frombuffer(self._seed[:2], dtype=np.uint8)
+            stream = np.zeros((len(keys), 2), dtype=np.uint8)
+            for i in range(20):
+                stream ^= rc4_keystreams(keys ^ np.uint8(i), 2)
+        return np.flatnonzero((stream == expected).all(axis=1))
+
+    def decrypt(self, key: bytes, output: str):
+        """Write a decrypted copy, opening the PDF with the raw file key"""
+        import pikepdf
+        with pikepdf.open(open_target(self.target_file), password=key.hex(), hex_password=True) as pdf:
+            pdf.save(output)
+
+    def describe(self) -> Dict:
+        return dict(self.security.describe(), file_type=self.file_type)
+
+
+@contextmanager
+def _patched(owner, name: str, value):
+    original = getattr(owner, name)
+    setattr(owner, name, value)
+    try:
+        yield
+    finally:
+        setattr(owner, name, original)
+
+
+# msoffcrypto's RC4 internals are swapped in and out around a call
+_MSOFFCRYPTO_LOCK = threading.Lock()
+
+
+class Office97Target:
+    """
+    Office 97-2003 document with RC4 (non-CryptoAPI) encryption
+
+    The 5-byte truncated hash H1 of the password and salt is the searched
+    key; every block key is MD5(H1 + block number).
+    """
+
+    file_type = 'office'
+
+    def __init__(self, target_file: str, salt: bytes, verifier: bytes, verifier_hash: bytes):
+        self.target_file = target_file
+        self.salt = salt
+        self.verifier = verifier
+        self.verifier_hash = verifier_hash
+
+    @classmethod
+    def from_file(cls, target_file: str) -> Optional['Office97Target']:
+        """Read the RC4 encryption header (None for other encryption types)"""
+        if msoffcrypto is None:
+            return None
+        captured = {}
+
+        def capture(password, salt, verifier, verifier_hash):
+            captured.update(salt=salt, verifier=verifier, verifier_hash=verifier_hash)
+            return False
+
+        with _MSOFFCRYPTO_LOCK, _patched(msoffcrypto_rc4.DocumentRC4, 'verifypw', staticmethod(capture)):
+            try:
+                with open_target(target_file) as f:
+                    msoffcrypto.OfficeFile(f).load_key(password='')
+            except Exception:
+                pass
+        if not captured:
+            return None
+        return cls(target_file, captured['salt'], captured['verifier'], captured['verifier_hash'])
+
+    def check_key(self, key: bytes) -> bool:
+        data = rc4(hashlib.md5(key + pack('<I', 0)).digest(), self.verifier + self.verifier_hash)
+        return hashlib.md5(data[:16]).digest() == data[16:]
+
+    def check_matrix(self, keys):
+        block_keys = md5_rows(np.hstack([keys, np.zeros((len(keys), 4), dtype=np.uint8)]))
+        encrypted = np.frombuffer(self.verifier + self.verifier_hash, dtype=np.uint8)
+        data = rc4_keystreams(block_keys, 32) ^ encrypted
+        return np.flatnonzero((md5_rows(data[:, :16]) == data[:, 16:]).all(axis=1))
+
+    def decrypt(self, key: bytes, output: str):
+        """Write a decrypted copy, deriving block keys from the recovered H1"""
+        def makekey(password, salt, block):
+            return hashlib.md5(key + pack('<I', block)).digest()
+
+        with _MSOFFCRYPTO_LOCK, _patched(msoffcrypto_rc4, '_makekey', makekey):
+            with open_target(self.target_file) as f, open(output, 'wb') as out:
+                file_obj = msoffcrypto.OfficeFile(f)
+                file_obj.load_key(password='')
+                file_obj.decrypt(out)
+
+    def describe(self) -> Dict:
+        return {'file_type': self.file_type, 'algorithm': 'RC4-40', 'key_length': 40}
+
+
+def rc4_target(target_file: str):
+    """
+    Key search target for a file
+
+    Raises:
+        ValueError: If the file is not encrypted with 40-bit RC4
+    """
+    if file_type_for(target_file) == 'pdf':
+        security = StandardSecurity.from_file(target_file)
+        if security is not None and security.revision <= 4 and security.algorithm == 'RC4-40':
+            return Rc4PdfTarget(target_file, security)
+    else:
+        target = Office97Target.from_file(target_file)
+        if target is not None:
+            return target
+    raise ValueError(f"{target_file} is not encrypted with 40-bit RC4 (PDF R2-R4 or Office 97 RC4)")
+
+
+def search_range(target, start: int, stop: int) -> Optional[int]:
+    """
+    Check keys start..stop-1
+
+    Returns:
+        Index of the correct key, or None
+    """
+    if np is None:
+        for index in range(start, stop):
+            if target.check_key(key_bytes(index)):
+                return index
+        return None
+
+    for base in range(start, stop, KEY_BATCH):
+        end = min(base + KEY_BATCH, stop)
+        for row in target.check_matrix(key_matrix(base, end)):
+            # The matrix check compares a prefix; check_key is exact
+            if target.check_key(key_bytes(base + int(row))):
+                return base + int(row)
+    return None
+
+
+class KeySearch:
+    """Sharded, checkpointed search of a 40-bit RC4 key space"""
+
+    def __init__(self, target_file: str, workers: int = 1, start: int = 0, stop: int = KEY_SPACE,
+                 restore_dir: Optional[str] = DEFAULT_RESTORE_DIR, resume: bool = False,
+                 shard_size: int = SHARD_SIZE, verbose: bool = True):
+        """
+        Args:
+            target_file: RC4-40 PDF or Office 97 document
+            workers: Worker processes (1 searches in this process)
+            start: First key index to search
+            stop: Key index to stop before
+            restore_dir: Directory for restore files (None disables them)
+            resume: Continue from the restore file
+            shard_size: Keys per worker task
+            verbose: Print progress
+        """
+        self.target_file = target_file
+        self.target = rc4_target(target_file)
+        self.workers = max(1, workers)
+        self.start = start
+        self.stop = min(stop, KEY_SPACE)
+        self.shard_size = shard_size
+        self.verbose = verbose
+        self.index = start
+        self.interrupted = False
+        self._restored = {}
+
+        self.checkpoint = None
+        if restore_dir is not None:
+            job = {'target': str(Path(target_file).resolve()), 'attack': 'rc4_key',
+                   'start': start, 'stop': self.stop}
+            self.checkpoint = Checkpoint(checkpoint_path(restore_dir, job), job)
+            state = (self.checkpoint.load() if resume else None) or {}
+            self.index = state.get('index', start)
+            self._restored = state
+
+    def _save(self, force: bool = False, **state):
+        if self.checkpoint is not None and (force or self.checkpoint.due()):
+            self.checkpoint.save(dict({'index': self.index}, **state))
+
+    def _print_progress(self, started: float, searched: int):
+        elapsed = time.time() - started
+        rate = searched / elapsed if elapsed > 0 else 0
+        done = (self.index - self.start) / max(self.stop - self.start, 1)
+        eta = format_time((self.stop - self.index) / rate) if rate else '?'
+        print(f"\rKey: {self.index:010x} | Speed: {rate:,.0f} keys/s | "
+              f"{done:.4%} | ETA: {eta}", end='', flush=True)
+
+    def run(self) -> Optional[bytes]:
+        """
+        Search until the key is found or the range is exhausted
+
+        Returns:
+            The 5-byte key, or None
+        """
+        if self._restored.get('complete'):
+            key = self._restored.get('key')
+            return bytes.fromhex(key) if key else None
+
+        if self.verbose:
+            print(f"\n{'='*60}")
+            print(f"RC4 KEY SEARCH")
+            print(f"{'='*60}")
+            print(f"Target file: {self.target_file}")
+            print(f"Algorithm: {self.target.describe()['algorithm']}")
+            print(f"Keys: {self.index:010x} - {self.stop:010x} ({self.stop - self.index:,})")
+            print(f"Workers: {self.workers}")
+            print(f"{'='*60}\n")
+
+        backend = 'processes' if self.workers > 1 else 'inline'
+        executor = create_executor(backend, self.workers)
+        inflight = deque()
+        submitted = self.index
+        started = time.time()
+        first = self.index
+        found = None
+        try:
+            while True:
+                while submitted < self.stop and len(inflight) < 2 * self.workers:
+                    end = min(submitted + self.shard_size, self.stop)
+                    inflight.append((executor.submit(search_range, self.target, submitted, end), end))
+                    submitted = end
+                if not inflight:
+                    break
+
+                # Shards retire in order, so the saved index is fully searched
+                future, end = inflight.popleft()
+                found = future.result()
+                if found is not None:
+                    break
+                self.index = end
+                self._save()
+                if self.verbose:
+                    self._print_progress(started, self.index - first)
+        except KeyboardInterrupt:
+            self.interrupted = True
+            self._save(force=True)
+            if self.verbose:
+                print(f"\n\n⚠ Search interrupted at key {self.index:010x}")
+                print(f"Resume with: --resume")
+            return None
+        finally:
+            for future, _ in inflight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+        key = key_bytes(found) if found is not None else None
+        self._save(force=True, complete=True, key=key.hex() if key else None)
+        if self.verbose:
+            print()
+            if key:
+                print(f"\n✓ KEY FOUND: {key.hex()}")
+            else:
+                print(f"\n✗ Key not in range")
+            print(f"Time: {format_time(time.time() - started)}")
+        return key
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='40-bit RC4 key search for PDF and Office 97 files')
+    parser.add_argument('file', help='RC4-40 PDF (R2-R4) or Office 97 document')
+    parser.add_argument('-o', '--output', help='Write a decrypted copy here once the key is found')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes')
+    parser.add_argument('--start', default='0', help='First key (hex)')
+    parser.add_argument('--stop', default=f'{KEY_SPACE:x}', help='Key to stop before (hex)')
+    parser.add_argument('--key', help='Skip the search and decrypt with this key (hex)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the search from its restore file')
+    parser.add_argument('--restore-dir', default=DEFAULT_RESTORE_DIR,
+                        help='Directory for periodic restore files')
+    args = parser.parse_args()
+
+    try:
+        target = rc4_target(args.file)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    if args.key:
+        key = bytes.fromhex(args.key)
+        if not target.check_key(key):
+            print(f"✗ Key {args.key} does not match {args.file}")
+            sys.exit(1)
+    else:
+        search = KeySearch(args.file, workers=args.workers, start=int(args.start, 16),
+                           stop=int(args.stop, 16), restore_dir=args.restore_dir, resume=args.resume)
+        key = search.run()
+        target = search.target
+        if key is None:
+            sys.exit(1)
+
+    if args.output:
+        target.decrypt(key, args.output)
+        print(f"✓ Decrypted copy saved: {args.output}")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
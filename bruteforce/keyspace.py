@@ -0,0 +1,384 @@
+"""
+Keyspaces
+Index-addressable candidate spaces for wordlist, mask and brute force attacks
+"""
+
+import json
+import string
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from checkpoint import atomic_write_json, job_digest
+
+# Optional: candidate matrices for vectorized verifiers
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Mask placeholders (hashcat style)
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase,
+    'u': string.ascii_uppercase,
+    'd': string.digits,
+    's': string.punctuation + ' ',
+}
+MASK_CHARSETS['a'] = ''.join(MASK_CHARSETS[c] for c in 'luds')
+
+DEFAULT_CHARSET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+
+# Suffixes/prefixes tried around every word by the hybrid attack
+DEFAULT_MUTATIONS = ['', '!', '123', '1', '12', '2024', '2025', '!@#']
+
+# Rows per candidate matrix handed to a vectorized verifier
+MATRIX_BATCH = 65536
+
+
+
+def parse_mask(mask: str) -> List[str]:
+    """
+    Parse a mask such as '?u?l?l?l?d?d' into one charset per position
+
+    '?l' lowercase, '?u' uppercase, '?d' digits, '?s' symbols, '?a' all of
+    them, '??' a literal '?'; any other character stands for itself.
+    """
+    charsets = []
+    i = 0
+    while i < len(mask):
+        if mask[i] == '?':
+            if i + 1 >= len(mask):
+                raise ValueError(f"Mask ends with a bare '?': {mask}")
+            key = mask[i + 1]
+            if key == '?':
+                charsets.append('?')
+            elif key in MASK_CHARSETS:
+                charsets.append(MASK_CHARSETS[key])
+            else:
+                raise ValueError(f"Unknown mask placeholder '?{key}' in {mask}")
+            i += 2
+        else:
+            charsets.append(mask[i])
+            i += 1
+    return charsets
+
+
+class Keyspace:
+    """Base class: an ordered candidate space addressable by index"""
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """Yield candidates with indices in [start, stop)"""
+        raise NotImplementedError
+
+    def describe(self) -> Dict:
+        """Compact JSON-serializable description (see keyspace_from_description)"""
+        raise NotImplementedError
+
+    @property
+    def supports_matrices(self) -> bool:
+        """Whether matrix_range() is available (NumPy installed, ASCII charsets)"""
+        return False
+
+    def matrix_range(self, start: int, stop: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Candidates with indices in [start, stop) as a uint8 matrix
+
+        Returns:
+            (matrix, lengths): one zero-padded row of ASCII bytes per
+            candidate and each row's length (int32)
+        """
+        raise NotImplementedError
+
+
+class MaskKeyspace(Keyspace):
+    """Cartesian product of one charset per position (last position fastest)"""
+
+    def __init__(self, charsets: List[str], mask: str = None):
+        """
+        Args:
+            charsets: Characters allowed at each position
+            mask: Original mask string, kept for describe()
+        """
+        if not charsets or any(not cs for cs in charsets):
+            raise ValueError("Every mask position needs at least one character")
+        self.charsets = list(charsets)
+        self.mask = mask
+
+        self._size = 1
+        for cs in self.charsets:
+            self._size *= len(cs)
+
+    @classmethod
+    def from_mask(cls, mask: str) -> 'MaskKeyspace':
+        return cls(parse_mask(mask), mask=mask)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _digits(self, index: int) -> List[int]:
+        """Mixed-radix digits of an index, most significant position first"""
+        digits = []
+        for cs in reversed(self.charsets):
+            index, d = divmod(index, len(cs))
+            digits.append(d)
+        return digits[::-1]
+
+    def candidate(self, index: int) -> str:
+        return ''.join(cs[d] for cs, d in zip(self.charsets, self._digits(index)))
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        stop = min(stop, self._size)
+        if start >= stop:
+            return
+
+        digits = self._digits(start)
+        last = self.charsets[-1]
+        remaining = stop - start
+
+        while remaining > 0:
+            prefix = ''.join(cs[d] for cs, d in zip(self.charsets[:-1], digits[:-1]))
+            chunk = last[digits[-1]:digits[-1] + remaining]
+            for c in chunk:
+                yield prefix + c
+            remaining -= len(chunk)
+
+            # Carry into the prefix positions
+            digits[-1] = 0
+            for pos in range(len(digits) - 2, -1, -1):
+                digits[pos] += 1
+                if digits[pos] < len(self.charsets[pos]):
+                    break
+                digits[pos] = 0
+
+    def describe(self) -> Dict:
+        if self.mask is not None:
+            return {'type': 'mask', 'mask': self.mask}
+        return {'type': 'charsets', 'charsets': self.charsets}
+
+    @property
+    def supports_matrices(self) -> bool:
+        return np is not None and all(cs.isascii() for cs in self.charsets)
+
+    def matrix_range(self, start: int, stop: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        stop = min(stop, self._size)
+        n = max(stop - start, 0)
+        width = len(self.charsets)
+        matrix = np.empty((n, width), dtype=np.uint8)
+
+        # Add 0..n-1 to start's digits, carrying from the last position;
+        # the carries stay below n however large the keyspace is
+        carry = np.arange(n, dtype=np.int64)
+        digits = self._digits(start) if n else [0] * width
+        for pos in range(width - 1, -1, -1):
+            table = np.frombuffer(self.charsets[pos].encode('ascii'), dtype=np.uint8)
+            carry, digit = np.divmod(carry + digits[pos], len(table))
+            matrix[:, pos] = table[digit]
+        return matrix, np.full(n, width, dtype=np.int32)
+
+
+class BruteForceKeyspace(Keyspace):
+    """All strings over a charset, shortest lengths first"""
+
+    def __init__(self, charset: str = None, min_length: int = 1, max_length: int = 6):
+        """
+        Args:
+            charset: Character set (default: digits + lowercase + uppercase)
+            min_length: Minimum password length
+            max_length: Maximum password length
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+        if min_length < 1 or max_length < min_length:
+            raise ValueError(f"Invalid length range: {min_length}-{max_length}")
+
+        self.charset = charset
+        self.min_length = min_length
+        self.max_length = max_length
+        self.segments = [MaskKeyspace([charset] * length)
+                         for length in range(min_length, max_length + 1)]
+
+    def __len__(self) -> int:
+        return sum(len(seg) for seg in self.segments)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        offset = 0
+        for seg in self.segments:
+            size = len(seg)
+            if stop <= offset:
+                break
+            if start < offset + size:
+                yield from seg.iter_range(max(start - offset, 0), stop - offset)
+            offset += size
+
+    def describe(self) -> Dict:
+        return {'type': 'brute_force', 'charset': self.charset,
+                'min_length': self.min_length, 'max_length': self.max_length}
+
+    @property
+    def supports_matrices(self) -> bool:
+        return np is not None and self.charset.isascii()
+
+    def matrix_range(self, start: int, stop: int) -> Tuple['np.ndarray', 'np.ndarray']:
+        # Rows of shorter segments are zero-padded to the longest length
+        matrices, lengths = [], []
+        offset = 0
+        for seg in self.segments:
+            size = len(seg)
+            if stop <= offset:
+                break
+            if start < offset + size:
+                matrix, seg_lengths = seg.matrix_range(max(start - offset, 0), stop - offset)
+                padded = np.zeros((len(matrix), self.max_length), dtype=np.uint8)
+                padded[:, :matrix.shape[1]] = matrix
+                matrices.append(padded)
+                lengths.append(seg_lengths)
+            offset += size
+        if not matrices:
+            return np.zeros((0, self.max_length), dtype=np.uint8), np.zeros(0, dtype=np.int32)
+        return np.concatenate(matrices), np.concatenate(lengths)
+
+
+def index_dir_for(restore_dir: Optional[str]) -> Optional[str]:
+    """Directory for cached wordlist indexes: 'index' in a run's restore directory"""
+    return str(Path(restore_dir) / 'index') if restore_dir is not None else None
+
+
+class WordlistKeyspace(Keyspace):
+    """
+    Lines of a wordlist; index i is line i (0-based, blank lines yield nothing)
+
+    Given an index directory (see index_dir_for), the sparse line index is
+    cached there under a name derived from the wordlist's path, size and
+    modification time, so counting a large wordlist is a one-time cost.
+    Nothing is written next to the wordlist, whose directory may be
+    read-only, shared or scanned.
+    """
+
+    # Keep one byte offset per this many lines
+    INDEX_STRIDE = 4096
+
+    def __init__(self, wordlist_path: str, index_dir: Optional[str] = None):
+        """
+        Args:
+            wordlist_path: Path to wordlist file
+            index_dir: Directory for the cached line index (None disables it)
+        """
+        self.path = Path(wordlist_path)
+        self.index_dir = index_dir
+        if not self.path.exists():
+            raise FileNotFoundError(f"Wordlist not found: {wordlist_path}")
+        self._offsets = None
+        self._lines = None
+        self._words = None
+
+    @property
+    def index_path(self) -> Optional[Path]:
+        if self.index_dir is None:
+            return None
+        key = dict(self._file_stamp(), path=str(self.path.resolve()))
+        return Path(self.index_dir) / f"{self.path.name}-{job_digest(key)}.idx.json"
+
+    def _file_stamp(self) -> Dict:
+        stat = self.path.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'stride': self.INDEX_STRIDE}
+
+    def _load_index(self) -> bool:
+        """Use the cached index if it still matches the wordlist"""
+        if self.index_path is None:
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get('stamp') != self._file_stamp():
+            return False
+        self._offsets = array('Q', data['offsets'])
+        self._lines = data['lines']
+        self._words = data['words']
+        return True
+
+    def _build_index(self):
+        """Scan the wordlist once, recording sparse line offsets"""
+        if self._load_index():
+            return
+
+        offsets = array('Q')
+        lines = 0
+        words = 0
+        pos = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if lines % self.INDEX_STRIDE == 0:
+                    offsets.append(pos)
+                pos += len(line)
+                lines += 1
+                if line.strip():
+                    words += 1
+        self._offsets = offsets
+        self._lines = lines
+        self._words = words
+
+        if self.index_path is None:
+            return
+        # Best effort: the index directory may not be writable
+        try:
+            atomic_write_json(self.index_path, {'stamp': self._file_stamp(), 'lines': lines,
+                                                'words': words, 'offsets': offsets.tolist()})
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        if self._lines is None:
+            self._build_index()
+        return self._lines
+
+    def word_count(self) -> int:
+        """Number of non-blank lines (the candidates a dictionary attack tries)"""
+        if self._words is None:
+            self._build_index()
+        return self._words
+
+    def iter_lines(self, start: int, stop: int) -> Iterator[str]:
+        """Yield every stripped line in [start, stop), blank ones included"""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return
+
+        block = start // self.INDEX_STRIDE
+        with open(self.path, 'rb') as f:
+            f.seek(self._offsets[block])
+            index = block * self.INDEX_STRIDE
+            for line in f:
+                if index >= stop:
+                    break
+                if index >= start:
+                    yield line.decode('utf-8', errors='ignore').strip()
+                index += 1
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        for password in self.iter_lines(start, stop):
+            if password:
+                yield password
+
+    def describe(self) -> Dict:
+        return {'type': 'wordlist', 'path': str(self.path)}
+
+
+def keyspace_from_description(desc: Dict) -> Keyspace:
+    """Rebuild a keyspace from Keyspace.describe() output"""
+    kind = desc.get('type')
+    if kind == 'mask':
+        return MaskKeyspace.from_mask(desc['mask'])
+    elif kind == 'charsets':
+        return MaskKeyspace(desc['charsets'])
+    elif kind == 'brute_force':
+        return BruteForceKeyspace(desc.get('charset'), desc['min_length'], desc['max_length'])
+    elif kind == 'wordlist':
+        return WordlistKeyspace(desc['path'])
+    else:
+        raise ValueError(f"Unknown keyspace type: {kind}")
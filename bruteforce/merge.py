@@ -0,0 +1,267 @@
+"""
+Merged Candidate Sources
+Several scored candidate streams combined into one, most probable guesses first
+"""
+
+import heapq
+import itertools
+import math
+from typing import Iterator, List, Optional, Tuple
+
+from keyspace import DEFAULT_MUTATIONS, MaskKeyspace, WordlistKeyspace
+
+# Candidates held per source while reordering a stream that is only roughly sorted
+DEFAULT_WINDOW = 10000
+
+# Passwords remembered for dedupe; beyond this, later duplicates are tried again
+DEFAULT_DEDUPE_LIMIT = 5_000_000
+
+EULER_GAMMA = 0.5772156649
+
+
+def _harmonic(n: int) -> float:
+    """Approximate n-th harmonic number (normalizes Zipf rank probabilities)"""
+    if n < 1000:
+        return sum(1.0 / k for k in range(1, n + 1))
+    return math.log(n) + EULER_GAMMA + 1.0 / (2 * n)
+
+
+class ScoredSource:
+    """
+    Base class: a candidate stream with estimated probabilities
+
+    Iterating yields (password, probability) pairs. Probabilities within a
+    source sum to about its weight, so weights split the probability mass
+    between sources.
+    """
+
+    kind = None
+
+    def __init__(self, arg: str, weight: float = 1.0, index_dir: Optional[str] = None):
+        """
+        Args:
+            arg: Source argument (a file or a mask)
+            weight: Share of the probability mass
+            index_dir: Directory for cached wordlist indexes (see keyspace.index_dir_for)
+        """
+        self.arg = arg
+        self.weight = weight
+        self.index_dir = index_dir
+
+    @property
+    def spec(self) -> str:
+        """Specification string accepted by parse_source()"""
+        return f"{self.kind}:{self.arg}:{self.weight:g}"
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        raise NotImplementedError
+
+
+class WordlistSource(ScoredSource):
+    """Wordlist in frequency order; probability falls with rank (Zipf's law)"""
+
+    kind = 'wordlist'
+
+    def __init__(self, arg: str, weight: float = 1.0, index_dir: Optional[str] = None):
+        super().__init__(arg, weight, index_dir)
+        self.keyspace = WordlistKeyspace(arg, index_dir)
+
+    def __len__(self) -> int:
+        return self.keyspace.word_count()
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        scale = self.weight / _harmonic(max(len(self), 1))
+        passwords = self.keyspace.iter_range(0, len(self.keyspace))
+        for rank, password in enumerate(passwords, 1):
+            yield password, scale / rank
+
+
+class ScoredFileSource(ScoredSource):
+    """
+    Lines of 'password<TAB>log-likelihood', e.g. from a Markov model or PassGAN
+
+    Likelihoods are natural logs and normalized over the file. Lines without
+    a score are skipped.
+    """
+
+    kind = 'scored'
+
+    def __init__(self, arg: str, weight: float = 1.0, index_dir: Optional[str] = None):
+        super().__init__(arg, weight, index_dir)
+        self.keyspace = WordlistKeyspace(arg, index_dir)
+
+    def __len__(self) -> int:
+        return self.keyspace.word_count()
+
+    def _scored_lines(self) -> Iterator[Tuple[str, float]]:
+        for line in self.keyspace.iter_range(0, len(self.keyspace)):
+            password, _, score = line.rpartition('\t')
+            if not password:
+                continue
+            try:
+                yield password, float(score)
+            except ValueError:
+                continue
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        # Log-sum-exp over the file so large negative scores don't underflow
+        top = max((score for _, score in self._scored_lines()), default=0.0)
+        total = sum(math.exp(score - top) for _, score in self._scored_lines())
+        for password, score in self._scored_lines():
+            yield password, self.weight * math.exp(score - top) / total
+
+
+class HybridSource(ScoredSource):
+    """
+    Wordlist words with the hybrid attack's mutations as suffixes and prefixes
+
+    A variant's probability is its word's Zipf probability times its rule's
+    (earlier mutations are assumed more common, suffixes before prefixes).
+    """
+
+    kind = 'hybrid'
+
+    def __init__(self, arg: str, weight: float = 1.0, index_dir: Optional[str] = None,
+                 mutations: Optional[List[str]] = None):
+        super().__init__(arg, weight, index_dir)
+        self.keyspace = WordlistKeyspace(arg, index_dir)
+        self.mutations = DEFAULT_MUTATIONS if mutations is None else mutations
+
+    def __len__(self) -> int:
+        return self.keyspace.word_count() * 2 * len(self.mutations)
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        rules = len(self.mutations) * 2
+        word_scale = 1.0 / _harmonic(max(self.keyspace.word_count(), 1))
+        rule_scale = 1.0 / _harmonic(rules)
+        passwords = self.keyspace.iter_range(0, len(self.keyspace))
+        for rank, word in enumerate(passwords, 1):
+            word_p = self.weight * word_scale / rank
+            for i, mutation in enumerate(self.mutations):
+                yield word + mutation, word_p * rule_scale / (2 * i + 1)
+                yield mutation + word, word_p * rule_scale / (2 * i + 2)
+
+
+class MaskSource(ScoredSource):
+    """Every candidate of a mask, equally likely"""
+
+    kind = 'mask'
+
+    def __init__(self, arg: str, weight: float = 1.0, index_dir: Optional[str] = None):
+        super().__init__(arg, weight, index_dir)
+        self.keyspace = MaskKeyspace.from_mask(arg)
+
+    def __len__(self) -> int:
+        return len(self.keyspace)
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        p = self.weight / len(self.keyspace)
+        for password in self.keyspace.iter_range(0, len(self.keyspace)):
+            yield password, p
+
+
+SOURCES = {cls.kind: cls for cls in (WordlistSource, ScoredFileSource, HybridSource, MaskSource)}
+
+
+def parse_source(spec: str, index_dir: Optional[str] = None) -> ScoredSource:
+    """
+    Build a source from 'kind:argument[:weight]'
+
+    Kinds are 'wordlist', 'scored', 'hybrid' (argument: a file) and 'mask'
+    (argument: a mask). The weight defaults to 1, e.g.
+    'wordlist:rockyou.txt:0.6' or 'mask:?d?d?d?d:0.05'. Wordlist indexes
+    are cached in index_dir, if given.
+    """
+    kind, sep, rest = spec.partition(':')
+    if not sep or kind not in SOURCES:
+        raise ValueError(f"Unknown candidate source '{spec}' "
+                         f"(expected one of {sorted(SOURCES)} followed by ':')")
+
+    arg, weight = rest, 1.0
+    head, sep, tail = rest.rpartition(':')
+    if sep:
+        try:
+            weight = float(tail)
+            arg = head
+        except ValueError:
+            pass
+    if weight <= 0:
+        raise ValueError(f"Source weight must be positive: {spec}")
+    return SOURCES[kind](arg, weight, index_dir)
+
+
+def reorder(stream: Iterator[Tuple[str, float]], window: int) -> Iterator[Tuple[str, float]]:
+    """
+    Sort a roughly ordered stream within a bounded window
+
+    Holds at most `window` candidates and always releases the most probable
+    one, so a stream that is sorted except for local disorder comes out
+    sorted; memory stays bounded however long the stream is.
+    """
+    heap = []
+    for i, (password, p) in enumerate(stream):
+        heapq.heappush(heap, (-p, i, password))
+        if len(heap) > window:
+            neg_p, _, best = heapq.heappop(heap)
+            yield best, -neg_p
+    while heap:
+        neg_p, _, best = heapq.heappop(heap)
+        yield best, -neg_p
+
+
+def merge_sources(sources: List[ScoredSource], window: int = DEFAULT_WINDOW,
+                  dedupe_limit: int = DEFAULT_DEDUPE_LIMIT) -> Iterator[Tuple[str, float, str]]:
+    """
+    Merge sources into one stream in descending estimated probability
+
+    Args:
+        sources: Candidate sources
+        window: Reorder window per source
+        dedupe_limit: Passwords remembered to skip cross-source duplicates
+
+    Yields:
+        (password, probability, source kind) triples; a password found in
+        several sources is only yielded by the most probable one
+    """
+    def tagged(source):
+        for password, p in reorder(iter(source), window):
+            yield password, p, source.kind
+
+    seen = set()
+    merged = heapq.merge(*(tagged(s) for s in sources), key=lambda item: -item[1])
+    for password, p, kind in merged:
+        if password in seen:
+            continue
+        if len(seen) < dedupe_limit:
+            seen.add(password)
+        yield password, p, kind
+
+
+def merged_count(sources: List[ScoredSource]) -> int:
+    """Candidates of all sources together (an upper bound, before dedupe)"""
+    return sum(len(s) for s in sources)
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show the first candidates of merged sources')
+    parser.add_argument('sources', nargs='+', help="Sources as 'kind:argument[:weight]'")
+    parser.add_argument('-n', type=int, default=20, help='Number of candidates to show')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help='Reorder window per source')
+
+    args = parser.parse_args()
+
+    sources = [parse_source(spec) for spec in args.sources]
+    merged = merge_sources(sources, args.window)
+    for i, (password, p, kind) in enumerate(itertools.islice(merged, args.n), 1):
+        print(f"{i:>6}. {password:<30} {p:.3e}  {kind}")
+
+
+if __name__ == '__main__':
+    main()
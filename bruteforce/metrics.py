@@ -0,0 +1,308 @@
+"""
+Metrics
+Per-stage timers, counters and guess-rate histograms with periodic export
+"""
+
+import json
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from checkpoint import atomic_write_text
+
+# Upper bounds (guesses/sec) of the guess-rate histogram buckets
+RATE_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+
+class Metrics:
+    """
+    Counters and stage timers for one target
+
+    Updates are plain dict arithmetic on the calling thread; snapshots copy
+    the dicts, which is atomic under the GIL, so no locks are taken.
+    """
+
+    def __init__(self, target: str = '', file_type: str = '', window: float = 5.0):
+        """
+        Args:
+            target: Target label (file name)
+            file_type: Format label ('pdf', 'office', 'zip', ...)
+            window: Seconds per guess-rate histogram sample
+        """
+        self.target = target
+        self.file_type = file_type
+        self.window = window
+
+        self.counters = {}
+        self.seconds = {}
+        self.calls = {}
+
+        self.buckets = [0] * (len(RATE_BUCKETS) + 1)
+        self.rate_sum = 0.0
+        self.rate_count = 0
+        self.current_rate = 0.0
+
+        self._window_start = time.perf_counter()
+        self._window_guesses = 0
+
+        # Optional Tracer (tracing.py): timed() blocks also become spans
+        self.tracer = None
+
+    def count(self, name: str, n: int = 1):
+        """Add to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, stage: str, seconds: float, calls: int = 1):
+        """Add time spent in a stage"""
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    def timed(self, stage: str):
+        """Context manager timing a block (for paths outside the per-guess loop)"""
+        return _StageTimer(self, stage)
+
+    def timed_iter(self, iterable: Iterable, stage: str) -> Iterator:
+        """Yield from iterable, charging the time to produce each item to stage"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.add_time(stage, time.perf_counter() - start)
+            yield item
+
+    def guesses(self, n: int = 1):
+        """Record finished guesses and sample the guess rate once per window"""
+        self.counters['guesses'] = self.counters.get('guesses', 0) + n
+        self._window_guesses += n
+
+        elapsed = time.perf_counter() - self._window_start
+        if elapsed >= self.window:
+            self.observe_rate(self._window_guesses / elapsed)
+            self._window_start += elapsed
+            self._window_guesses = 0
+
+    def observe_rate(self, rate: float):
+        """Add a guess-rate sample to the histogram"""
+        for i, bound in enumerate(RATE_BUCKETS):
+            if rate <= bound:
+                break
+        else:
+            i = len(RATE_BUCKETS)
+        self.buckets[i] += 1
+        self.rate_sum += rate
+        self.rate_count += 1
+        self.current_rate = rate
+
+    def snapshot(self) -> Dict:
+        """JSON-serialisable copy of every value"""
+        seconds = dict(self.seconds)
+        calls = dict(self.calls)
+        return {
+            'target': self.target,
+            'format': self.file_type,
+            'counters': dict(self.counters),
+            'stages': {stage: {'seconds': seconds[stage], 'calls': calls.get(stage, 0)}
+                       for stage in seconds},
+            'rate': {
+                'buckets': list(self.buckets),
+                'sum': self.rate_sum,
+                'count': self.rate_count,
+                'current': self.current_rate,
+            },
+        }
+
+    def merge(self, snapshot: Dict):
+        """Add a snapshot (e.g. from a worker process) into these metrics"""
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+        for stage, values in snapshot['stages'].items():
+            self.add_time(stage, values['seconds'], values['calls'])
+
+        rate = snapshot['rate']
+        self.buckets = [a + b for a, b in zip(self.buckets, rate['buckets'])]
+        self.rate_sum += rate['sum']
+        self.rate_count += rate['count']
+        self.current_rate = rate['current'] or self.current_rate
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict) -> 'Metrics':
+        metrics = cls(snapshot['target'], snapshot['format'])
+        metrics.merge(snapshot)
+        return metrics
+
+
+class _StageTimer:
+    def __init__(self, metrics: Metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.metrics.add_time(self.stage, seconds)
+        if self.metrics.tracer is not None:
+            self.metrics.tracer.add(self.stage, self.start, seconds,
+                                    args={'target': self.metrics.target})
+        return False
+
+
+class MetricsRegistry:
+    """Metrics of every target in a run, live or merged from worker processes"""
+
+    def __init__(self):
+        self._live = []
+        self._merged = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled (crackers are sent to worker processes)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def register(self, metrics: Metrics) -> Metrics:
+        """Track a Metrics object updated in this process"""
+        with self._lock:
+            self._live.append(metrics)
+        return metrics
+
+    def merge(self, snapshot: Dict):
+        """Add a snapshot taken in another process"""
+        key = (snapshot['target'], snapshot['format'])
+        with self._lock:
+            if key in self._merged:
+                self._merged[key].merge(snapshot)
+            else:
+                self._merged[key] = Metrics.from_snapshot(snapshot)
+
+    def snapshot(self) -> List[Dict]:
+        """One snapshot per (target, format), combining every source"""
+        with self._lock:
+            sources = list(self._live) + list(self._merged.values())
+
+        combined = {}
+        for metrics in sources:
+            snapshot = metrics.snapshot()
+            key = (snapshot['target'], snapshot['format'])
+            if key in combined:
+                combined[key].merge(snapshot)
+            else:
+                combined[key] = Metrics.from_snapshot(snapshot)
+        return [metrics.snapshot() for metrics in combined.values()]
+
+
+def _labels(**labels) -> str:
+    escaped = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(snapshots: List[Dict]) -> str:
+    """Render snapshots in the Prometheus text exposition format"""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if samples:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+    counter_names = sorted({name for s in snapshots for name in s['counters']})
+    for counter in counter_names:
+        family(f'cracker_{counter}_total', 'counter', f'{counter.capitalize()} so far', [
+            f"cracker_{counter}_total{_labels(target=s['target'], format=s['format'])} "
+            f"{s['counters'][counter]}"
+            for s in snapshots if counter in s['counters']])
+
+    family('cracker_stage_seconds_total', 'counter', 'Time spent per stage', [
+        f"cracker_stage_seconds_total{_labels(target=s['target'], format=s['format'], stage=stage)} "
+        f"{values['seconds']:.6f}"
+        for s in snapshots for stage, values in sorted(s['stages'].items())])
+
+    family('cracker_stage_calls_total', 'counter', 'Timed operations per stage', [
+        f"cracker_stage_calls_total{_labels(target=s['target'], format=s['format'], stage=stage)} "
+        f"{values['calls']}"
+        for s in snapshots for stage, values in sorted(s['stages'].items())])
+
+    family('cracker_guesses_per_second', 'gauge', 'Guess rate over the last window', [
+        f"cracker_guesses_per_second{_labels(target=s['target'], format=s['format'])} "
+        f"{s['rate']['current']:.2f}"
+        for s in snapshots])
+
+    histogram = []
+    for s in snapshots:
+        cumulative = 0
+        for bound, count in zip(list(RATE_BUCKETS) + ['+Inf'], s['rate']['buckets']):
+            cumulative += count
+            histogram.append(f"cracker_guess_rate_bucket"
+                             f"{_labels(target=s['target'], format=s['format'], le=bound)} {cumulative}")
+        labels = _labels(target=s['target'], format=s['format'])
+        histogram.append(f"cracker_guess_rate_sum{labels} {s['rate']['sum']:.2f}")
+        histogram.append(f"cracker_guess_rate_count{labels} {s['rate']['count']}")
+    family('cracker_guess_rate', 'histogram', 'Guess rate samples (guesses/sec)', histogram)
+
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Writes registry snapshots to a file, at most once per interval"""
+
+    def __init__(self, path: str, registry: MetricsRegistry, interval: float = 10.0):
+        """
+        Args:
+            path: Snapshot file; '.json' writes JSON, anything else the
+                  Prometheus text format (e.g. for node_exporter's textfile
+                  collector)
+            registry: Metrics to export
+            interval: Minimum seconds between periodic writes
+        """
+        self.path = Path(path)
+        self.registry = registry
+        self.interval = interval
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def maybe_write(self):
+        """Write a snapshot if one is due; cheap enough for every guess"""
+        if time.time() - self._last_write >= self.interval:
+            self.write(block=False)
+
+    def write(self, block: bool = True):
+        """Write a snapshot now"""
+        # Concurrent callers skip instead of queueing behind the writer
+        if not self._lock.acquire(blocking=block):
+            return
+        try:
+            self._last_write = time.time()
+            snapshots = self.registry.snapshot()
+            if self.path.suffix == '.json':
+                text = json.dumps({'updated_at': datetime.now().isoformat(),
+                                   'targets': snapshots}, indent=2)
+            else:
+                text = render_prometheus(snapshots)
+            atomic_write_text(self.path, text)
+        finally:
+            self._lock.release()
@@ -0,0 +1,351 @@
+"""
+PDF Standard Security Handler
+Reads a PDF's encryption dictionary and checks passwords without opening the document
+"""
+
+import re
+import struct
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from containers import read_target
+
+# RC4 and AES primitives (a dependency of msoffcrypto-tool)
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+    except ImportError:
+        ARC4 = algorithms.ARC4
+except ImportError:
+    Cipher = None
+    ARC4 = None
+
+# Padding string of Algorithm 2 (ISO 32000-1, 7.6.3.3)
+PAD = bytes.fromhex('28bf4e5e4e758a4164004e56fffa01082e2e00b6d0683e802f0ca9fe6453697a')
+
+_WHITESPACE = b' \t\r\n\x0c\x00'
+_DELIMITERS = b'()<>[]{}/%'
+_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b',
+            ord('f'): b'\x0c', ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+
+
+def rc4(key: bytes, data: bytes) -> bytes:
+    """RC4 keystream XOR (cryptography when available, else pure Python)"""
+    if ARC4 is not None:
+        return Cipher(ARC4(key), mode=None).encryptor().update(data)
+
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + key[i % len(key)]) & 0xff
+        s[i], s[j] = s[j], s[i]
+    out = bytearray()
+    i = j = 0
+    for byte in data:
+        i = (i + 1) & 0xff
+        j = (j + s[i]) & 0xff
+        s[i], s[j] = s[j], s[i]
+        out.append(byte ^ s[(s[i] + s[j]) & 0xff])
+    return bytes(out)
+
+
+# ---------------------------------------------------------------------------
+# Minimal object parser (enough for the encryption dictionary and /ID)
+# ---------------------------------------------------------------------------
+
+def _skip(data: bytes, pos: int) -> int:
+    while pos < len(data):
+        if data[pos] in _WHITESPACE:
+            pos += 1
+        elif data[pos] == ord('%'):
+            while pos < len(data) and data[pos] not in b'\r\n':
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _literal_string(data: bytes, pos: int) -> Tuple[bytes, int]:
+    out = bytearray()
+    depth = 1
+    pos += 1
+    while pos < len(data):
+        c = data[pos]
+        if c == ord('\\'):
+            pos += 1
+            c = data[pos]
+            if c in _ESCAPES:
+                out += _ESCAPES[c]
+            elif ord('0') <= c <= ord('7'):
+                digits = re.match(rb'[0-7]{1,3}', data[pos:pos + 3]).group(0)
+                out.append(int(digits, 8) & 0xff)
+                pos += len(digits) - 1
+            elif c == ord('\r'):
+                # Line continuation
+                if data[pos + 1:pos + 2] == b'\n':
+                    pos += 1
+            elif c != ord('\n'):
+                out.append(c)
+        elif c == ord('('):
+            depth += 1
+            out.append(c)
+        elif c == ord(')'):
+            depth -= 1
+            if not depth:
+                return bytes(out), pos + 1
+            out.append(c)
+        else:
+            out.append(c)
+        pos += 1
+    raise ValueError("Unterminated string")
+
+
+def _parse(data: bytes, pos: int):
+    """Parse one object at pos; returns (value, position after it)"""
+    pos = _skip(data, pos)
+    if data.startswith(b'<<', pos):
+        result = {}
+        pos += 2
+        while True:
+            pos = _skip(data, pos)
+            if data.startswith(b'>>', pos):
+                return result, pos + 2
+            key, pos = _parse(data, pos)
+            value, pos = _parse(data, pos)
+            result[key] = value
+    c = data[pos:pos + 1]
+    if c == b'[':
+        items = []
+        pos += 1
+        while True:
+            pos = _skip(data, pos)
+            if data.startswith(b']', pos):
+                return items, pos + 1
+            item, pos = _parse(data, pos)
+            items.append(item)
+    if c == b'<':
+        end = data.index(b'>', pos)
+        digits = re.sub(rb'\s', b'', data[pos + 1:end])
+        if len(digits) % 2:
+            digits += b'0'
+        return bytes.fromhex(digits.decode('ascii')), end + 1
+    if c == b'(':
+        return _literal_string(data, pos)
+    if c == b'/':
+        end = pos + 1
+        while end < len(data) and data[end] not in _WHITESPACE + _DELIMITERS:
+            end += 1
+        return data[pos + 1:end].decode('latin-1'), end
+
+    ref = re.compile(rb'(\d+)\s+(\d+)\s+R(?![A-Za-z])').match(data, pos)
+    if ref:
+        return ('ref', int(ref.group(1)), int(ref.group(2))), ref.end()
+    end = pos
+    while end < len(data) and data[end] not in _WHITESPACE + _DELIMITERS:
+        end += 1
+    token = data[pos:end]
+    if token in (b'true', b'false'):
+        return token == b'true', end
+    if token == b'null':
+        return None, end
+    try:
+        return (float(token) if b'.' in token else int(token)), end
+    except ValueError:
+        raise ValueError(f"Unexpected token {token[:20]!r}")
+
+
+def _find_object(data: bytes, num: int, gen: int):
+    """Last uncompressed definition of an indirect object"""
+    matches = list(re.finditer(rb'(?<![0-9])%d\s+%d\s+obj\b' % (num, gen), data))
+    if not matches:
+        return None
+    return _parse(data, matches[-1].end())[0]
+
+
+# ---------------------------------------------------------------------------
+# Security handler
+# ---------------------------------------------------------------------------
+
+class StandardSecurity:
+    """
+    Parameters of a PDF Standard security handler (revisions 2-6)
+
+    check_user() and check_owner() run the handler's password algorithms:
+    RC4 or SHA-256 computations compared against /U and /O, instead of
+    opening the file. A PDF opens with either password.
+    """
+
+    def __init__(self, revision: int, version: int, length: int, owner: bytes, user: bytes,
+                 permissions: int, file_id: bytes, encrypt_metadata: bool = True):
+        """
+        Args:
+            revision: /R
+            version: /V
+            length: Key length in bits
+            owner: /O
+            user: /U
+            permissions: /P (signed 32-bit)
+            file_id: First element of the trailer's /ID
+            encrypt_metadata: /EncryptMetadata
+        """
+        self.revision = revision
+        self.version = version
+        self.length = length
+        self.owner = owner
+        self.user = user
+        self.permissions = permissions
+        self.file_id = file_id
+        self.encrypt_metadata = encrypt_metadata
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional['StandardSecurity']:
+        """
+        Read the encryption dictionary of a PDF
+
+        Returns:
+            The handler, or None if the file is not encrypted with the
+            Standard handler or its dictionary sits in an object stream
+        """
+        refs = list(re.finditer(rb'/Encrypt\s+(\d+)\s+(\d+)\s+R', data))
+        if not refs:
+            return None
+        try:
+            encrypt = _find_object(data, int(refs[-1].group(1)), int(refs[-1].group(2)))
+            if not isinstance(encrypt, dict) or encrypt.get('Filter') != 'Standard':
+                return None
+
+            ids = list(re.finditer(rb'/ID(?=[\s\[<(])', data))
+            file_id = b''
+            if ids:
+                value = _parse(data, ids[-1].end())[0]
+                if isinstance(value, list) and value and isinstance(value[0], bytes):
+                    file_id = value[0]
+
+            revision = encrypt['R']
+            version = encrypt.get('V', 0)
+            length = encrypt.get('Length', 40)
+            if version == 4 and isinstance(encrypt.get('CF'), dict):
+                length = encrypt['CF'].get('StdCF', {}).get('Length', 16) * 8
+            if revision == 2:
+                length = 40
+            if revision >= 5:
+                length = 256
+            return cls(revision, version, length, encrypt['O'], encrypt['U'],
+                       encrypt['P'], file_id, encrypt.get('EncryptMetadata', True))
+        except (KeyError, IndexError, ValueError, TypeError):
+            return None
+
+    @classmethod
+    def from_file(cls, path) -> Optional['StandardSecurity']:
+        return cls.from_bytes(read_target(path))
+
+    @property
+    def algorithm(self) -> str:
+        """'RC4-40', 'RC4-128', 'AES-128' or 'AES-256'"""
+        if self.revision >= 5:
+            return 'AES-256'
+        if self.revision == 4 and self.version == 4 and self.length == 128:
+            return 'AES-128'
+        return f'RC4-{self.length}'
+
+    @property
+    def checkable(self) -> bool:
+        """Whether check_password() can run (R6 needs AES from cryptography)"""
+        if self.revision == 6:
+            return Cipher is not None
+        return self.revision in (2, 3, 4, 5)
+
+    def file_key(self, password: bytes) -> bytes:
+        """Algorithm 2: encryption key of a revision 2-4 user password"""
+        h = hashlib.md5((password[:32] + PAD)[:32])
+        h.update(self.owner[:32])
+        h.update(struct.pack('<i', self.permissions))
+        h.update(self.file_id)
+        if self.revision >= 4 and not self.encrypt_metadata:
+            h.update(b'\xff\xff\xff\xff')
+        key = h.digest()
+        n = self.length // 8
+        if self.revision >= 3:
+            for _ in range(50):
+                key = hashlib.md5(key[:n]).digest()
+        return key[:n]
+
+    def check_key(self, key: bytes) -> bool:
+        """Whether an RC4 file key (revision 2-4) produces /U"""
+        if self.revision == 2:
+            return rc4(key, PAD) == self.user[:32]
+        x = rc4(key, hashlib.md5(PAD + self.file_id).digest())
+        for i in range(1, 20):
+            x = rc4(bytes(k ^ i for k in key), x)
+        # Revisions 3 and 4 only define the first 16 bytes of /U
+        return x == self.user[:16]
+
+    def _hash_2b(self, password: bytes, salt: bytes, user: bytes = b'') -> bytes:
+        """Algorithm 2.B (revision 6); user is /U[:48] for the owner password"""
+        k = hashlib.sha256(password + salt + user).digest()
+        i = 0
+        while True:
+            k1 = (password + k + user) * 64
+            encryptor = Cipher(algorithms.AES(k[:16]), modes.CBC(k[16:32])).encryptor()
+            e = encryptor.update(k1) + encryptor.finalize()
+            k = (hashlib.sha256, hashlib.sha384, hashlib.sha512)[int.from_bytes(e[:16], 'big') % 3](e).digest()
+            i += 1
+            if i >= 64 and e[-1] <= i - 32:
+                return k[:32]
+
+    def check_user(self, password: bytes) -> bool:
+        """
+        Whether a user password matches /U
+
+        Args:
+            password: PDFDocEncoding (Latin-1) bytes for revisions 2-4, UTF-8
+                      for 5 and 6
+
+        Returns:
+            True for the right password; revisions 3 and 4 compare 16 bytes
+            of /U, so a match still wants confirming by opening the file
+        """
+        if self.revision <= 4:
+            return self.check_key(self.file_key(password))
+        salt = self.user[32:40]
+        password = password[:127]
+        if self.revision == 5:
+            return hashlib.sha256(password + salt).digest() == self.user[:32]
+        return self._hash_2b(password, salt) == self.user[:32]
+
+    def check_owner(self, password: bytes) -> bool:
+        """
+        Whether an owner password matches /O
+
+        Revisions 2-4 (Algorithm 7) decrypt the user password out of /O with
+        the owner password's key and check that against /U; revisions 5 and
+        6 hash the password with /O's salt and /U.
+        """
+        if self.revision <= 4:
+            key = hashlib.md5((password[:32] + PAD)[:32]).digest()
+            n = self.length // 8
+            if self.revision >= 3:
+                for _ in range(50):
+                    key = hashlib.md5(key).digest()
+            key = key[:n]
+            user = self.owner[:32]
+            if self.revision == 2:
+                user = rc4(key, user)
+            else:
+                for i in range(19, -1, -1):
+                    user = rc4(bytes(k ^ i for k in key), user)
+            return self.check_user(user)
+        salt = self.owner[32:40]
+        password = password[:127]
+        if self.revision == 5:
+            return hashlib.sha256(password + salt + self.user[:48]).digest() == self.owner[:32]
+        return self._hash_2b(password, salt, self.user[:48]) == self.owner[:32]
+
+    def check_password(self, password: bytes) -> bool:
+        """Whether a password opens the file, as the user or the owner"""
+        return self.check_user(password) or self.check_owner(password)
+
+    def describe(self) -> Dict:
+        return {'revision': self.revision, 'version': self.version, 'algorithm': self.algorithm,
+                'key_length': self.length}
@@ -0,0 +1,179 @@
+"""
+Attack Planner
+Exact candidate counts, measured throughput and time-to-exhaust estimates
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from candidate_batch import CandidateBatch
+from keyspace import (DEFAULT_CHARSET, DEFAULT_MUTATIONS, MATRIX_BATCH, BruteForceKeyspace,
+                      Keyspace, MaskKeyspace, WordlistKeyspace, parse_mask)
+from merge import merged_count, parse_source
+from verifiers import create_verifier
+
+
+def count_candidates(attack_type: str, wordlist: Optional[str] = None,
+                     mutations: Optional[List[str]] = None, mask: Optional[str] = None,
+                     charset: Optional[str] = None, min_length: int = 1, max_length: int = 6,
+                     sources: Optional[List[str]] = None, policy=None,
+                     max_passwords: Optional[int] = None, index_dir: Optional[str] = None) -> int:
+    """
+    Count the candidates an attack will try if the password is not found
+
+    Args:
+        attack_type: 'dictionary', 'hybrid', 'mask', 'brute_force' or 'merged'
+        wordlist: Wordlist path (dictionary/hybrid)
+        mutations: Hybrid mutations (default: the hybrid attack's defaults)
+        mask: Mask (mask attack)
+        charset: Character set (brute force)
+        min_length: Minimum password length (brute force)
+        max_length: Maximum password length (brute force)
+        sources: Source specifications (merged; counted before dedupe)
+        policy: PasswordPolicy pruning mask and brute force keyspaces
+                (wordlist-based counts stay upper bounds)
+        max_passwords: Attempt limit, if any
+        index_dir: Directory for cached wordlist indexes (see keyspace.index_dir_for)
+
+    Returns:
+        Number of candidates
+    """
+    if attack_type in ('dictionary', 'hybrid') and wordlist is None:
+        raise ValueError(f"Wordlist required for {attack_type} attack")
+    if attack_type == 'mask' and not mask:
+        raise ValueError("Mask required for mask attack")
+    if attack_type == 'merged' and not sources:
+        raise ValueError("Sources required for merged attack")
+
+    if attack_type == 'dictionary':
+        total = WordlistKeyspace(wordlist, index_dir).word_count()
+    elif attack_type == 'hybrid':
+        # Every mutation is tried as a suffix and as a prefix
+        mutations = DEFAULT_MUTATIONS if mutations is None else mutations
+        total = WordlistKeyspace(wordlist, index_dir).word_count() * 2 * len(mutations)
+    elif attack_type == 'mask':
+        charsets = parse_mask(mask)
+        if policy is not None:
+            charsets = policy.prune_mask(charsets)
+        total = len(MaskKeyspace(charsets)) if charsets else 0
+    elif attack_type == 'brute_force':
+        if policy is not None:
+            lengths = policy.length_range(min_length, max_length)
+            charset = policy.prune_charset(charset or DEFAULT_CHARSET)
+            if lengths is None or not charset:
+                return 0
+            min_length, max_length = lengths
+        total = len(BruteForceKeyspace(charset, min_length, max_length))
+    elif attack_type == 'merged':
+        total = merged_count([parse_source(spec, index_dir) for spec in sources])
+    else:
+        raise ValueError(f"Unknown attack type: {attack_type}")
+
+    if max_passwords:
+        total = min(total, max_passwords)
+    return total
+
+
+def measure_rate(target_file: str, seconds: float = 1.0, min_guesses: int = 3,
+                 keyspace: Optional[Keyspace] = None) -> float:
+    """
+    Measure wrong-password guesses per second against a target
+
+    Guesses go through the path an attack uses: the keyspace's candidate
+    matrices through verify_matrix() when both are vectorized, otherwise
+    CandidateBatch batches through verify_batch() (prefilter and confirm
+    when the verifier has a cheap first tier). Batches double from
+    min_guesses so slow formats still finish near the measuring time.
+
+    Args:
+        target_file: Password-protected file
+        seconds: Minimum measuring time
+        min_guesses: Minimum number of guesses (for slow formats)
+        keyspace: Mask or brute force keyspace of a single-worker attack,
+                  measured on the matrix path
+
+    Returns:
+        Guesses per second
+    """
+    verifier = create_verifier(target_file)
+    matrices = (keyspace is not None and len(keyspace) > 0
+                and verifier.vectorized and keyspace.supports_matrices)
+    largest = MATRIX_BATCH if matrices else verifier.prefilter_batch
+    size = max(1, min(min_guesses, largest))
+    guesses = 0
+    start = time.perf_counter()
+    while guesses < min_guesses or time.perf_counter() - start < seconds:
+        if matrices:
+            index = guesses % len(keyspace)
+            stop = min(index + size, len(keyspace))
+            verifier.verify_matrix(*keyspace.matrix_range(index, stop))
+            guesses += stop - index
+        else:
+            batch = CandidateBatch.from_passwords(f'\x00planner{guesses + i}' for i in range(size))
+            verifier.verify_batch(batch)
+            guesses += size
+        size = min(size * 2, largest)
+    return guesses / (time.perf_counter() - start)
+
+
+def schedule_time(durations: List[float], workers: int) -> float:
+    """
+    Wall time for independent jobs on a worker pool
+
+    Longest jobs are placed first on the least-loaded worker, which is close
+    to how an executor drains a queue of files.
+    """
+    loads = [0.0] * max(1, workers)
+    for duration in sorted(durations, reverse=True):
+        i = loads.index(min(loads))
+        loads[i] += duration
+    return max(loads) if durations else 0.0
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration, scaling up to years for large keyspaces"""
+    if seconds < 60:
+        return f"{seconds:.2f}s"
+    elif seconds < 3600:
+        return f"{int(seconds // 60)}m {seconds % 60:.1f}s"
+    elif seconds < 86400:
+        return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60)}m {seconds % 60:.0f}s"
+    elif seconds < 365 * 86400:
+        return f"{int(seconds // 86400)}d {int(seconds % 86400 // 3600)}h"
+    else:
+        return f"{seconds / (365 * 86400):,.1f} years"
+
+
+def estimate_attack(target_file: str, attack_type: str, probe_time: float = 1.0,
+                    workers: int = 1, **params) -> Dict:
+    """
+    Estimate the time to exhaust an attack on one target
+
+    Args:
+        target_file: Password-protected file
+        attack_type: Attack type (see count_candidates)
+        probe_time: Seconds spent measuring throughput
+        workers: Workers on this target (assumes linear scaling)
+        **params: Attack parameters for count_candidates
+
+    Returns:
+        Dictionary with candidates, rate (guesses/sec) and seconds
+    """
+    candidates = count_candidates(attack_type, **params)
+    # Single-worker mask and brute force runs take the vectorized path
+    keyspace = None
+    policy = params.get('policy')
+    if workers <= 1 and (policy is None or not policy.needs_filter):
+        if attack_type == 'mask':
+            keyspace = MaskKeyspace.from_mask(params['mask'])
+        elif attack_type == 'brute_force':
+            keyspace = BruteForceKeyspace(params.get('charset') or DEFAULT_CHARSET,
+                                          params.get('min_length', 1), params.get('max_length', 6))
+    rate = measure_rate(target_file, probe_time, keyspace=keyspace) * max(1, workers)
+    return {
+        'file': str(target_file),
+        'attack': attack_type,
+        'candidates': candidates,
+        'rate': rate,
+        'seconds': candidates / rate if rate > 0 else float('inf'),
+    }
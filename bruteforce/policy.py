@@ -0,0 +1,151 @@
+"""
+Password Policy
+Length and character-class constraints, applied where candidates are generated
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from keyspace import MASK_CHARSETS
+
+# Character classes by mask letter
+CLASSES = {key: MASK_CHARSETS[key] for key in 'luds'}
+CLASS_NAMES = {'l': 'lowercase', 'u': 'uppercase', 'd': 'digit', 's': 'symbol'}
+
+
+def _char_class(c: str) -> Optional[str]:
+    for key, chars in CLASSES.items():
+        if c in chars:
+            return key
+    return None
+
+
+class PasswordPolicy:
+    """
+    Constraints every password on the target is known to satisfy
+
+    Written as 'min=12,max=64,require=lud,allow=luds': length range,
+    classes every password contains, and classes it may contain (l lowercase,
+    u uppercase, d digits, s symbols). Omitted keys impose no constraint.
+    """
+
+    def __init__(self, min_length: int = 1, max_length: Optional[int] = None,
+                 require: str = '', allow: Optional[str] = None):
+        """
+        Args:
+            min_length: Minimum password length
+            max_length: Maximum password length (None for no limit)
+            require: Class letters every password contains
+            allow: Class letters passwords may use (None allows any character)
+        """
+        for key in require + (allow or ''):
+            if key not in CLASSES:
+                raise ValueError(f"Unknown character class '{key}' (expected l, u, d or s)")
+        if allow is not None and any(key not in allow for key in require):
+            raise ValueError(f"Required classes '{require}' must be allowed ('{allow}')")
+        if min_length < 1 or (max_length is not None and max_length < min_length):
+            raise ValueError(f"Invalid length range: {min_length}-{max_length}")
+
+        self.min_length = min_length
+        self.max_length = max_length
+        self.require = ''.join(sorted(set(require)))
+        self.allow = None if allow is None else ''.join(sorted(set(allow)))
+        self.allowed_chars = None if allow is None else set(''.join(CLASSES[k] for k in self.allow))
+
+    @classmethod
+    def parse(cls, spec: str) -> 'PasswordPolicy':
+        """Build a policy from 'min=12,max=64,require=lud,allow=luds'"""
+        kwargs = {}
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise ValueError(f"Policy items look like key=value: '{item}'")
+            if key == 'min':
+                kwargs['min_length'] = int(value)
+            elif key == 'max':
+                kwargs['max_length'] = int(value)
+            elif key == 'require':
+                kwargs['require'] = value
+            elif key == 'allow':
+                kwargs['allow'] = value
+            else:
+                raise ValueError(f"Unknown policy key '{key}' (expected min, max, require, allow)")
+        return cls(**kwargs)
+
+    def __str__(self) -> str:
+        parts = [f"min={self.min_length}"]
+        if self.max_length is not None:
+            parts.append(f"max={self.max_length}")
+        if self.require:
+            parts.append(f"require={self.require}")
+        if self.allow is not None:
+            parts.append(f"allow={self.allow}")
+        return ','.join(parts)
+
+    def describe(self) -> Dict:
+        """JSON-serializable form (identifies the policy in restore files)"""
+        return {'min_length': self.min_length, 'max_length': self.max_length,
+                'require': self.require, 'allow': self.allow}
+
+    def allows_length(self, length: int) -> bool:
+        return length >= self.min_length and (self.max_length is None or length <= self.max_length)
+
+    def allows(self, password: str) -> bool:
+        """Whether a password satisfies the policy"""
+        if not self.allows_length(len(password)):
+            return False
+        if self.allowed_chars is not None and not self.allowed_chars.issuperset(password):
+            return False
+        if self.require:
+            present = {_char_class(c) for c in password}
+            return all(key in present for key in self.require)
+        return True
+
+    def filter(self, passwords: Iterable[str]) -> Iterator[str]:
+        """Yield only passwords the policy allows"""
+        allows = self.allows
+        return (p for p in passwords if allows(p))
+
+    def length_range(self, min_length: int, max_length: int) -> Optional[Tuple[int, int]]:
+        """
+        Intersect a length range with the policy
+
+        Lengths shorter than the number of required classes are dropped too.
+
+        Returns:
+            (min, max), or None if no length is left
+        """
+        low = max(min_length, self.min_length, len(self.require))
+        high = max_length if self.max_length is None else min(max_length, self.max_length)
+        return (low, high) if low <= high else None
+
+    def prune_charset(self, charset: str) -> str:
+        """Characters of a charset the policy allows"""
+        if self.allowed_chars is None:
+            return charset
+        return ''.join(c for c in charset if c in self.allowed_chars)
+
+    def prune_mask(self, charsets: List[str]) -> Optional[List[str]]:
+        """
+        Restrict a mask's per-position charsets to the policy
+
+        Returns:
+            Pruned charsets, or None if no candidate of the mask can satisfy
+            the policy (wrong length, an emptied position, or a required
+            class that fits in no position)
+        """
+        if not self.allows_length(len(charsets)):
+            return None
+        pruned = [self.prune_charset(cs) for cs in charsets]
+        if any(not cs for cs in pruned):
+            return None
+        for key in self.require:
+            if not any(set(cs) & set(CLASSES[key]) for cs in pruned):
+                return None
+        if len(self.require) > len(pruned):
+            return None
+        return pruned
+
+    @property
+    def needs_filter(self) -> bool:
+        """Whether candidates from a pruned mask or charset still need checking"""
+        return bool(self.require)
@@ -0,0 +1,176 @@
+"""
+Potfile
+SQLite database of cracked targets, keyed by file content hash
+"""
+
+import os
+import sys
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from containers import open_target
+
+DEFAULT_POTFILE = 'potfile.db'
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 of a file's contents (renamed or copied targets still match)"""
+    digest = hashlib.sha256()
+    with open_target(path) as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Potfile:
+    """Cracked passwords with the attack that found them"""
+
+    def __init__(self, path: str = DEFAULT_POTFILE):
+        """
+        Args:
+            path: SQLite database file (created on first use)
+        """
+        self.path = Path(path)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Connections and locks stay in their process; workers reconnect
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Several processes of one batch may write at once
+            conn = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cracked (
+                    hash TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    filename TEXT,
+                    file_type TEXT,
+                    attack TEXT,
+                    attempts INTEGER,
+                    seconds REAL,
+                    cracked_at TEXT
+                )
+            ''')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, file_hash: str) -> Optional[Dict]:
+        """
+        Find a cracked target
+
+        Args:
+            file_hash: content_hash() of the target
+
+        Returns:
+            Entry dictionary, or None if the target has not been cracked
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM cracked WHERE hash = ?', (file_hash,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, file_hash: str, password: str, filename: str = None, file_type: str = None,
+            attack: str = None, attempts: int = None, seconds: float = None):
+        """Record a cracked target (replacing any earlier entry)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO cracked VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         (file_hash, password, filename, file_type, attack, attempts, seconds,
+                          datetime.now().isoformat()))
+            conn.commit()
+
+    def entries(self) -> List[Dict]:
+        """Every entry, most recent first"""
+        with self._lock:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute('SELECT * FROM cracked ORDER BY cracked_at DESC').fetchall()
+        return [dict(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM cracked').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def check_potfile(potfile: Potfile, verifier, file_hash: str) -> Optional[str]:
+    """
+    Return the known password of a target, confirmed against the file
+
+    Args:
+        potfile: Potfile to consult
+        verifier: Verifier for the target
+        file_hash: content_hash() of the target
+
+    Returns:
+        Password, or None if unknown (or no longer correct)
+    """
+    entry = potfile.lookup(file_hash)
+    if entry is None:
+        return None
+    try:
+        if verifier.verify(entry['password']):
+            return entry['password']
+    except Exception:
+        pass
+    return None
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show cracked passwords from the potfile')
+    parser.add_argument('files', nargs='*', help='Files to look up (default: list every entry)')
+    parser.add_argument('--potfile', default=DEFAULT_POTFILE, help='Potfile path')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.potfile):
+        print(f"Potfile not found: {args.potfile}")
+        sys.exit(1)
+
+    potfile = Potfile(args.potfile)
+    if not args.files:
+        for entry in potfile.entries():
+            print(f"{entry['filename']}: {entry['password']} "
+                  f"({entry['attack']}, {entry['attempts'] or 0:,} attempts, {entry['hash'][:12]})")
+        print(f"\n{len(potfile)} cracked targets")
+        return
+
+    missing = 0
+    for path in args.files:
+        entry = potfile.lookup(content_hash(path))
+        if entry:
+            print(f"✓ {path}: {entry['password']}")
+        else:
+            print(f"✗ {path}: not cracked")
+            missing += 1
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == '__main__':
+    main()
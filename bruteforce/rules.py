@@ -0,0 +1,71 @@
+"""
+Password Rules
+Small mangling rules for trying close variants of known passwords
+"""
+
+import re
+from typing import List
+
+# Suffixes people add when a site forces a "new" password
+COMMON_SUFFIXES = ['1', '!', '123', '12', '@', '#']
+
+# Years tried in place of a trailing 4-digit year
+YEARS = [str(year) for year in range(2018, 2027)]
+
+
+def _dedupe(candidates: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for candidate in candidates:
+        if candidate and candidate not in seen:
+            seen.add(candidate)
+            unique.append(candidate)
+    return unique
+
+
+def case_variants(word: str) -> List[str]:
+    """The word as lower, upper, capitalized, swapped and first-letter-toggled"""
+    return [word, word.lower(), word.upper(), word.capitalize(), word.swapcase(),
+            word[:1].swapcase() + word[1:]]
+
+
+def neighborhood(password: str, limit: int = 64) -> List[str]:
+    """
+    Close variants of a password, most likely first
+
+    The password itself, case changes, its trailing number or year moved
+    up and down, trailing symbols dropped, and common suffixes appended.
+
+    Args:
+        password: Known password
+        limit: Maximum number of candidates
+
+    Returns:
+        Candidates without duplicates, starting with the password itself
+    """
+    candidates = case_variants(password)
+
+    # Split off a trailing run of symbols, then a trailing number
+    match = re.match(r'^(.*?)([^A-Za-z0-9]*)$', password)
+    stem, symbols = match.group(1), match.group(2)
+    match = re.match(r'^(.*?)(\d+)$', stem)
+    if match:
+        base, digits = match.group(1), match.group(2)
+        number = int(digits)
+        numbers = [str(number + 1).zfill(len(digits)), str(max(number - 1, 0)).zfill(len(digits))]
+        if len(digits) == 4 and digits[:2] in ('19', '20'):
+            numbers.extend(year for year in YEARS if year != digits)
+        for n in numbers:
+            candidates.append(base + n + symbols)
+        candidates.append(base + symbols)
+        candidates.append(base)
+    if symbols:
+        candidates.append(stem)
+
+    for word in (password, password.capitalize()):
+        for suffix in COMMON_SUFFIXES:
+            candidates.append(word + suffix)
+    for variant in case_variants(stem)[1:]:
+        candidates.append(variant + symbols)
+
+    return _dedupe(candidates)[:limit]
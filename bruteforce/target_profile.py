@@ -0,0 +1,222 @@
+"""
+Target Profiles
+Encryption parameters, cost per guess and duplicate content of each target
+"""
+
+import sys
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from containers import discover, open_target, read_target
+from keysearch import Office97Target
+from pdfcrypt import StandardSecurity
+from planner import format_time, measure_rate
+from potfile import content_hash
+from verifiers import ZipVerifier, aes_fields, file_type_for
+
+try:
+    import msoffcrypto
+except ImportError:
+    msoffcrypto = None
+
+# Key derivation of each PDF Standard handler revision: (function, rounds)
+PDF_KDFS = {
+    2: ('MD5', 1),
+    3: ('MD5 + 20x RC4', 51),
+    4: ('MD5 + 20x RC4', 51),
+    5: ('SHA-256', 1),
+    6: ('SHA-256/384/512 (2.B)', 64),
+}
+
+# ECMA-376 standard encryption AlgID -> cipher
+OFFICE_ALGORITHMS = {0x660E: 'AES-128', 0x660F: 'AES-192', 0x6610: 'AES-256', 0x6801: 'RC4'}
+
+# Spin count of ECMA-376 standard encryption (fixed by the spec)
+STANDARD_SPIN = 50000
+
+ZIP_AES_BITS = {1: 128, 2: 192, 3: 256}
+
+
+def _pdf_profile(path: str) -> Dict:
+    security = StandardSecurity.from_file(path)
+    if security is None:
+        encrypted = b'/Encrypt' in read_target(path)
+        return {'encrypted': encrypted, 'algorithm': 'unknown' if encrypted else None}
+    kdf, iterations = PDF_KDFS.get(security.revision, ('unknown', None))
+    return {'encrypted': True, 'algorithm': security.algorithm, 'key_length': security.length,
+            'kdf': kdf, 'iterations': iterations, 'revision': security.revision}
+
+
+def _office_profile(path: str) -> Dict:
+    if msoffcrypto is None:
+        return {'encrypted': True, 'algorithm': 'unknown'}
+    with open_target(path) as f:
+        file_obj = msoffcrypto.OfficeFile(f)
+        encrypted = file_obj.is_encrypted()
+        kind = getattr(file_obj, 'type', None)
+        info = getattr(file_obj, 'info', None)
+        container = file_obj.format
+
+    if not encrypted:
+        return {'encrypted': False, 'container': container}
+    if kind == 'agile':
+        return {'encrypted': True, 'container': container, 'algorithm': f"AES-{info['passwordKeyBits']}",
+                'key_length': info['passwordKeyBits'], 'kdf': info['passwordHashAlgorithm'],
+                'iterations': info['spinValue']}
+    if kind == 'standard':
+        key_length = info['header']['keySize'] or 40
+        return {'encrypted': True, 'container': container,
+                'algorithm': OFFICE_ALGORITHMS.get(info['header']['algId'], 'unknown'),
+                'key_length': key_length, 'kdf': 'SHA-1', 'iterations': STANDARD_SPIN}
+    if Office97Target.from_file(path) is not None:
+        return {'encrypted': True, 'container': container, 'algorithm': 'RC4-40', 'key_length': 40,
+                'kdf': 'MD5', 'iterations': 1}
+    return {'encrypted': True, 'container': container, 'algorithm': 'RC4 CryptoAPI or XOR'}
+
+
+def _zip_profile(path: str) -> Dict:
+    entry = ZipVerifier(path).entry
+    if entry is None or not entry.flag_bits & 0x1:
+        return {'encrypted': False}
+    profile = {'encrypted': True, 'entry': entry.filename, 'entry_size': entry.compress_size}
+    aes = aes_fields(entry)
+    if aes is not None:
+        bits = ZIP_AES_BITS.get(aes[0])
+        profile.update(algorithm=f'AES-{bits}', key_length=bits, kdf='PBKDF2-HMAC-SHA1',
+                       iterations=1000)
+    else:
+        profile.update(algorithm='ZipCrypto', key_length=96, kdf=None, iterations=None)
+    return profile
+
+
+PROFILERS = {
+    'pdf': _pdf_profile,
+    'office': _office_profile,
+    'zip': _zip_profile,
+}
+
+
+def profile_target(path: str, probe_time: float = 0.2) -> Dict:
+    """
+    Describe one target
+
+    Args:
+        path: Target file
+        probe_time: Seconds spent measuring the cost per guess (0 skips it)
+
+    Returns:
+        Dictionary with file, format, encrypted, algorithm, key_length, kdf,
+        iterations, cost (seconds per wrong guess, or None) and sha256
+    """
+    profile = {'file': str(path), 'format': file_type_for(str(path)), 'encrypted': None,
+               'algorithm': None, 'key_length': None, 'kdf': None, 'iterations': None,
+               'cost': None, 'sha256': content_hash(path)}
+    if profile['format'] is None:
+        return profile
+
+    try:
+        profile.update(PROFILERS[profile['format']](str(path)))
+    except Exception as e:
+        profile['error'] = str(e)
+        return profile
+
+    if profile['encrypted'] and probe_time > 0:
+        try:
+            profile['cost'] = 1.0 / measure_rate(str(path), probe_time)
+        except Exception as e:
+            profile['error'] = str(e)
+    return profile
+
+
+def duplicate_groups(profiles: Iterable[Dict]) -> List[List[str]]:
+    """Files sharing the same content (one crack covers the group)"""
+    groups = defaultdict(list)
+    for profile in profiles:
+        groups[profile['sha256']].append(profile['file'])
+    return [files for files in groups.values() if len(files) > 1]
+
+
+def profile_targets(paths: Iterable[str], probe_time: float = 0.2) -> Dict:
+    """
+    Profile several targets, cheapest first
+
+    Returns:
+        {'targets': [profile, ...], 'duplicates': [[file, ...], ...]}
+    """
+    profiles = [profile_target(str(p), probe_time) for p in paths]
+    profiles.sort(key=lambda p: (p['cost'] is None, p['cost'] or 0))
+    return {'targets': profiles, 'duplicates': duplicate_groups(profiles)}
+
+
+def format_cost(seconds: float) -> str:
+    """Seconds per guess, in the unit that reads best"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return format_time(seconds)
+
+
+def print_profile(report: Dict):
+    """Print the report of profile_targets()"""
+    print(f"\n{'='*80}")
+    print(f"ENCRYPTION PROFILE")
+    print(f"{'='*80}")
+    print(f"{'File':<28} {'Format':<7} {'Algorithm':<12} {'Key':>4} {'KDF':<22} "
+          f"{'Rounds':>7} {'Cost/guess':>11}")
+    for profile in report['targets']:
+        name = Path(profile['file']).name[:28]
+        if profile['format'] is None:
+            print(f"{name:<28} unsupported")
+            continue
+        if profile['encrypted'] is False:
+            print(f"{name:<28} {profile['format']:<7} not encrypted")
+            continue
+        cost = format_cost(profile['cost']) if profile['cost'] is not None else '-'
+        print(f"{name:<28} {profile['format']:<7} {profile['algorithm'] or '-':<12} "
+              f"{profile['key_length'] or '-':>4} {profile['kdf'] or '-':<22} "
+              f"{profile['iterations'] or '-':>7} {cost:>11}")
+        if profile.get('error'):
+            print(f"  ⚠ {profile['error']}")
+
+    if report['duplicates']:
+        print(f"\nDuplicate content (cracking one cracks all):")
+        # Full paths and member addresses: same-named files in different folders are common
+        for i, files in enumerate(report['duplicates'], 1):
+            print(f"  Group {i}:")
+            for f in files:
+                print(f"    {f}")
+    print(f"{'='*80}\n")
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Report the encryption of password-protected files')
+    parser.add_argument('paths', nargs='+', help='Files or directories to profile')
+    parser.add_argument('--probe-time', type=float, default=0.2,
+                        help='Seconds spent measuring each target (0 skips the measurement)')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    files = []
+    for path in map(Path, args.paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.is_file() and file_type_for(str(p))))
+        else:
+            # A ZIP drop is profiled member by member
+            files.extend(discover(path) or [path])
+
+    report = profile_targets(files, args.probe_time)
+    print_profile(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
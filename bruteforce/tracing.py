@@ -0,0 +1,169 @@
+"""
+Timeline Tracing
+Per-worker spans of a cracking run, written as a Chrome trace (chrome://tracing, Perfetto)
+"""
+
+import os
+import json
+import time
+import itertools
+import threading
+import multiprocessing as mp
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from checkpoint import atomic_write_text
+
+
+def _now() -> float:
+    # perf_counter is CLOCK_MONOTONIC on Linux (QueryPerformanceCounter on
+    # Windows): one clock for every process, so worker spans line up
+    return time.perf_counter()
+
+
+def _where() -> Tuple[int, int, str, str]:
+    return (os.getpid(), threading.get_native_id(),
+            mp.current_process().name, threading.current_thread().name)
+
+
+def traced_call(submitted: float, fn, *args):
+    """
+    Worker-side wrapper of a traced task
+
+    Returns:
+        (fn(*args), (pid, tid, process name, thread name, submitted, start, end))
+    """
+    start = _now()
+    result = fn(*args)
+    return result, _where() + (submitted, start, _now())
+
+
+class _Span:
+    def __init__(self, tracer: 'Tracer', name: str, cat: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.start, _now() - self.start, self.cat, args=self.args)
+
+
+class Tracer:
+    """
+    Collects the spans of a run and writes them as a Chrome trace
+
+    Spans are complete ('X') events on the track of the process and thread
+    they ran on; time a task sat in an executor queue is an async event on
+    the worker that picked it up. Components take tracer=None and only
+    trace when given one, so a disabled tracer costs an attribute check.
+    Tasks run in other processes are wrapped with submit() and their spans
+    recorded in the parent with unwrap(); a tracer pickled into a worker
+    starts empty, and its take() events are merged back with merge().
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Trace file (JSON, opened by chrome://tracing or ui.perfetto.dev)
+        """
+        self.path = Path(path)
+        self.events: List[Dict] = []
+        self._named = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # A copy sent to a worker records only that worker's spans
+        state = self.__dict__.copy()
+        state['events'] = []
+        state['_named'] = set()
+        del state['_ids'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _track(self, pid: int, tid: int, process: str, thread: str):
+        """Name a process/thread track the first time it is used"""
+        with self._lock:
+            if pid not in self._named:
+                self._named.add(pid)
+                self.events.append({'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': tid,
+                                    'args': {'name': f"{process} ({pid})"}})
+            if (pid, tid) not in self._named:
+                self._named.add((pid, tid))
+                self.events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                                    'args': {'name': thread}})
+
+    def span(self, name: str, cat: str = 'stage', **args) -> _Span:
+        """Context manager recording a block as a span on this thread"""
+        return _Span(self, name, cat, args)
+
+    def add(self, name: str, start: float, duration: float, cat: str = 'stage',
+            where: Optional[Tuple] = None, args: Optional[Dict] = None):
+        """
+        Record a span measured elsewhere
+
+        Args:
+            name: Span name ('verify', 'generate', ...)
+            start: perf_counter() at the start
+            duration: Seconds
+            cat: Category
+            where: (pid, tid, process name, thread name); default this thread
+            args: Details shown with the span
+        """
+        pid, tid, process, thread = where or _where()
+        self._track(pid, tid, process, thread)
+        event = {'ph': 'X', 'name': name, 'cat': cat, 'pid': pid, 'tid': tid,
+                 'ts': start * 1e6, 'dur': duration * 1e6}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def submit(self, executor, fn, *args):
+        """Submit fn(*args) wrapped by traced_call; pass the future's result to unwrap()"""
+        return executor.submit(traced_call, _now(), fn, *args)
+
+    def unwrap(self, name: str, traced, cat: str = 'worker', **args) -> Any:
+        """
+        Record a traced_call's queue wait and span, and return fn's result
+        """
+        result, (pid, tid, process, thread, submitted, start, end) = traced
+        self.add(name, start, end - start, cat, (pid, tid, process, thread), args)
+        if start > submitted:
+            # Unique across the tracers merged into one file
+            span_id = f"{os.getpid()}-{next(self._ids)}"
+            for phase, ts in (('b', submitted), ('e', start)):
+                self.events.append({'ph': phase, 'name': 'queued', 'cat': 'queue',
+                                    'id': span_id, 'pid': pid, 'tid': tid, 'ts': ts * 1e6})
+        return result
+
+    def take(self) -> List[Dict]:
+        """Remove and return the recorded events (a worker's, to merge in the parent)"""
+        events, self.events = self.events, []
+        self._named = set()
+        return events
+
+    def merge(self, events: List[Dict]):
+        """Add events recorded by another tracer (e.g. in a worker process)"""
+        for event in events:
+            if event['ph'] == 'M':
+                key = event['pid'] if event['name'] == 'process_name' else (event['pid'], event['tid'])
+                with self._lock:
+                    if key in self._named:
+                        continue
+                    self._named.add(key)
+            self.events.append(event)
+
+    def save(self) -> Path:
+        """Write the trace file (atomically) and return its path"""
+        atomic_write_text(self.path, json.dumps({'traceEvents': self.events,
+                                                 'displayTimeUnit': 'ms'}))
+        return self.path
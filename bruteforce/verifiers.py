@@ -0,0 +1,754 @@
+"""
+Password Verifiers
+Format-specific password checks shared by every cracking front end
+"""
+
+import io
+import hmac
+import struct
+import zlib
+import hashlib
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Union
+
+from candidate_batch import CandidateBatch
+from containers import HEAD_SIZE, is_member, open_target, read_target, sniff_bytes, target_exists
+from pdfcrypt import StandardSecurity
+
+# File format libraries
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+try:
+    import msoffcrypto
+    from msoffcrypto.method.ecma376_agile import ECMA376Agile
+    from msoffcrypto.method.ecma376_standard import ECMA376Standard
+except ImportError:
+    msoffcrypto = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Verifier:
+    """Base class for password verifiers"""
+
+    file_type = None
+
+    # Whether the hot loop of verify() runs with the GIL released. Verifiers
+    # whose work happens in GIL-releasing C code scale on threads; the rest
+    # need worker processes to use more than one core.
+    releases_gil = False
+
+    # Whether verify_matrix() checks uint8 candidate matrices without
+    # building a Python string per candidate
+    vectorized = False
+
+    # Byte form verify_encoded() takes (a codec name), or None if the
+    # verifier only accepts strings. Batches build each form once and share
+    # it between every target that checks them.
+    encoding = None
+
+    # Whether prefilter() is cheaper than verify(). Its survivors are only
+    # probable hits and still need confirm().
+    has_prefilter = False
+
+    # Candidates per prefilter() call in the two-tier loop
+    prefilter_batch = 256
+
+    def __init__(self, target_file: str):
+        """
+        Args:
+            target_file: Path to the password-protected file
+        """
+        self.target_file = Path(target_file)
+        # Archive members ('drop.zip!a.pdf') are read once and checked in memory
+        self._data = read_target(target_file) if is_member(target_file) else None
+
+    def open(self) -> BinaryIO:
+        """The target as a binary file object"""
+        if self._data is not None:
+            return io.BytesIO(self._data)
+        return open(self.target_file, 'rb')
+
+    def source(self) -> Union[Path, BinaryIO]:
+        """What pikepdf and zipfile open: the path on disk, or the member in memory"""
+        if self._data is not None:
+            return io.BytesIO(self._data)
+        return self.target_file
+
+    def verify(self, password: str) -> bool:
+        """
+        Check a single password
+
+        Args:
+            password: Password to try
+
+        Returns:
+            True if password is correct, False otherwise
+        """
+        raise NotImplementedError
+
+    def verify_encoded(self, encoded: bytes) -> bool:
+        """
+        Check a password already in the verifier's encoding
+
+        Args:
+            encoded: Password bytes in self.encoding
+
+        Returns:
+            True if password is correct, False otherwise
+        """
+        raise NotImplementedError
+
+    def prefilter(self, batch: CandidateBatch) -> List[int]:
+        """
+        Cheap first tier: indices of candidates that may be correct
+
+        May keep wrong passwords (false positives) but never drops the
+        right one. Without a cheap check every candidate survives.
+
+        Args:
+            batch: Candidates to screen
+
+        Returns:
+            Indices of survivors, in batch order
+        """
+        return list(range(len(batch)))
+
+    def confirm(self, password: str) -> bool:
+        """
+        Authoritative second tier for a prefilter survivor
+
+        Args:
+            password: Password to check
+
+        Returns:
+            True if password is correct, False otherwise
+        """
+        return self.verify(password)
+
+    def verify_batch(self, passwords: Iterable[str]) -> Optional[str]:
+        """
+        Check a batch of passwords
+
+        Args:
+            passwords: Passwords to try (a CandidateBatch is checked in its
+                       shared encoding when the verifier has one)
+
+        Returns:
+            First correct password, or None
+        """
+        if self.has_prefilter:
+            if not isinstance(passwords, CandidateBatch):
+                passwords = CandidateBatch.from_passwords(passwords)
+            for i in self.prefilter(passwords):
+                try:
+                    if self.confirm(passwords[i]):
+                        return passwords[i]
+                except Exception:
+                    pass
+            return None
+
+        if self.encoding is not None and isinstance(passwords, CandidateBatch):
+            for i, encoded in enumerate(passwords.encoded(self.encoding)):
+                try:
+                    if encoded is not None and self.verify_encoded(encoded):
+                        return passwords[i]
+                except Exception:
+                    pass
+            return None
+
+        for password in passwords:
+            try:
+                if self.verify(password):
+                    return password
+            except Exception:
+                pass
+        return None
+
+    def verify_matrix(self, matrix, lengths) -> Optional[int]:
+        """
+        Check candidates given as a uint8 matrix (see Keyspace.matrix_range)
+
+        Args:
+            matrix: One zero-padded row of ASCII bytes per candidate
+            lengths: Length of each row's candidate
+
+        Returns:
+            Row index of the first correct password, or None
+        """
+        for i in range(len(lengths)):
+            try:
+                if self.verify(matrix[i, :lengths[i]].tobytes().decode('ascii')):
+                    return i
+            except Exception:
+                pass
+        return None
+
+
+def _make_crc_table() -> List[int]:
+    table = []
+    for n in range(256):
+        for _ in range(8):
+            n = (n >> 1) ^ 0xEDB88320 if n & 1 else n >> 1
+        table.append(n)
+    return table
+
+
+# Byte-wise CRC-32 steps of the ZipCrypto key schedule
+CRC_TABLE = _make_crc_table()
+
+
+class ZipCryptoDecrypter:
+    """Traditional PKWARE decryption, fed chunk by chunk"""
+
+    def __init__(self, password: bytes):
+        self.keys = (0x12345678, 0x23456789, 0x34567890)
+        self._update(password, encrypted=False)
+
+    def _update(self, data: bytes, encrypted: bool) -> bytes:
+        table = CRC_TABLE
+        k0, k1, k2 = self.keys
+        out = bytearray(len(data)) if encrypted else None
+        for i, c in enumerate(data):
+            if encrypted:
+                t = (k2 | 2) & 0xffff
+                c ^= ((t * (t ^ 1)) >> 8) & 0xff
+                out[i] = c
+            k0 = (k0 >> 8) ^ table[(k0 ^ c) & 0xff]
+            k1 = ((k1 + (k0 & 0xff)) * 134775813 + 1) & 0xffffffff
+            k2 = (k2 >> 8) ^ table[(k2 ^ (k1 >> 24)) & 0xff]
+        self.keys = (k0, k1, k2)
+        return bytes(out) if encrypted else b''
+
+    def decrypt(self, data: bytes) -> bytes:
+        return self._update(data, encrypted=True)
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Inverse of decrypt(), for writing archives (benchmark fixtures)"""
+        out = bytearray(len(data))
+        for i, c in enumerate(data):
+            t = (self.keys[2] | 2) & 0xffff
+            out[i] = c ^ (((t * (t ^ 1)) >> 8) & 0xff)
+            # The keys advance on the plaintext either way
+            self._update(bytes((c,)), encrypted=False)
+        return bytes(out)
+
+
+def zipcrypto_check_byte(password: bytes, header: bytes) -> int:
+    """Decrypt the last byte of a ZipCrypto header under one password"""
+    return ZipCryptoDecrypter(password).decrypt(header)[-1]
+
+
+def zipcrypto_check_bytes(matrix, lengths, header: bytes):
+    """
+    Decrypt the last byte of a ZipCrypto header under every candidate
+
+    Runs the ZipCrypto key schedule column by column on uint32 arrays, one
+    lane per candidate. A correct password yields the entry's check byte;
+    a wrong one does so 1 time in 256.
+
+    Args:
+        matrix: uint8 candidate matrix
+        lengths: Length of each row's candidate
+        header: The entry's 12-byte encryption header
+
+    Returns:
+        uint8 array of decrypted check bytes, one per row
+    """
+    table = np.array(CRC_TABLE, dtype=np.uint32)
+    n = len(lengths)
+    k0 = np.full(n, 0x12345678, dtype=np.uint32)
+    k1 = np.full(n, 0x23456789, dtype=np.uint32)
+    k2 = np.full(n, 0x34567890, dtype=np.uint32)
+
+    def update(k0, k1, k2, c):
+        k0 = (k0 >> 8) ^ table[(k0 ^ c) & 0xff]
+        k1 = (k1 + (k0 & 0xff)) * np.uint32(134775813) + np.uint32(1)
+        k2 = (k2 >> 8) ^ table[(k2 ^ (k1 >> 24)) & 0xff]
+        return k0, k1, k2
+
+    uniform = bool(n) and bool((lengths == matrix.shape[1]).all())
+    for pos in range(matrix.shape[1]):
+        c = matrix[:, pos].astype(np.uint32)
+        u0, u1, u2 = update(k0, k1, k2, c)
+        if uniform:
+            k0, k1, k2 = u0, u1, u2
+        else:
+            active = lengths > pos
+            k0, k1, k2 = np.where(active, u0, k0), np.where(active, u1, k1), np.where(active, u2, k2)
+
+    for i, byte in enumerate(header):
+        t = (k2 | 2) & 0xffff
+        plain = (np.uint32(byte) ^ ((t * (t ^ 1)) >> 8)) & 0xff
+        if i == len(header) - 1:
+            return plain.astype(np.uint8)
+        k0, k1, k2 = update(k0, k1, k2, plain)
+
+
+class PdfVerifier(Verifier):
+    """PDF verifier backed by pikepdf"""
+
+    file_type = 'pdf'
+    encoding = 'utf-8'
+
+    # qpdf parses and decrypts with the GIL released
+    releases_gil = True
+
+    def __init__(self, target_file: str):
+        super().__init__(target_file)
+        self._security = None
+
+    def _load_security(self):
+        security = StandardSecurity.from_file(self.target_file)
+        self._security = security if security is not None and security.checkable else False
+
+    @property
+    def has_prefilter(self) -> bool:
+        if self._security is None:
+            self._load_security()
+        return bool(self._security)
+
+    def prefilter(self, batch: CandidateBatch) -> List[int]:
+        """Run the security handler's /U and /O checks (no document parsing)"""
+        if not self.has_prefilter:
+            return super().prefilter(batch)
+        security = self._security
+        # Revisions 2-4 hash PDFDocEncoding; candidates outside Latin-1
+        # are left for qpdf, which tries other encodings
+        encoded = batch.encoded('latin-1' if security.revision <= 4 else 'utf-8')
+        return [i for i, password in enumerate(encoded)
+                if password is None or security.check_password(password)]
+
+    def verify(self, password: str) -> bool:
+        return self.verify_encoded(password.encode('utf-8'))
+
+    def verify_encoded(self, encoded: bytes) -> bool:
+        try:
+            with pikepdf.open(self.source(), password=encoded):
+                return True
+        except pikepdf.PasswordError:
+            return False
+
+
+class OfficeVerifier(Verifier):
+    """Office verifier backed by msoffcrypto (pure-Python key derivation)"""
+
+    file_type = 'office'
+
+    # The verifier check still runs the full key derivation
+    prefilter_batch = 8
+
+    def __init__(self, target_file: str):
+        super().__init__(target_file)
+        self._info = None
+
+    def _load_info(self):
+        """Parse the encryption info once (agile and standard ECMA-376 only)"""
+        self._info = False
+        try:
+            with self.open() as f:
+                file_obj = msoffcrypto.OfficeFile(f)
+                if getattr(file_obj, 'type', None) in ('agile', 'standard'):
+                    self._info = (file_obj.type, file_obj.info)
+        except Exception:
+            pass
+
+    @property
+    def has_prefilter(self) -> bool:
+        if self._info is None:
+            self._load_info()
+        return bool(self._info)
+
+    def _check_verifier(self, password: str) -> bool:
+        """Derive the key once and decrypt the password verifier, not the document"""
+        kind, info = self._info
+        if kind == 'agile':
+            return ECMA376Agile.verify_password(
+                password, info['passwordSalt'], info['passwordHashAlgorithm'],
+                info['encryptedVerifierHashInput'], info['encryptedVerifierHashValue'],
+                info['spinValue'], info['passwordKeyBits'])
+        header, verifier = info['header'], info['verifier']
+        key = ECMA376Standard.makekey_from_password(
+            password, header['algId'], header['algIdHash'], header['providerType'],
+            header['keySize'], verifier['saltSize'], verifier['salt'])
+        return ECMA376Standard.verifykey(key, verifier['encryptedVerifier'],
+                                         verifier['encryptedVerifierHash'])
+
+    def prefilter(self, batch: CandidateBatch) -> List[int]:
+        if not self.has_prefilter:
+            return super().prefilter(batch)
+        survivors = []
+        for i, password in enumerate(batch):
+            try:
+                if self._check_verifier(password):
+                    survivors.append(i)
+            except Exception:
+                pass
+        return survivors
+
+    def verify(self, password: str) -> bool:
+        try:
+            with self.open() as f:
+                file_obj = msoffcrypto.OfficeFile(f)
+                file_obj.load_key(password=password)
+                # Try to decrypt to memory to verify password
+                output = io.BytesIO()
+                file_obj.decrypt(output)
+                return True
+        except Exception:
+            return False
+
+
+def aes_fields(info: zipfile.ZipInfo) -> Optional[tuple]:
+    """(strength, real compression method) of a WinZip AES entry, else None"""
+    if info.compress_type != 99:
+        return None
+    extra = info.extra
+    while len(extra) >= 4:
+        header_id, size = struct.unpack('<HH', extra[:4])
+        if header_id == 0x9901 and size >= 7:
+            return extra[8], struct.unpack('<H', extra[9:11])[0]
+        extra = extra[4 + size:]
+    return None
+
+
+def entry_cost(info: zipfile.ZipInfo) -> tuple:
+    """Sort key for how much a password check on an entry has to read"""
+    aes = aes_fields(info)
+    method = aes[1] if aes else info.compress_type
+    return (method != zipfile.ZIP_STORED, info.compress_size)
+
+
+def rank_entries(infos: Iterable[zipfile.ZipInfo]) -> List[zipfile.ZipInfo]:
+    """
+    Encrypted entries, cheapest to verify first
+
+    Stored entries come before compressed ones (no inflating), then
+    smaller before larger.
+    """
+    encrypted = [info for info in infos if info.flag_bits & 0x1 and not info.is_dir()]
+    return sorted(encrypted, key=entry_cost)
+
+
+class ZipVerifier(Verifier):
+    """ZIP verifier backed by zipfile (pure-Python ZipCrypto) or WinZip AES"""
+
+    file_type = 'zip'
+    encoding = 'utf-8'
+
+    # WinZip AES strength -> key length in bytes
+    AES_KEY_LENGTHS = {1: 16, 2: 24, 3: 32}
+
+    # Entries up to this size are kept in memory between guesses
+    RAW_CACHE = 1 << 20
+
+    # First read of an entry; later reads double up to READ_LIMIT
+    FIRST_READ = 512
+    READ_LIMIT = 1 << 16
+
+    def __init__(self, target_file: str):
+        super().__init__(target_file)
+        self._aes = None
+        self._header = None
+        self._entry = None
+        self._offset = None
+        self._raw = None
+
+    @staticmethod
+    def _raw_data(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+        """Raw entry data, which sits after the local header's name and extra fields"""
+        zf.fp.seek(ZipVerifier._data_offset(zf, info))
+        return zf.fp.read(info.compress_size)
+
+    @staticmethod
+    def _data_offset(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> int:
+        zf.fp.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', zf.fp.read(4))
+        return info.header_offset + 30 + name_length + extra_length
+
+    def _select_entry(self):
+        """Pick the cheapest encrypted entry (see rank_entries) and locate its data"""
+        self._entry = False
+        with zipfile.ZipFile(self.source(), 'r') as zf:
+            infos = zf.infolist()
+            if not infos:
+                return
+            ranked = rank_entries(infos)
+            self._entry = ranked[0] if ranked else infos[0]
+            self._offset = self._data_offset(zf, self._entry)
+            if self._entry.compress_size <= self.RAW_CACHE:
+                self._raw = self._raw_data(zf, self._entry)
+
+    @property
+    def entry(self) -> Optional[zipfile.ZipInfo]:
+        """The entry passwords are checked against"""
+        if self._entry is None:
+            self._select_entry()
+        return self._entry or None
+
+    def _chunks(self) -> Iterable[bytes]:
+        """Raw entry data in growing reads, so a bad guess stops early"""
+        size = self.FIRST_READ
+        end = self._entry.compress_size
+        if self._raw is not None:
+            position = 0
+            while position < end:
+                yield self._raw[position:position + size]
+                position += size
+                size = min(size * 2, self.READ_LIMIT)
+            return
+
+        with self.open() as f:
+            f.seek(self._offset)
+            position = 0
+            while position < end:
+                chunk = f.read(min(size, end - position))
+                if not chunk:
+                    return
+                yield chunk
+                position += len(chunk)
+                size = min(size * 2, self.READ_LIMIT)
+
+    def _load_aes(self):
+        """Read the WinZip AES fields of the selected entry (False if not AES)"""
+        self._aes = False
+        info = self.entry
+        aes = aes_fields(info) if info else None
+        if aes is None:
+            return
+        strength = aes[0]
+        data = self._raw if self._raw is not None else b''.join(self._chunks())
+
+        key_length = self.AES_KEY_LENGTHS[strength]
+        salt_length = key_length // 2
+        self._aes = (key_length, data[:salt_length], data[salt_length:salt_length + 2],
+                     data[salt_length + 2:-10], data[-10:])
+
+    def _aes_check(self, password: bytes) -> bool:
+        """The 2-byte password verifier (passes 1 in 65536 wrong passwords)"""
+        key_length, salt, check, _, _ = self._aes
+        return hashlib.pbkdf2_hmac('sha1', password, salt, 1000, 2 * key_length + 2)[-2:] == check
+
+    def _verify_aes(self, password: bytes) -> bool:
+        key_length, salt, check, ciphertext, auth = self._aes
+        derived = hashlib.pbkdf2_hmac('sha1', password, salt, 1000,
+                                      2 * key_length + 2)
+        if derived[-2:] != check:
+            return False
+        # The 2-byte check passes for 1 in 65536 wrong passwords; the HMAC is final
+        auth_key = derived[key_length:2 * key_length]
+        return hmac.compare_digest(hmac.new(auth_key, ciphertext, hashlib.sha1).digest()[:10], auth)
+
+    def _load_header(self):
+        """Read the ZipCrypto header and check byte of the selected entry"""
+        info = self.entry
+        if not info or not info.flag_bits & 0x1 or info.compress_type == 99:
+            self._header = False
+            return
+        header = next(iter(self._chunks()), b'')[:12]
+
+        # Entries with a data descriptor check the DOS time, others the CRC
+        if info.flag_bits & 0x8:
+            hour, minute, second = info.date_time[3:]
+            check = ((hour << 11 | minute << 5 | second // 2) >> 8) & 0xff
+        else:
+            check = (info.CRC >> 24) & 0xff
+        self._header = (header, check)
+
+    def _load(self):
+        if self._aes is None:
+            self._load_aes()
+        if self._header is None:
+            self._load_header()
+
+    @property
+    def releases_gil(self) -> bool:
+        """AES entries spend their time in hashlib's PBKDF2 (GIL released); ZipCrypto runs in Python"""
+        self._load()
+        return bool(self._aes)
+
+    @property
+    def vectorized(self) -> bool:
+        if np is None:
+            return False
+        self._load()
+        return not self._aes and bool(self._header)
+
+    @property
+    def has_prefilter(self) -> bool:
+        self._load()
+        return bool(self._aes) or bool(self._header)
+
+    def prefilter(self, batch: CandidateBatch) -> List[int]:
+        """Check byte (ZipCrypto, 1 in 256) or 2-byte verifier (AES, 1 in 65536)"""
+        self._load()
+        encoded = batch.encoded('utf-8')
+        if self._aes:
+            return [i for i, password in enumerate(encoded) if self._aes_check(password)]
+        if not self._header:
+            return super().prefilter(batch)
+
+        header, check = self._header
+        if np is not None:
+            matrix, lengths = batch.matrix()
+            return np.flatnonzero(zipcrypto_check_bytes(matrix, lengths, header) == check).tolist()
+        return [i for i, password in enumerate(encoded)
+                if zipcrypto_check_byte(password, header) == check]
+
+    def _read_entry(self, password: bytes) -> bool:
+        """
+        Decrypt and inflate the selected entry until it goes wrong
+
+        A wrong password garbles the deflate stream, which zlib rejects
+        within the first block or so; only a stream that inflates cleanly
+        to the end gets its size and CRC compared.
+        """
+        info = self.entry
+        if not info:
+            return False
+        if self._header is None:
+            self._load_header()
+        if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or not self._header:
+            return self._read_zipfile(password)
+
+        header, check = self._header
+        decrypter = ZipCryptoDecrypter(password)
+        if decrypter.decrypt(header)[-1] != check:
+            return False
+
+        inflater = zlib.decompressobj(-15) if info.compress_type == zipfile.ZIP_DEFLATED else None
+        crc = 0
+        size = 0
+        skip = len(header)
+        try:
+            for chunk in self._chunks():
+                if skip:
+                    chunk, skip = chunk[skip:], 0
+                data = decrypter.decrypt(chunk)
+                if inflater is not None:
+                    data = inflater.decompress(data)
+                size += len(data)
+                if size > info.file_size:
+                    return False
+                crc = zlib.crc32(data, crc)
+            if inflater is not None:
+                if not inflater.eof:
+                    return False
+        except zlib.error:
+            return False
+        return size == info.file_size and crc == info.CRC
+
+    def _read_zipfile(self, password: bytes) -> bool:
+        """Full zipfile read (unencrypted entries, bzip2 and LZMA)"""
+        try:
+            with zipfile.ZipFile(self.source(), 'r') as zf:
+                zf.read(self.entry, pwd=password)
+                return True
+        except (RuntimeError, zipfile.BadZipFile, KeyError, zlib.error):
+            return False
+
+    def verify(self, password: str) -> bool:
+        return self.verify_encoded(password.encode('utf-8'))
+
+    def verify_encoded(self, encoded: bytes) -> bool:
+        if self._aes is None:
+            self._load_aes()
+        if self._aes:
+            return self._verify_aes(encoded)
+        return self._read_entry(encoded)
+
+    def verify_matrix(self, matrix, lengths) -> Optional[int]:
+        if not self.vectorized:
+            return super().verify_matrix(matrix, lengths)
+
+        # The check byte passes 1 in 256 wrong passwords; reading the entry is final
+        header, check = self._header
+        survivors = np.flatnonzero(zipcrypto_check_bytes(matrix, lengths, header) == check)
+        for i in survivors:
+            if self._read_entry(matrix[i, :lengths[i]].tobytes()):
+                return int(i)
+        return None
+
+
+VERIFIERS = {
+    'pdf': PdfVerifier,
+    'office': OfficeVerifier,
+    'zip': ZipVerifier,
+}
+
+EXTENSION_TYPES = {
+    '.pdf': 'pdf',
+    '.docx': 'office',
+    '.xlsx': 'office',
+    '.pptx': 'office',
+    '.doc': 'office',
+    '.ppt': 'office',
+    '.zip': 'zip',
+}
+
+
+def sniff_file_type(target_file: str) -> Optional[str]:
+    """
+    Detect a verifier file type from the file's leading bytes
+
+    Returns:
+        'pdf', 'office' or 'zip', or None if the content is not recognised
+        or the file cannot be read
+    """
+    try:
+        with open_target(target_file) as f:
+            head = f.read(HEAD_SIZE)
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    return sniff_bytes(head)
+
+
+def file_type_for(target_file: str) -> Optional[str]:
+    """
+    Verifier file type of a target (None if unsupported)
+
+    The content decides, so renamed files get the right verifier; the
+    extension is only used when the file cannot be read.
+    """
+    if target_exists(target_file):
+        return sniff_file_type(target_file)
+    return EXTENSION_TYPES.get(Path(target_file).suffix.lower())
+
+
+def verifier_class_for(target_file: str) -> Optional[type]:
+    """Return the verifier class for a file (reads only its first bytes)"""
+    file_type = file_type_for(target_file)
+    return VERIFIERS.get(file_type) if file_type else None
+
+
+def create_verifier(target_file: str, file_type: Optional[str] = None) -> Verifier:
+    """
+    Create the verifier for a password-protected file
+
+    Args:
+        target_file: Path to the password-protected file
+        file_type: Verifier file type ('pdf', 'office', 'zip'); sniffed
+                   from the content when omitted
+
+    Returns:
+        Verifier instance
+    """
+    if file_type is None:
+        file_type = file_type_for(target_file)
+    if file_type not in VERIFIERS:
+        raise ValueError(f"Unsupported file type: {Path(target_file).name} "
+                         f"(not a PDF, OLE2 compound file or ZIP)")
+
+    if file_type == 'pdf' and pikepdf is None:
+        raise ImportError("pikepdf is required for PDF files. Install: pip install pikepdf")
+    if file_type == 'office' and msoffcrypto is None:
+        raise ImportError("msoffcrypto-tool is required for Office files. Install: pip install msoffcrypto-tool")
+
+    return VERIFIERS[file_type](target_file)
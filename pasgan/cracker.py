@@ -7,24 +7,27 @@ Supports PDF, DOCX, PPTX, ZIP files
 import os
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+from concurrent.futures import as_completed
 from datetime import datetime
 import json
 
-try:
-    import pikepdf
-except ImportError:
-    pikepdf = None
+# The shared cracking engine (verifiers, execution backends) lives in ../bruteforce
+_ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bruteforce')
+if _ENGINE_DIR not in sys.path:
+    sys.path.append(_ENGINE_DIR)
 
-try:
-    import msoffcrypto
-except ImportError:
-    msoffcrypto = None
-
-try:
-    import zipfile
-except ImportError:
-    zipfile = None
+from checkpoint import Checkpoint, DEFAULT_RESTORE_DIR, atomic_write_text, checkpoint_path
+from containers import discover
+from executor import BACKENDS, create_executor, select_backend
+from governor import add_resource_arguments, apply_resource_arguments
+from journal import ResultsJournal
+from metrics import Metrics, MetricsExporter, MetricsRegistry
+from policy import PasswordPolicy
+from potfile import DEFAULT_POTFILE, Potfile, check_potfile, content_hash
+from tracing import Tracer
+from verifiers import OfficeVerifier, PdfVerifier, ZipVerifier, file_type_for, verifier_class_for
+import verifiers
 
 
 class FileCracker:
@@ -32,14 +35,42 @@ class FileCracker:
     File cracker for password-protected files
     """
     
-    def __init__(self, password_file=None, passwords=None, max_workers=4):
+    def __init__(self, password_file=None, passwords=None, max_workers=4, backend='auto',
+                 restore_dir=None, resume=False, metrics_file=None, metrics_interval=10.0,
+                 potfile=None, policy=None, journal=None, governor=None, tracer=None):
         """
         Args:
             password_file: Path to password list file
             passwords: List of passwords
             max_workers: Number of parallel workers
+            backend: Execution backend for directories ('auto', 'inline',
+                     'threads', 'processes')
+            restore_dir: Directory for per-file restore files (None disables them)
+            resume: Continue each file from its restore file
+            metrics_file: Periodically write per-file metrics here ('.json'
+                          for JSON, otherwise Prometheus text)
+            metrics_interval: Seconds between metrics snapshots
+            potfile: Potfile of cracked files, consulted before and updated
+                     after each file (None disables it)
+            policy: PasswordPolicy of the targets; passwords violating it are
+                    dropped once at load time instead of verified per file
+            journal: Append each file's result to this JSON-lines file as
+                     soon as it finishes (None disables it)
+            governor: ResourceGovernor the run is confined to; the summary
+                      reports speed per assigned core
+            tracer: Tracer (see tracing.py) recording each file's task,
+                    verification and checkpoints per worker, and queue waits
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown execution backend: {backend}")
+        
         self.max_workers = max_workers
+        self.backend = backend
+        self.restore_dir = restore_dir
+        self.resume = resume
+        self.potfile = Potfile(potfile) if potfile is not None else None
+        self.governor = governor
+        self.tracer = tracer
         
         # Load passwords
         if password_file and os.path.exists(password_file):
@@ -49,13 +80,27 @@ class FileCracker:
         else:
             self.passwords = []
         
+        self.policy = policy
+        if policy is not None:
+            loaded = len(self.passwords)
+            self.passwords = list(policy.filter(self.passwords))
+            print(f"Policy {policy}: kept {len(self.passwords)} of {loaded} passwords")
+        
         print(f"Loaded {len(self.passwords)} passwords for cracking")
         
         # Statistics
+        self.start_time = None
         self.attempts = 0
         self.successes = 0
         self.failures = 0
         self.results = {}
+        self.journal = ResultsJournal(journal) if journal is not None else None
+        
+        # Per-file metrics, merged back from worker processes
+        self.registry = MetricsRegistry()
+        self.exporter = None
+        if metrics_file is not None:
+            self.exporter = MetricsExporter(metrics_file, self.registry, metrics_interval)
         
     def _load_passwords(self, filepath):
         """Load passwords from file"""
@@ -78,22 +123,12 @@ class FileCracker:
         Returns:
             Correct password or None
         """
-        if pikepdf is None:
+        if verifiers.pikepdf is None:
             print("Warning: pikepdf not installed. Cannot crack PDF files.")
             print("Install with: pip install pikepdf")
             return None
         
-        for pwd in passwords:
-            try:
-                with pikepdf.open(pdf_path, password=pwd):
-                    return pwd
-            except pikepdf.PasswordError:
-                self.attempts += 1
-                continue
-            except Exception as e:
-                continue
-        
-        return None
+        return self._crack_with(PdfVerifier(pdf_path), passwords)
     
     def crack_docx(self, docx_path, passwords):
         """
@@ -106,28 +141,12 @@ class FileCracker:
         Returns:
             Correct password or None
         """
-        if msoffcrypto is None:
+        if verifiers.msoffcrypto is None:
             print("Warning: msoffcrypto-tool not installed. Cannot crack Office files.")
             print("Install with: pip install msoffcrypto-tool")
             return None
         
-        for pwd in passwords:
-            try:
-                with open(docx_path, 'rb') as f:
-                    file = msoffcrypto.OfficeFile(f)
-                    file.load_key(password=pwd)
-                    
-                    # Try to decrypt to verify password
-                    import io
-                    decrypted = io.BytesIO()
-                    file.decrypt(decrypted)
-                    
-                    return pwd
-            except Exception as e:
-                self.attempts += 1
-                continue
-        
-        return None
+        return self._crack_with(OfficeVerifier(docx_path), passwords)
     
     def crack_pptx(self, pptx_path, passwords):
         """
@@ -154,24 +173,78 @@ class FileCracker:
         Returns:
             Correct password or None
         """
-        if zipfile is None:
-            print("Warning: zipfile module not available.")
-            return None
+        return self._crack_with(ZipVerifier(zip_path), passwords)
+    
+    def _crack_with(self, verifier, passwords):
+        """
+        Run a password list through a verifier
         
-        for pwd in passwords:
-            try:
-                with zipfile.ZipFile(zip_path) as zf:
-                    # Get first file in archive
-                    first_file = zf.namelist()[0]
-                    # Try to extract with password
-                    zf.read(first_file, pwd=pwd.encode('utf-8'))
+        Args:
+            verifier: Verifier for the target file
+            passwords: List of passwords to try
+            
+        Returns:
+            Correct password or None
+        """
+        metrics = self.registry.register(
+            Metrics(os.path.basename(verifier.target_file), verifier.file_type))
+        metrics.tracer = self.tracer
+        
+        file_hash = None
+        if self.potfile is not None:
+            file_hash = content_hash(verifier.target_file)
+            known = check_potfile(self.potfile, verifier, file_hash)
+            if known is not None:
+                print(f"Already cracked (potfile {self.potfile.path})")
+                return known
+        
+        checkpoint = None
+        start = 0
+        if self.restore_dir is not None:
+            digest = hashlib.sha1('\n'.join(passwords).encode('utf-8')).hexdigest()
+            job = {'target': os.path.abspath(verifier.target_file), 'attack': 'password_list',
+                   'passwords': digest}
+            checkpoint = Checkpoint(checkpoint_path(self.restore_dir, job), job)
+            
+            state = (checkpoint.load() if self.resume else None) or {}
+            if state.get('complete'):
+                return state.get('password')
+            start = state.get('index', 0)
+        
+        index = start
+        try:
+            for index in range(start, len(passwords)):
+                pwd = passwords[index]
+                started = time.perf_counter()
+                try:
+                    found = verifier.verify(pwd)
+                except Exception:
+                    found = False
+                metrics.add_time('verify', time.perf_counter() - started)
+                metrics.guesses()
+                
+                if found:
+                    metrics.count('cracked')
+                    if checkpoint:
+                        checkpoint.save({'complete': True, 'password': pwd})
+                    if self.potfile is not None:
+                        self.potfile.add(file_hash, pwd, os.path.basename(verifier.target_file),
+                                         verifier.file_type, 'password_list', index + 1)
                     return pwd
-            except (RuntimeError, zipfile.BadZipFile):
                 self.attempts += 1
-                continue
-            except Exception as e:
-                continue
-        
+                
+                if checkpoint and checkpoint.due():
+                    with metrics.timed('checkpoint'):
+                        checkpoint.save({'index': index + 1})
+                if self.exporter is not None:
+                    self.exporter.maybe_write()
+        except KeyboardInterrupt:
+            if checkpoint:
+                checkpoint.save({'index': index})
+            raise
+        
+        if checkpoint:
+            checkpoint.save({'complete': True, 'password': None})
         return None
     
     def crack_file(self, filepath, passwords=None):
@@ -187,26 +260,30 @@ class FileCracker:
         """
         if passwords is None:
             passwords = self.passwords
+        elif self.policy is not None:
+            passwords = list(self.policy.filter(passwords))
         
         filename = os.path.basename(filepath)
-        ext = os.path.splitext(filepath)[1].lower()
+        file_type = file_type_for(filepath)
         
         print(f"\nAttempting to crack: {filename}")
         start_time = time.time()
+        traced_from = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = start_time
         
         password = None
         
-        # Try appropriate cracking method based on extension
-        if ext == '.pdf':
+        # Try appropriate cracking method based on the file's content
+        if file_type == 'pdf':
             password = self.crack_pdf(filepath, passwords)
-        elif ext in ['.docx', '.doc']:
+        elif file_type == 'office':
+            # OOXML and Office 97-2003 files alike (msoffcrypto detects which)
             password = self.crack_docx(filepath, passwords)
-        elif ext in ['.pptx', '.ppt']:
-            password = self.crack_pptx(filepath, passwords)
-        elif ext == '.zip':
+        elif file_type == 'zip':
             password = self.crack_zip(filepath, passwords)
         else:
-            print(f"Unsupported file type: {ext}")
+            print(f"Unsupported file type: {filename}")
             return {
                 'file': filename,
                 'status': 'unsupported',
@@ -215,6 +292,9 @@ class FileCracker:
             }
         
         elapsed = time.time() - start_time
+        if self.tracer is not None:
+            self.tracer.add('verify', traced_from, time.perf_counter() - traced_from,
+                            args={'file': filename, 'passwords': len(passwords)})
         
         if password:
             print(f"✓ SUCCESS! Password found: {password} (Time: {elapsed:.2f}s)")
@@ -235,6 +315,10 @@ class FileCracker:
         }
         
         self.results[filename] = result
+        if self.journal is not None:
+            self.journal.append(filepath, result)
+        if self.exporter is not None:
+            self.exporter.write()
         return result
     
     def crack_directory(self, directory, recursive=True, extensions=None):
@@ -244,43 +328,80 @@ class FileCracker:
         Args:
             directory: Directory path
             recursive: Search subdirectories
-            extensions: List of file extensions to process
+            extensions: List of file extensions to process (default: every
+                        file whose content is a PDF, OLE2 or ZIP container)
             
         Returns:
             List of results
         """
-        if extensions is None:
-            extensions = ['.pdf', '.docx', '.doc', '.pptx', '.ppt', '.zip']
+        def wanted(filepath):
+            if extensions is None:
+                return file_type_for(filepath) is not None
+            return os.path.splitext(filepath)[1].lower() in extensions
         
         # Find all files
         files = []
         if recursive:
             for root, dirs, filenames in os.walk(directory):
                 for filename in filenames:
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext in extensions:
+                    if wanted(os.path.join(root, filename)):
                         files.append(os.path.join(root, filename))
         else:
             for filename in os.listdir(directory):
                 filepath = os.path.join(directory, filename)
-                if os.path.isfile(filepath):
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext in extensions:
-                        files.append(filepath)
+                if os.path.isfile(filepath) and wanted(filepath):
+                    files.append(filepath)
+        
+        # ZIP drops are cracked member by member, in memory
+        files = [target for f in files for target in (discover(f) or [f])]
         
         print(f"\nFound {len(files)} files to crack in {directory}")
+        if self.start_time is None:
+            self.start_time = time.time()
         
         # Crack files
+        backend = self.backend
+        if backend == 'auto':
+            backend = select_backend([verifier_class_for(f) for f in files],
+                                     self.max_workers, len(files))
+        
+        task = _crack_file_task if backend == 'processes' else FileCracker.crack_file
         results = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self.crack_file, f): f for f in files}
+        with create_executor(backend, self.max_workers) as executor:
+            if self.tracer is not None:
+                futures = {self.tracer.submit(executor, task, self, f): f for f in files}
+            else:
+                futures = {executor.submit(task, self, f): f for f in files}
             
             for future in as_completed(futures):
                 result = future.result()
+                if self.tracer is not None:
+                    result = self.tracer.unwrap('crack', result, file=os.path.basename(futures[future]))
+                if backend == 'processes':
+                    result, attempts, snapshots, events = result
+                    self._merge_result(result, attempts, snapshots)
+                    if self.tracer is not None:
+                        self.tracer.merge(events)
                 results.append(result)
         
+        if self.exporter is not None:
+            self.exporter.write()
         return results
     
+    def _merge_result(self, result, attempts, snapshots):
+        """Fold a result cracked in a worker process into this cracker"""
+        self.attempts += attempts
+        for snapshot in snapshots:
+            self.registry.merge(snapshot)
+        if result['status'] == 'success':
+            self.successes += 1
+        elif result['status'] == 'failed':
+            self.failures += 1
+        if result['status'] != 'unsupported':
+            self.results[result['file']] = result
+            if self.journal is not None:
+                self.journal.append(result['path'], result)
+    
     def save_results(self, output_file='crack_results.json'):
         """
         Save cracking results to file
@@ -296,8 +417,9 @@ class FileCracker:
             'results': self.results
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(report, f, indent=4)
+        if self.journal is not None:
+            self.journal.close()
+        atomic_write_text(output_file, json.dumps(report, indent=4))
         
         print(f"\nResults saved to {output_file}")
     
@@ -310,6 +432,12 @@ class FileCracker:
         print(f"Successful cracks: {self.successes}")
         print(f"Failed cracks: {self.failures}")
         print(f"Total password attempts: {self.attempts}")
+        elapsed = time.time() - self.start_time if self.start_time else 0
+        if elapsed > 0:
+            print(f"Speed: {self.attempts / elapsed:.2f} passwords/sec")
+            if self.governor is not None:
+                print(f"Per core: {self.governor.per_core(self.attempts / elapsed):.2f} "
+                      f"passwords/sec ({self.governor.core_count} cores)")
         
         if self.successes > 0:
             print("\nSuccessfully cracked files:")
@@ -320,6 +448,18 @@ class FileCracker:
         print("="*60 + "\n")
 
 
+def _crack_file_task(cracker, filepath):
+    """Process-pool entry point: crack in the worker's copy, report its attempts, metrics and spans"""
+    # Only the parent writes the metrics file and the results journal
+    cracker.exporter = None
+    cracker.journal = None
+    cracker.registry = MetricsRegistry()
+    before = cracker.attempts
+    result = cracker.crack_file(filepath)
+    events = cracker.tracer.take() if cracker.tracer is not None else []
+    return result, cracker.attempts - before, cracker.registry.snapshot(), events
+
+
 def main():
     """Main cracking function"""
     import argparse
@@ -334,10 +474,31 @@ def main():
                        help='Search directories recursively')
     parser.add_argument('--workers', type=int, default=4,
                        help='Number of parallel workers')
+    parser.add_argument('--backend', choices=BACKENDS, default='auto',
+                       help='Execution backend (auto picks per verifier)')
     parser.add_argument('--output', type=str, default='crack_results.json',
                        help='Output results file')
+    parser.add_argument('--journal', type=str,
+                       help='Results journal, appended as each file finishes '
+                            '(default: the output file with a .jsonl extension)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue each file from its restore file')
+    parser.add_argument('--restore-dir', type=str, default=DEFAULT_RESTORE_DIR,
+                       help='Directory for periodic restore files')
+    parser.add_argument('--metrics-file', type=str,
+                       help='Periodically write metrics here (.json for JSON, else Prometheus text)')
+    parser.add_argument('--potfile', type=str, default=DEFAULT_POTFILE,
+                       help='Database of cracked files, checked before attacking')
+    parser.add_argument('--no-potfile', action='store_true',
+                       help='Neither consult nor update the potfile')
+    parser.add_argument('--policy', type=str,
+                       help="Password policy of the targets, e.g. 'min=12,require=lud'")
+    parser.add_argument('--trace', type=str,
+                       help='Write a timeline of the run here (Chrome trace JSON, for Perfetto)')
+    add_resource_arguments(parser)
     
     args = parser.parse_args()
+    governor = apply_resource_arguments(parser, args)
     
     # Check if password file exists
     if not os.path.exists(args.passwords):
@@ -346,7 +507,13 @@ def main():
         return
     
     # Create cracker
-    cracker = FileCracker(password_file=args.passwords, max_workers=args.workers)
+    cracker = FileCracker(password_file=args.passwords, max_workers=args.workers,
+                          backend=args.backend, restore_dir=args.restore_dir,
+                          resume=args.resume, metrics_file=args.metrics_file,
+                          potfile=None if args.no_potfile else args.potfile,
+                          policy=PasswordPolicy.parse(args.policy) if args.policy else None,
+                          journal=args.journal or os.path.splitext(args.output)[0] + '.jsonl',
+                          governor=governor, tracer=Tracer(args.trace) if args.trace else None)
     
     # Crack files
     if os.path.isfile(args.target):
@@ -362,6 +529,8 @@ def main():
     # Print summary and save results
     cracker.print_summary()
     cracker.save_results(args.output)
+    if cracker.tracer is not None:
+        print(f"Trace saved to {cracker.tracer.save()}")
 
 
 if __name__ == '__main__':
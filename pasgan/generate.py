@@ -7,7 +7,9 @@ Enforces minimum 12 character constraint
 import torch
 import numpy as np
 import os
+import sys
 import json
+import time
 import argparse
 from datetime import datetime
 
@@ -20,13 +22,21 @@ class PasswordGenerator:
     Password generator using trained PassGAN model
     """
     
-    def __init__(self, checkpoint_path, device=None):
+    def __init__(self, checkpoint_path, device=None, governor=None, tracer=None):
         """
         Args:
             checkpoint_path: Path to trained model checkpoint
             device: Device to use (cuda/cpu)
+            governor: ResourceGovernor (see apply_governor_arguments); caps torch's
+                      threads, shrinks batches and pauses under its memory ceiling
+            tracer: Engine Tracer (tracing.py); each sampled batch and memory
+                    pause becomes a span
         """
         self.device = device or torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.governor = governor
+        self.tracer = tracer
+        if governor is not None:
+            governor.limit_torch()
         
         # Load checkpoint
         print(f"Loading checkpoint from {checkpoint_path}")
@@ -53,7 +63,7 @@ class PasswordGenerator:
         print(f"Vocabulary size: {self.dataset.vocab_size}")
         print(f"Sequence length: {self.config['seq_len']}")
     
-    def generate(self, num_passwords, min_length=12, temperature=1.0, unique=True):
+    def generate(self, num_passwords, min_length=12, temperature=1.0, unique=True, policy=None):
         """
         Generate passwords
         
@@ -62,10 +72,20 @@ class PasswordGenerator:
             min_length: Minimum password length
             temperature: Sampling temperature (higher = more diverse)
             unique: Return only unique passwords
+            policy: PasswordPolicy (see load_policy); characters it does not
+                    allow are never sampled, other violations are discarded
             
         Returns:
             List of generated passwords
         """
+        blocked = []
+        if policy is not None:
+            min_length = max(min_length, policy.min_length)
+            if policy.allowed_chars is not None:
+                # Index 0 doubles as the end-of-password marker, keep it
+                blocked = [idx for idx, char in self.dataset.idx_to_char.items()
+                           if idx != 0 and char not in policy.allowed_chars]
+        
         passwords = []
         generated_set = set()
         
@@ -77,23 +97,37 @@ class PasswordGenerator:
             while len(passwords) < num_passwords and attempts < max_attempts:
                 attempts += 1
                 
+                size = batch_size
+                if self.governor is not None:
+                    paused = self.governor.wait_for_memory()
+                    if paused and self.tracer is not None:
+                        self.tracer.add('memory pause', time.perf_counter() - paused, paused,
+                                        'generation')
+                    size = self.governor.batch_size(batch_size)
+                start = time.perf_counter()
+                
                 # Generate noise
-                noise = torch.randn(batch_size, self.config['latent_dim']).to(self.device)
+                noise = torch.randn(size, self.config['latent_dim']).to(self.device)
                 
                 # Generate passwords
                 logits = self.generator(noise) / temperature
+                if blocked:
+                    logits[..., blocked] = float('-inf')
                 
                 # Sample from distribution
                 probs = torch.softmax(logits, dim=-1)
                 indices = torch.multinomial(probs.view(-1, self.dataset.vocab_size), 1)
-                indices = indices.view(batch_size, self.config['seq_len'])
+                indices = indices.view(size, self.config['seq_len'])
                 
                 # Decode passwords
                 batch_passwords = self.dataset.decode_batch(indices)
+                if self.tracer is not None:
+                    self.tracer.add('generate', start, time.perf_counter() - start, 'generation',
+                                    args={'batch': size, 'temperature': float(temperature)})
                 
                 # Filter by length and uniqueness
                 for pwd in batch_passwords:
-                    if len(pwd) >= min_length:
+                    if len(pwd) >= min_length and (policy is None or policy.allows(pwd)):
                         if unique:
                             if pwd not in generated_set:
                                 passwords.append(pwd)
@@ -106,7 +140,7 @@ class PasswordGenerator:
         
         return passwords[:num_passwords]
     
-    def generate_with_patterns(self, num_passwords, patterns=None, min_length=12):
+    def generate_with_patterns(self, num_passwords, patterns=None, min_length=12, policy=None):
         """
         Generate passwords with specific patterns
         
@@ -114,6 +148,7 @@ class PasswordGenerator:
             num_passwords: Number of passwords to generate
             patterns: List of pattern constraints (e.g., 'uppercase', 'digits', 'special')
             min_length: Minimum password length
+            policy: PasswordPolicy applied while sampling
             
         Returns:
             List of generated passwords matching patterns
@@ -127,7 +162,7 @@ class PasswordGenerator:
         
         while len(passwords) < num_passwords and attempts < max_attempts:
             # Generate batch
-            batch = self.generate(100, min_length=min_length, unique=False)
+            batch = self.generate(100, min_length=min_length, unique=False, policy=policy)
             
             # Filter by patterns
             for pwd in batch:
@@ -180,7 +215,7 @@ class PasswordGenerator:
         print(f"Saved {len(passwords)} passwords to {output_file}")
     
     def generate_diverse_batch(self, num_passwords, min_length=12, 
-                              temperature_range=(0.8, 1.5)):
+                              temperature_range=(0.8, 1.5), policy=None):
         """
         Generate diverse batch with varying temperatures
         
@@ -188,6 +223,7 @@ class PasswordGenerator:
             num_passwords: Number of passwords to generate
             min_length: Minimum password length
             temperature_range: Range of temperatures to use
+            policy: PasswordPolicy applied while sampling
             
         Returns:
             List of generated passwords
@@ -199,18 +235,46 @@ class PasswordGenerator:
         
         for temp in temps:
             batch = self.generate(per_temp, min_length=min_length, 
-                                temperature=temp, unique=True)
+                                temperature=temp, unique=True, policy=policy)
             passwords.extend(batch)
         
         # Fill remaining
         if len(passwords) < num_passwords:
             remaining = num_passwords - len(passwords)
-            batch = self.generate(remaining, min_length=min_length, unique=True)
+            batch = self.generate(remaining, min_length=min_length, unique=True, policy=policy)
             passwords.extend(batch)
         
         return passwords[:num_passwords]
 
 
+def _use_engine():
+    """Make the cracking engine's modules (../bruteforce) importable"""
+    engine_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bruteforce')
+    if engine_dir not in sys.path:
+        sys.path.append(engine_dir)
+
+
+def load_policy(spec):
+    """Parse a policy such as 'min=12,require=lud' with the cracking engine's PasswordPolicy"""
+    _use_engine()
+    from policy import PasswordPolicy
+    return PasswordPolicy.parse(spec)
+
+
+def add_governor_arguments(parser):
+    """Add the engine's resource options (--cores, --nice, --memory-limit, --torch-threads)"""
+    _use_engine()
+    from governor import add_resource_arguments
+    add_resource_arguments(parser)
+
+
+def apply_governor_arguments(parser, args):
+    """ResourceGovernor for add_governor_arguments() options, applied to this process (or None)"""
+    _use_engine()
+    from governor import apply_resource_arguments
+    return apply_resource_arguments(parser, args)
+
+
 def main():
     """Main generation function"""
     parser = argparse.ArgumentParser(description='Generate passwords using PassGAN')
@@ -230,8 +294,15 @@ def main():
                        help='Use diverse temperature sampling')
     parser.add_argument('--patterns', type=str, nargs='+',
                        help='Required patterns (uppercase, lowercase, digits, special)')
+    parser.add_argument('--policy', type=str,
+                       help="Target password policy, e.g. 'min=12,require=lud,allow=luds'")
+    parser.add_argument('--trace', type=str,
+                       help='Write a timeline of generation here (Chrome trace JSON, for Perfetto)')
+    add_governor_arguments(parser)
     
     args = parser.parse_args()
+    policy = load_policy(args.policy) if args.policy else None
+    governor = apply_governor_arguments(parser, args)
     
     # Check if checkpoint exists
     if not os.path.exists(args.checkpoint):
@@ -240,7 +311,12 @@ def main():
         return
     
     # Create generator
-    generator = PasswordGenerator(args.checkpoint)
+    tracer = None
+    if args.trace:
+        _use_engine()
+        from tracing import Tracer
+        tracer = Tracer(args.trace)
+    generator = PasswordGenerator(args.checkpoint, governor=governor, tracer=tracer)
     
     # Generate passwords
     print(f"\nGenerating {args.num} passwords (min length: {args.min_length})...")
@@ -249,18 +325,21 @@ def main():
         passwords = generator.generate_with_patterns(
             args.num, 
             patterns=args.patterns,
-            min_length=args.min_length
+            min_length=args.min_length,
+            policy=policy
         )
     elif args.diverse:
         passwords = generator.generate_diverse_batch(
             args.num,
-            min_length=args.min_length
+            min_length=args.min_length,
+            policy=policy
         )
     else:
         passwords = generator.generate(
             args.num,
             min_length=args.min_length,
-            temperature=args.temperature
+            temperature=args.temperature,
+            policy=policy
         )
     
     print(f"Generated {len(passwords)} unique passwords")
@@ -272,6 +351,8 @@ def main():
     
     # Save to file
     generator.save_passwords(passwords, args.output)
+    if tracer is not None:
+        print(f"Trace saved to {tracer.save()}")
     
     # Statistics
     lengths = [len(pwd) for pwd in passwords]
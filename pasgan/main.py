@@ -9,6 +9,14 @@ import argparse
 from datetime import datetime
 import json
 
+# Resource options come from the cracking engine (../bruteforce)
+_ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bruteforce')
+if _ENGINE_DIR not in sys.path:
+    sys.path.append(_ENGINE_DIR)
+
+from governor import add_resource_arguments, apply_resource_arguments
+from tracing import Tracer
+
 
 def check_dependencies():
     """Check if required packages are installed"""
@@ -85,24 +93,26 @@ def train_model(config):
     return os.path.join(train_config['save_dir'], 'final_model.pth')
 
 
-def generate_passwords(checkpoint_path, num_passwords=10000, min_length=12):
+def generate_passwords(checkpoint_path, num_passwords=10000, min_length=12, policy=None,
+                       governor=None, tracer=None):
     """Generate passwords using trained model"""
     print("\n" + "="*60)
     print("STEP 2: GENERATING PASSWORDS")
     print("="*60)
     
-    from generate import PasswordGenerator
+    from generate import PasswordGenerator, load_policy
     
     if not os.path.exists(checkpoint_path):
         print(f"Error: Checkpoint not found at {checkpoint_path}")
         return None
     
     # Create generator
-    generator = PasswordGenerator(checkpoint_path)
+    generator = PasswordGenerator(checkpoint_path, governor=governor, tracer=tracer)
     
     # Generate passwords with diversity
     print(f"\nGenerating {num_passwords} passwords (min length: {min_length})...")
-    passwords = generator.generate_diverse_batch(num_passwords, min_length=min_length)
+    passwords = generator.generate_diverse_batch(num_passwords, min_length=min_length,
+                                                 policy=load_policy(policy) if policy else None)
     
     print(f"Generated {len(passwords)} unique passwords")
     
@@ -119,20 +129,26 @@ def generate_passwords(checkpoint_path, num_passwords=10000, min_length=12):
     return output_file
 
 
-def crack_files(password_file, targets):
+def crack_files(password_file, targets, backend='auto', resume=False, metrics_file=None,
+                potfile='potfile.db', policy=None, workers=4, governor=None, tracer=None):
     """Crack target files"""
     print("\n" + "="*60)
     print("STEP 3: CRACKING FILES")
     print("="*60)
     
     from cracker import FileCracker
+    from policy import PasswordPolicy
     
     if not os.path.exists(password_file):
         print(f"Error: Password file not found: {password_file}")
         return
     
     # Create cracker
-    cracker = FileCracker(password_file=password_file, max_workers=4)
+    cracker = FileCracker(password_file=password_file, max_workers=workers, backend=backend,
+                          restore_dir='restore', resume=resume, metrics_file=metrics_file,
+                          potfile=potfile,
+                          policy=PasswordPolicy.parse(policy) if policy else None,
+                          governor=governor, tracer=tracer)
     
     # Crack each target
     for target in targets:
@@ -154,6 +170,32 @@ def crack_files(password_file, targets):
     print(f"\n✓ File cracking completed!")
 
 
+def serve_daemon(checkpoint_path, port=8765, socket_path=None, workers=4, min_length=12,
+                 potfile='potfile.db', governor=None):
+    """Serve cracking jobs with the generator loaded once (see bruteforce/daemon.py)"""
+    print("\n" + "="*60)
+    print("DAEMON MODE")
+    print("="*60)
+    
+    from daemon import CrackDaemon
+    
+    crack_daemon = CrackDaemon(workers=workers, restore_dir='restore', potfile=potfile,
+                               governor=governor)
+    
+    if os.path.exists(checkpoint_path):
+        from generate import PasswordGenerator
+        generator = PasswordGenerator(checkpoint_path, governor=governor)
+        crack_daemon.add_generator(
+            'passgan',
+            lambda count, policy: generator.generate_diverse_batch(count, min_length=min_length,
+                                                                   policy=policy))
+    else:
+        print(f"Warning: Checkpoint not found at {checkpoint_path}; "
+              f"jobs cannot ask for generated passwords")
+    
+    crack_daemon.serve(port=port, socket_path=socket_path)
+
+
 def main():
     """Main orchestration function"""
     parser = argparse.ArgumentParser(
@@ -168,6 +210,8 @@ def main():
                        help='Crack files')
     parser.add_argument('--all', action='store_true',
                        help='Run complete pipeline (train + generate + crack)')
+    parser.add_argument('--serve', action='store_true',
+                       help='Run as a daemon taking cracking jobs over a local HTTP API')
     
     parser.add_argument('--checkpoint', type=str,
                        default='pasgan/checkpoints/final_model.pth',
@@ -181,6 +225,30 @@ def main():
     
     parser.add_argument('--targets', type=str, nargs='+',
                        help='Target files or directories to crack')
+    parser.add_argument('--backend', choices=['auto', 'inline', 'threads', 'processes'],
+                       default='auto', help='Execution backend for cracking')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue cracking from restore files')
+    parser.add_argument('--metrics-file', type=str,
+                       help='Periodically write cracking metrics here (.json or Prometheus text)')
+    parser.add_argument('--potfile', type=str, default='potfile.db',
+                       help='Database of cracked files, checked before cracking')
+    parser.add_argument('--no-potfile', action='store_true',
+                       help='Neither consult nor update the potfile')
+    parser.add_argument('--policy', type=str,
+                       help="Target password policy for generation and cracking, "
+                            "e.g. 'min=12,require=lud'")
+    
+    parser.add_argument('--port', type=int, default=8765,
+                       help='Daemon TCP port (127.0.0.1)')
+    parser.add_argument('--socket', type=str,
+                       help='Daemon Unix socket, instead of TCP')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Cracking workers (shared by the jobs in daemon mode)')
+    add_resource_arguments(parser)
+    parser.add_argument('--trace', type=str,
+                       help='Write a timeline of generation and cracking here '
+                            '(Chrome trace JSON, for Perfetto)')
     
     parser.add_argument('--skip-deps', action='store_true',
                        help='Skip dependency check')
@@ -195,6 +263,16 @@ def main():
             return
         print("✓ All dependencies satisfied\n")
     
+    governor = apply_resource_arguments(parser, args)
+    if governor is not None:
+        print(f"Resources: {governor.describe()}\n")
+    
+    if args.serve:
+        serve_daemon(args.checkpoint, port=args.port, socket_path=args.socket,
+                     workers=args.workers, min_length=args.min_length,
+                     potfile=None if args.no_potfile else args.potfile, governor=governor)
+        return
+    
     # Determine what to run
     run_train = args.train or args.all
     run_generate = args.generate or args.all
@@ -217,6 +295,7 @@ def main():
     
     checkpoint_path = args.checkpoint
     password_file = 'pasgan/generated_passwords.txt'
+    tracer = Tracer(args.trace) if args.trace else None
     
     # Run pipeline
     try:
@@ -233,7 +312,10 @@ def main():
             password_file = generate_passwords(
                 checkpoint_path,
                 num_passwords=args.num_passwords,
-                min_length=args.min_length
+                min_length=args.min_length,
+                policy=args.policy,
+                governor=governor,
+                tracer=tracer
             )
             if password_file is None:
                 print("Error: Password generation failed")
@@ -246,7 +328,11 @@ def main():
                 print("Use --targets to specify files or directories")
                 return
             
-            crack_files(password_file, args.targets)
+            crack_files(password_file, args.targets, backend=args.backend,
+                        resume=args.resume, metrics_file=args.metrics_file,
+                        potfile=None if args.no_potfile else args.potfile,
+                        policy=args.policy, workers=args.workers, governor=governor,
+                        tracer=tracer)
         
         print("\n" + "="*60)
         print("PIPELINE COMPLETED SUCCESSFULLY!")
@@ -258,6 +344,9 @@ def main():
         print(f"\n\nError: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if tracer is not None:
+            print(f"Trace saved to {tracer.save()}")
 
 
 if __name__ == '__main__':